@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from src.data.backfill import BackfillEngine, CandleStoreSink
+from src.data.candle_store import CandleStore
+
+DEFAULT_SYMBOLS = [
+    "BTC/USDT",
+    "ETH/USDT",
+    "BNB/USDT",
+    "XRP/USDT",
+    "SOL/USDT",
+    "ADA/USDT",
+    "DOGE/USDT",
+    "AVAX/USDT",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backfill historical OHLCV candles into the database."
+    )
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--timeframe", default="1m")
+    parser.add_argument("--days", type=int, default=60, help="days back from --end")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--parallel", type=int, default=16)
+    parser.add_argument("--checkpoint-dir", default="data/backfill")
+    parser.add_argument(
+        "--store",
+        default=None,
+        help="write to the columnar candle store at this path instead of the DB",
+    )
+    return parser.parse_args()
+
+
+async def run(args):
+    end = args.end or datetime.utcnow()
+    start = args.start or end - timedelta(days=args.days)
+
+    sink = CandleStoreSink(CandleStore(args.store)) if args.store else None
+    engine = BackfillEngine(
+        sink=sink, checkpoint_dir=args.checkpoint_dir, max_parallel=args.parallel
+    )
+    try:
+        return await engine.backfill(args.symbols, start, end, args.timeframe)
+    finally:
+        await engine.fetcher.close()
+
+
+def main():
+    args = parse_args()
+    stats = asyncio.run(run(args))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
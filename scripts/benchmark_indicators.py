@@ -0,0 +1,83 @@
+import argparse
+import json
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+import ta
+
+from src.ml import kernels
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare the in-house indicator kernels against `ta`."
+    )
+    parser.add_argument("--rows", type=int, default=1000, help="candles per symbol")
+    parser.add_argument("--symbols", type=int, default=100, help="panel size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--float32", action="store_true", help="use float32 input")
+    return parser.parse_args()
+
+
+def best_of(func: Callable, repeat: int) -> float:
+    func()  # Warm up caches and any JIT compilation
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def with_ta(close: np.ndarray, high: np.ndarray, low: np.ndarray):
+    for i in range(close.shape[0]):
+        c, h, lo = pd.Series(close[i]), pd.Series(high[i]), pd.Series(low[i])
+        ta.momentum.RSIIndicator(c).rsi()
+        macd = ta.trend.MACD(c)
+        macd.macd(), macd.macd_signal(), macd.macd_diff()
+        bands = ta.volatility.BollingerBands(c)
+        bands.bollinger_hband(), bands.bollinger_mavg(), bands.bollinger_lband()
+        ta.volatility.AverageTrueRange(h, lo, c).average_true_range()
+
+
+def with_kernels(close: np.ndarray, high: np.ndarray, low: np.ndarray):
+    for i in range(close.shape[0]):
+        kernels.technical_indicators(close[i], high[i], low[i])
+
+
+def run(args) -> Dict:
+    rng = np.random.default_rng(0)
+    shape = (args.symbols, args.rows)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, shape), axis=1))
+    spread = np.abs(rng.normal(0, 0.001, shape))
+    high, low = close * (1 + spread), close * (1 - spread)
+    if args.float32:
+        close, high, low = (a.astype(np.float32) for a in (close, high, low))
+
+    ta_s = best_of(lambda: with_ta(close, high, low), args.repeat)
+    series_s = best_of(lambda: with_kernels(close, high, low), args.repeat)
+    panel_s = best_of(
+        lambda: kernels.technical_indicators(close, high, low), args.repeat
+    )
+    return {
+        "symbols": args.symbols,
+        "rows": args.rows,
+        "dtype": str(close.dtype),
+        "numba": kernels.numba is not None,
+        "ta_ms": round(ta_s * 1000, 2),
+        "kernels_per_symbol_ms": round(series_s * 1000, 2),
+        "kernels_panel_ms": round(panel_s * 1000, 2),
+        "speedup_per_symbol": round(ta_s / series_s, 1),
+        "speedup_panel": round(ta_s / panel_s, 1),
+    }
+
+
+def main():
+    args = parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
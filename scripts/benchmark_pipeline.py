@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.data.fetcher import CryptoDataFetcher, binance_exchange
+from src.data.simulator import RecordingExchange, ReplayExchange, SyntheticExchange
+
+DEFAULT_SYMBOLS = [
+    "BTC/USDT",
+    "ETH/USDT",
+    "BNB/USDT",
+    "XRP/USDT",
+    "SOL/USDT",
+    "ADA/USDT",
+    "DOGE/USDT",
+    "AVAX/USDT",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the data and realtime pipelines offline."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--replay", help="replay a recorded session file")
+    source.add_argument("--record", help="record a live Binance session to this file")
+    parser.add_argument(
+        "--pipeline",
+        choices=["realtime", "data"],
+        default="realtime",
+        help="RealtimePipeline.process_update or DataPipeline.update_market_data",
+    )
+    parser.add_argument("--symbols", type=int, default=80, help="symbol count")
+    parser.add_argument("--speed", type=float, default=60.0, help="clock multiplier")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated RTT (s)")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="seconds between cycles"
+    )
+    parser.add_argument(
+        "--predict", action="store_true", help="predict with models under MODEL_PATH"
+    )
+    parser.add_argument(
+        "--database",
+        help="database URL the pipelines store into (default: a temporary SQLite)",
+    )
+    return parser.parse_args()
+
+
+def build_fetcher(args) -> Tuple[CryptoDataFetcher, List[str]]:
+    if args.record:
+        exchange = RecordingExchange(binance_exchange(), args.record)
+        return CryptoDataFetcher(exchange=exchange), DEFAULT_SYMBOLS
+    if args.replay:
+        exchange = ReplayExchange(
+            args.replay, args.speed, args.symbols, latency=args.latency
+        )
+    else:
+        exchange = SyntheticExchange(
+            symbol_count=args.symbols, speed=args.speed, latency=args.latency
+        )
+    return CryptoDataFetcher(exchange=exchange), exchange.symbols[: args.symbols]
+
+
+class StageTimer:
+    """Accumulates per-cycle time spent in wrapped pipeline calls."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._cycle: Dict[str, float] = {}
+
+    def wrap(self, owner, name: str, stage: str):
+        """Replace `owner.name` with a version that times each call."""
+        func: Callable = getattr(owner, name)
+        if asyncio.iscoroutinefunction(func):
+
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+        else:
+
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def add(self, stage: str, seconds: float):
+        self._cycle[stage] = self._cycle.get(stage, 0.0) + seconds
+
+    def end_cycle(self):
+        for stage, seconds in self._cycle.items():
+            self.samples.setdefault(stage, []).append(seconds)
+        self._cycle = {}
+
+
+def summarize(samples: List[float]) -> Dict:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def configure_database(url: str):
+    # src.db.database reads DATABASE_URL on import, so this runs before any
+    # pipeline module is imported
+    os.environ["DATABASE_URL"] = url
+    from src.db.database import engine
+    from src.db.models import Base
+
+    Base.metadata.create_all(engine)
+
+
+def build_pipeline(args, fetcher, symbols, timer: StageTimer):
+    """The pipeline under test with its stages instrumented; returns its cycle."""
+    if args.pipeline == "data":
+        from src.pipeline.data_pipeline import DataPipeline
+
+        pipeline = DataPipeline(fetcher=fetcher, symbols=symbols)
+        timer.wrap(pipeline.sync, "sync_many", "sync")
+        timer.wrap(pipeline.engineer, "update_technical_indicators", "features")
+        return pipeline.update_market_data
+
+    from src.pipeline import realtime
+    from src.pipeline.realtime import RealtimePipeline
+
+    # Streams need a live Binance websocket; the simulators serve REST only
+    pipeline = RealtimePipeline(
+        fetcher=fetcher,
+        symbols=symbols,
+        stream_order_books=False,
+        stream_bars=False,
+    )
+    if not args.predict:
+        pipeline.models = None
+    elif pipeline.models is None:
+        raise SystemExit("--predict needs MODEL_PATH to point at published models")
+
+    timer.wrap(pipeline.fetcher, "fetch_all_data", "fetch")
+    timer.wrap(pipeline.ohlcv_sync, "sync_many", "sync")
+    timer.wrap(pipeline.feature_engineer, "update_technical_indicators", "features")
+    timer.wrap(pipeline, "_store_data", "store")
+    timer.wrap(pipeline, "_predict", "predict")
+    timer.wrap(realtime, "broadcast_updates", "broadcast")
+    return pipeline.process_update
+
+
+async def run(args) -> Dict:
+    fetcher, symbols = build_fetcher(args)
+    timer = StageTimer()
+    cycle = build_pipeline(args, fetcher, symbols, timer)
+
+    try:
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            await cycle()
+            timer.add("cycle", time.perf_counter() - start)
+            timer.end_cycle()
+            await asyncio.sleep(args.interval)
+    finally:
+        await fetcher.close()
+
+    cycle_p50 = float(np.median(timer.samples["cycle"]))
+    return {
+        "pipeline": args.pipeline,
+        "symbols": len(symbols),
+        "cycles": args.cycles,
+        "symbols_per_second": round(len(symbols) / cycle_p50, 1),
+        "stages": {name: summarize(v) for name, v in timer.samples.items()},
+    }
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_database(
+            args.database or f"sqlite:///{os.path.join(tmp, 'benchmark.db')}"
+        )
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
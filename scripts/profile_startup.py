@@ -0,0 +1,102 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_MODULES = ["src.api.main", "src.api.routers.markets", "src.tasks"]
+
+# Subsystems that should only load once a request or task needs them
+HEAVY = [
+    "tensorflow",
+    "sklearn",
+    "joblib",
+    "ccxt",
+    "binance",
+    "vaderSentiment",
+    "textblob",
+]
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Report import time, memory and heavy dependencies per entry point."
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    return parser.parse_args()
+
+
+def slowest_imports(stderr: str, top: int) -> List[Dict]:
+    """Dependencies by the import time they add, from `-X importtime`.
+
+    A package is charged the cumulative time of every import entering it
+    from outside, so times include what the package itself imports and can
+    overlap. The project's own modules are not ranked.
+    """
+    entries = [
+        ((len(indent) - 1) // 2, name, int(cumulative_us))
+        for _, cumulative_us, indent, name in IMPORTTIME.findall(stderr)
+    ]
+    totals: Dict[str, int] = {}
+    parents: List[str] = []
+    # Output is post-order; reversed, every parent precedes its children
+    for depth, name, cumulative_us in reversed(entries):
+        del parents[depth:]
+        package = name.split(".")[0]
+        if package not in parents:
+            totals[package] = totals.get(package, 0) + cumulative_us
+        parents.append(package)
+    totals.pop("src", None)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [{"package": name, "ms": round(us / 1000, 1)} for name, us in ranked[:top]]
+
+
+def profile(module: str, top: int) -> Dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr else "failed"
+        return {"module": module, "error": error}
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    loaded = {name.split(".")[0] for name in probe["modules"]}
+    return {
+        "module": module,
+        "import_seconds": round(probe["seconds"], 3),
+        "max_rss_mb": round(probe["max_rss_mb"], 1),
+        "heavy_loaded": [name for name in HEAVY if name in loaded],
+        "slowest": slowest_imports(result.stderr, top),
+    }
+
+
+def main():
+    args = parse_args()
+    print(json.dumps([profile(module, args.top) for module in args.modules], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,56 +3,64 @@ from typing import Dict, List
 from fastapi import Depends, FastAPI, HTTPException, WebSocket
 from sqlalchemy.orm import Session
 
+from src.api.routers import markets
 from src.api.websocket import broadcast_updates, handle_websocket
 from src.db.database import get_db
-from src.pipeline.data_pipeline import DataPipeline
-from src.pipeline.training_pipeline import TrainingPipeline
+from src.ml.batch_inference import get_prediction_batcher
+from src.ml.indicator_cache import get_indicator_cache
+from src.pipeline.data_pipeline import get_data_pipeline
+from src.pipeline.training_pipeline import get_training_pipeline
 
+# Pipelines are created on first use, so workers boot without TensorFlow,
+# scikit-learn or ccxt and only load what the requests they serve need.
 app = FastAPI(title="Crypto Market Pulse API")
-data_pipeline = DataPipeline()
-training_pipeline = TrainingPipeline()
+app.include_router(markets.router)
 
 
 @app.get("/markets/{symbol}/prediction")
 async def get_prediction(symbol: str, db: Session = Depends(get_db)):
     """Get price prediction for a specific symbol."""
     try:
-        latest_data = data_pipeline.get_latest_data(db, symbol, limit=100)
-        if not latest_data:
+        data_pipeline = get_data_pipeline()
+        df = data_pipeline.latest_candles(db, symbol, limit=100)
+        if df.empty:
             raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
 
-        # Convert to format needed for prediction
-        df = pd.DataFrame(
-            [
-                {
-                    "timestamp": d.timestamp,
-                    "open": d.open,
-                    "high": d.high,
-                    "low": d.low,
-                    "close": d.close,
-                    "volume": d.volume,
-                }
-                for d in latest_data
-            ]
-        )
-
-        prediction = training_pipeline.predictor.predict(df)
+        predictor = get_training_pipeline().predictor_for(symbol)
+        if predictor is None:
+            raise HTTPException(
+                status_code=503, detail=f"No trained model for {symbol}"
+            )
+        df = data_pipeline.indicators(symbol, df, predictor.required_features)
+        # Concurrent requests are predicted together when batching is enabled
+        batcher = get_prediction_batcher()
+        if batcher is not None:
+            return await batcher.predict(predictor, df.dropna())
+        prediction = predictor.predict(df.dropna())
         return prediction
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/cache/indicators")
+def get_indicator_cache_stats():
+    """Hit/miss counters and size of the shared indicator cache."""
+    return get_indicator_cache().stats()
+
+
 @app.get("/markets/available")
 def get_available_markets():
     """Get list of available market symbols."""
-    return {"symbols": data_pipeline.symbols}
+    return {"symbols": get_data_pipeline().symbols}
 
 
 @app.get("/markets/{symbol}/data")
 def get_market_data(symbol: str, limit: int = 100, db: Session = Depends(get_db)):
     """Get historical market data for a symbol."""
-    data = data_pipeline.get_latest_data(db, symbol, limit)
+    data = get_data_pipeline().get_latest_data(db, symbol, limit)
     return {"data": data}
 
 
@@ -60,7 +68,7 @@ def get_market_data(symbol: str, limit: int = 100, db: Session = Depends(get_db)
 async def start_training(symbols: List[str], db: Session = Depends(get_db)):
     """Start training models for specified symbols."""
     try:
-        results = await training_pipeline.train_all_models(db, symbols)
+        results = await get_training_pipeline().train_all_models(db, symbols)
         return {"training_results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,26 +1,56 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from src.db.database import get_db
-from src.pipeline.data_pipeline import DataPipeline
+from src.ml.correlation import get_correlation_engine
+from src.ml.indicator_engine import INDICATOR_COLUMNS
+from src.pipeline.data_pipeline import get_data_pipeline
 
 router = APIRouter(prefix="/markets", tags=["markets"])
-data_pipeline = DataPipeline()
 
 
 @router.get("/symbols")
 def get_symbols():
     """Get list of available trading symbols."""
-    return {"symbols": data_pipeline.symbols}
+    return {"symbols": get_data_pipeline().symbols}
+
+
+@router.get("/correlation")
+def get_correlation(
+    half_life: Optional[float] = None, symbols: Optional[List[str]] = Query(None)
+):
+    """Get the latest EWMA correlation matrix across tracked symbols."""
+    engine = get_correlation_engine()
+    if not engine.bars:
+        raise HTTPException(status_code=404, detail="No correlation data yet")
+    try:
+        return engine.snapshot(half_life, symbols)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
 
 
 @router.get("/{symbol}/indicators")
 def get_technical_indicators(symbol: str, db: Session = Depends(get_db)):
     """Get latest technical indicators for a symbol."""
     try:
-        # Implementation here
-        pass
+        data_pipeline = get_data_pipeline()
+        df = data_pipeline.latest_candles(db, symbol, limit=100)
+        if df.empty:
+            raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
+
+        latest = data_pipeline.indicators(symbol, df).iloc[-1]
+        return {
+            "symbol": symbol,
+            "timestamp": latest.name,
+            "indicators": {
+                name: None if pd.isna(latest[name]) else float(latest[name])
+                for name in INDICATOR_COLUMNS
+            },
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,17 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.risk import risk_metrics
+
+
 class MarketAnalyzer:
-    def __init__(self):
+    def __init__(self, benchmark="BTC", risk_window=30, confidence=0.95):
         self.indicators = ["rsi", "macd", "volume"]
+        self.benchmark = benchmark
+        self.risk_window = risk_window
+        self.confidence = confidence
 
     def analyze(self, data):
+        risk = self.risk_analysis(data)
         results = {}
         for symbol, symbol_data in data.items():
             results[symbol] = {
                 "technical": self.technical_analysis(symbol_data),
                 "sentiment": self.sentiment_analysis(symbol_data),
-                "risk": self.risk_analysis(symbol_data),
+                "risk": risk.get(symbol, {}),
             }
         return results
 
+    def risk_analysis(self, data):
+        """Risk metrics for the whole universe in one batch.
+
+        Closing prices (`symbol_data["market"]["prices"]`) are aligned on
+        their timestamps and restricted to the bars every symbol has, so
+        every symbol is scored in a single vectorized pass. Timestamps come
+        from the index of a `pd.Series`, or from `market["timestamps"]`;
+        plain price lists without timestamps must all end at the same bar.
+        `risk_score` ranks each symbol's CVaR within the universe, from 0
+        (safest) to 1 (riskiest).
+        """
+        series = {}
+        for symbol, symbol_data in data.items():
+            market = symbol_data.get("market", {})
+            prices = market.get("prices", ())
+            if len(prices) <= self.risk_window:
+                continue
+            if not isinstance(prices, pd.Series):
+                index = market.get("timestamps")
+                if index is None:
+                    index = pd.RangeIndex(-len(prices), 0)
+                prices = pd.Series(np.asarray(prices, float), index=index)
+            series[symbol] = prices[~prices.index.duplicated(keep="last")]
+        if not series:
+            return {}
+
+        frame = pd.concat(series, axis=1, join="inner").sort_index()
+        if len(frame) <= self.risk_window:
+            return {}
+        symbols = list(frame.columns)
+        prices = frame.to_numpy(dtype=float).T
+        benchmark = symbols.index(self.benchmark) if self.benchmark in series else None
+        metrics = risk_metrics(
+            prices, benchmark, confidence=self.confidence, window=self.risk_window
+        )
+        ranks = metrics["cvar"].argsort().argsort()
+        metrics["risk_score"] = ranks / max(len(symbols) - 1, 1)
+
+        return {
+            symbol: {name: float(values[i]) for name, values in metrics.items()}
+            for i, symbol in enumerate(symbols)
+        }
+
     def check_alerts(self, analysis):
         # Implement alert checking
         pass
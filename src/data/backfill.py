@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+from src.data.candle_store import CandleStore
+from src.data.fetcher import CryptoDataFetcher
+from src.db.database import SessionLocal
+from src.db.models import CryptoPrice
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def find_gaps(
+    timestamps: Iterable[int], start: int, end: int, step: int
+) -> List[Tuple[int, int]]:
+    """Return the [start, end) millisecond ranges with no candle in them."""
+    existing = np.unique(np.asarray(list(timestamps), dtype=np.int64))
+    existing = existing[(existing >= start) & (existing < end)]
+    # Align to candle boundaries so partial overlaps are not treated as gaps
+    start = start - start % step
+    boundaries = np.concatenate([[start - step], existing, [end]])
+
+    gaps = []
+    for prev, nxt in zip(boundaries[:-1], boundaries[1:]):
+        if nxt - prev > step:
+            gaps.append((int(prev + step), int(nxt)))
+    return gaps
+
+
+def split_range(
+    start: int, end: int, step: int, chunk_candles: int
+) -> List[Tuple[int, int]]:
+    """Split a [start, end) range into chunks of at most `chunk_candles` candles."""
+    span = step * chunk_candles
+    return [(s, min(s + span, end)) for s in range(start, end, span)]
+
+
+class BackfillCheckpoint:
+    """JSON record of completed chunks for one symbol and timeframe."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.completed: Set[int] = set()
+        if path.exists():
+            with open(path, "r") as f:
+                self.completed = set(json.load(f).get("completed", []))
+
+    def is_done(self, chunk_start: int) -> bool:
+        return chunk_start in self.completed
+
+    def mark_done(self, chunk_start: int):
+        self.completed.add(chunk_start)
+        # Write then rename so an interrupted run never leaves a torn file
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "completed": sorted(self.completed),
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class DatabaseSink:
+    """Bulk-loads backfilled candles into `crypto_prices`."""
+
+    def existing_timestamps(
+        self, symbol: str, timeframe: str, start: int, end: int
+    ) -> List[int]:
+        with SessionLocal() as db:
+            rows = (
+                db.query(CryptoPrice.timestamp)
+                .filter(
+                    CryptoPrice.symbol == symbol,
+                    CryptoPrice.timestamp >= pd.Timestamp(start, unit="ms"),
+                    CryptoPrice.timestamp < pd.Timestamp(end, unit="ms"),
+                )
+                .all()
+            )
+        return [int(pd.Timestamp(row[0]).value // 1_000_000) for row in rows]
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        records = [
+            {
+                "symbol": symbol,
+                "timestamp": timestamp.to_pydatetime(),
+                "open": float(row.open),
+                "high": float(row.high),
+                "low": float(row.low),
+                "close": float(row.close),
+                "volume": float(row.volume),
+            }
+            for timestamp, row in zip(df.index, df.itertuples(index=False))
+        ]
+        with SessionLocal() as db:
+            db.execute(insert(CryptoPrice), records)
+            db.commit()
+
+
+class CandleStoreSink:
+    """Appends backfilled candles to the columnar candle store."""
+
+    def __init__(self, store: CandleStore):
+        self.store = store
+
+    def existing_timestamps(
+        self, symbol: str, timeframe: str, start: int, end: int
+    ) -> List[int]:
+        timestamps = self.store.read_arrays(
+            symbol,
+            timeframe,
+            pd.Timestamp(start, unit="ms"),
+            pd.Timestamp(end, unit="ms"),
+        )["timestamp"]
+        return timestamps.astype("datetime64[ms]").astype(np.int64).tolist()
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        self.store.write(symbol, timeframe, df)
+
+
+class BackfillEngine:
+    """Downloads historical candles in parallel, resumably, filling only gaps.
+
+    A symbol x date range is diffed against the candles already stored, the
+    missing ranges are split into exchange-sized chunks and all chunks across
+    all symbols are downloaded concurrently under the fetcher's rate limiter.
+    Completed chunks are checkpointed, so an interrupted run resumes where it
+    stopped and ranges with no exchange data are not retried forever.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[CryptoDataFetcher] = None,
+        sink=None,
+        checkpoint_dir: str = "data/backfill",
+        chunk_candles: int = 1000,
+        max_parallel: int = 16,
+    ):
+        self.fetcher = fetcher or CryptoDataFetcher(max_concurrency=max_parallel)
+        self.sink = sink or DatabaseSink()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.chunk_candles = chunk_candles
+        self.max_parallel = max_parallel
+
+    def _checkpoint(self, symbol: str, timeframe: str) -> BackfillCheckpoint:
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{symbol.replace('/', '-')}_{timeframe}.json"
+        return BackfillCheckpoint(self.checkpoint_dir / name)
+
+    def plan(
+        self, symbol: str, timeframe: str, start: int, end: int
+    ) -> List[Tuple[int, int]]:
+        """Chunks of [start, end) still missing for a symbol."""
+        step = self.fetcher.exchange.parse_timeframe(timeframe) * 1000
+        existing = self.sink.existing_timestamps(symbol, timeframe, start, end)
+        checkpoint = self._checkpoint(symbol, timeframe)
+
+        chunks = []
+        for gap_start, gap_end in find_gaps(existing, start, end, step):
+            for chunk in split_range(gap_start, gap_end, step, self.chunk_candles):
+                if not checkpoint.is_done(chunk[0]):
+                    chunks.append(chunk)
+        return chunks
+
+    async def _run_chunk(
+        self,
+        semaphore: asyncio.Semaphore,
+        checkpoint: BackfillCheckpoint,
+        symbol: str,
+        timeframe: str,
+        chunk: Tuple[int, int],
+    ) -> int:
+        chunk_start, chunk_end = chunk
+        async with semaphore:
+            candles = await self.fetcher.fetch_ohlcv_chunk(
+                symbol, timeframe, since=chunk_start, limit=self.chunk_candles
+            )
+
+        df = pd.DataFrame(candles, columns=OHLCV_COLUMNS)
+        df = df[(df["timestamp"] >= chunk_start) & (df["timestamp"] < chunk_end)]
+        df = df.drop_duplicates("timestamp")
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        df.set_index("timestamp", inplace=True)
+
+        if not df.empty:
+            await asyncio.to_thread(self.sink.write, symbol, timeframe, df)
+        checkpoint.mark_done(chunk_start)
+        return len(df)
+
+    async def backfill(
+        self,
+        symbols: List[str],
+        start: datetime,
+        end: datetime,
+        timeframe: str = "1m",
+    ) -> Dict[str, Dict]:
+        """Fill [start, end) for all symbols and return per-symbol statistics."""
+        start_ms = int(pd.Timestamp(start).value // 1_000_000)
+        end_ms = int(pd.Timestamp(end).value // 1_000_000)
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        jobs, owners = [], []
+        for symbol in symbols:
+            checkpoint = self._checkpoint(symbol, timeframe)
+            chunks = self.plan(symbol, timeframe, start_ms, end_ms)
+            logger.info(f"{symbol}: {len(chunks)} chunks to backfill")
+            for chunk in chunks:
+                jobs.append(
+                    self._run_chunk(semaphore, checkpoint, symbol, timeframe, chunk)
+                )
+                owners.append(symbol)
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+
+        stats = {symbol: {"chunks": 0, "candles": 0, "errors": 0} for symbol in symbols}
+        for symbol, result in zip(owners, results):
+            if isinstance(result, Exception):
+                logger.error(f"Backfill chunk failed for {symbol}: {str(result)}")
+                stats[symbol]["errors"] += 1
+            else:
+                stats[symbol]["chunks"] += 1
+                stats[symbol]["candles"] += result
+        return stats
@@ -0,0 +1,206 @@
+import os
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+CANDLE_SCHEMA = pa.schema(
+    [("timestamp", pa.timestamp("ms"))]
+    + [(column, pa.float64()) for column in CANDLE_COLUMNS]
+)
+
+
+class CandleStore:
+    """Append-only columnar candle store on local disk.
+
+    Candles are partitioned as `<root>/<symbol>/<timeframe>/<YYYY-MM-DD>/` and
+    every write adds a new uncompressed Arrow IPC part file, so existing data
+    is never rewritten. Reads memory-map the part files and hand the column
+    buffers to numpy without copying whenever a day is a single sorted part.
+    `write` keeps reads on that path: a day is folded back into one part when
+    a write opens the next day, and the current day whenever it reaches
+    `max_parts_per_day` parts, so live data appended candle by candle never
+    fragments a day beyond that bound.
+    """
+
+    def __init__(self, root: str, max_parts_per_day: int = 16):
+        self.root = Path(root)
+        self.max_parts_per_day = max_parts_per_day
+
+    def _symbol_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.replace("/", "-") / timeframe
+
+    def _day_dirs(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Path]:
+        base = self._symbol_dir(symbol, timeframe)
+        if not base.exists():
+            return []
+        first = pd.Timestamp(start).date().isoformat() if start is not None else ""
+        # `end` is exclusive, so a range ending at midnight stays on its day
+        last = (
+            (pd.Timestamp(end) - pd.Timedelta(1, "ms")).date().isoformat()
+            if end is not None
+            else "9999"
+        )
+        return sorted(path for path in base.iterdir() if first <= path.name <= last)
+
+    @staticmethod
+    def _write_table(table: pa.Table, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        # Time-ordered names keep later writes winning when parts overlap
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.arrow"
+        tmp_path = directory / f".{name}.tmp"
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with ipc.new_file(sink, CANDLE_SCHEMA) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, directory / name)
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """Append candles indexed by timestamp, one part file per day touched."""
+        if df.empty:
+            return
+        df = df.sort_index()
+        timestamps = pd.DatetimeIndex(df.index)
+        # Epoch milliseconds via numpy, which works on pandas 1.x as well
+        millis = timestamps.values.astype("datetime64[ms]").astype(np.int64)
+        days = timestamps.normalize()
+
+        base = self._symbol_dir(symbol, timeframe)
+        for day in days.unique():
+            mask = days == day
+            arrays = [pa.array(millis[mask], type=pa.timestamp("ms"))]
+            arrays += [
+                pa.array(df[column].to_numpy(dtype=np.float64)[mask])
+                for column in CANDLE_COLUMNS
+            ]
+            table = pa.Table.from_arrays(arrays, schema=CANDLE_SCHEMA)
+            directory = base / day.date().isoformat()
+            new_day = not directory.exists()
+            self._write_table(table, directory)
+
+            if new_day:
+                # Day rollover: earlier days are closed, fold their parts
+                for other in self._day_dirs(symbol, timeframe, end=day):
+                    if other != directory:
+                        self._compact_day(symbol, timeframe, other)
+            elif len(list(directory.glob("part-*.arrow"))) >= self.max_parts_per_day:
+                self._compact_day(symbol, timeframe, directory)
+
+    @staticmethod
+    def _read_part(path: Path) -> pa.Table:
+        source = pa.memory_map(str(path), "r")
+        return ipc.open_file(source).read_all()
+
+    def _read_day(self, directory: Path) -> pa.Table:
+        parts = sorted(directory.glob("part-*.arrow"))
+        if len(parts) == 1:
+            return self._read_part(parts[0])
+        tables = [self._read_part(part) for part in parts]
+        return pa.concat_tables(tables) if tables else CANDLE_SCHEMA.empty_table()
+
+    def read_arrays(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Read candles in [start, end) as a dict of numpy column arrays."""
+        tables = [
+            self._read_day(day) for day in self._day_dirs(symbol, timeframe, start, end)
+        ]
+        table = pa.concat_tables(tables) if tables else CANDLE_SCHEMA.empty_table()
+
+        columns = {}
+        for name in CANDLE_SCHEMA.names:
+            chunked = table.column(name)
+            if chunked.num_chunks == 1:
+                # Zero-copy view over the memory-mapped buffer
+                columns[name] = chunked.chunk(0).to_numpy(zero_copy_only=True)
+            else:
+                columns[name] = chunked.to_numpy()
+
+        timestamps = columns["timestamp"]
+        keep = None
+        if len(timestamps) > 1 and not np.all(timestamps[1:] > timestamps[:-1]):
+            # Overlapping parts: keep the last write of every timestamp
+            order = np.argsort(timestamps, kind="stable")
+            sorted_ts = timestamps[order]
+            last = np.append(sorted_ts[1:] != sorted_ts[:-1], True)
+            keep = order[last]
+        if start is not None or end is not None:
+            ts = timestamps if keep is None else timestamps[keep]
+            lo = np.datetime64(pd.Timestamp(start), "ms") if start is not None else None
+            hi = np.datetime64(pd.Timestamp(end), "ms") if end is not None else None
+            left = 0 if lo is None else np.searchsorted(ts, lo, "left")
+            right = len(ts) if hi is None else np.searchsorted(ts, hi, "left")
+            keep = slice(left, right) if keep is None else keep[left:right]
+
+        if keep is not None:
+            columns = {name: values[keep] for name, values in columns.items()}
+        return columns
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Read candles in [start, end) as a DataFrame indexed by timestamp."""
+        columns = self.read_arrays(symbol, timeframe, start, end)
+        index = pd.DatetimeIndex(columns.pop("timestamp"), name="timestamp")
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def tail(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Read the most recent `limit` candles."""
+        days = self._day_dirs(symbol, timeframe)
+        frames, rows = [], 0
+        for directory in reversed(days):
+            day = date.fromisoformat(directory.name)
+            frame = self.read(symbol, timeframe, day, day + timedelta(days=1))
+            frames.insert(0, frame)
+            rows += len(frame)
+            if rows >= limit:
+                break
+        if not frames:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        return pd.concat(frames).iloc[-limit:]
+
+    def compact(self, symbol: str, timeframe: str):
+        """Merge each day's part files into a single sorted, de-duplicated part."""
+        for directory in self._day_dirs(symbol, timeframe):
+            self._compact_day(symbol, timeframe, directory)
+
+    def _compact_day(self, symbol: str, timeframe: str, directory: Path):
+        parts = sorted(directory.glob("part-*.arrow"))
+        if len(parts) < 2:
+            return
+        day = date.fromisoformat(directory.name)
+        columns = self.read_arrays(symbol, timeframe, day, day + timedelta(days=1))
+        table = pa.Table.from_arrays(
+            [pa.array(columns[name]) for name in CANDLE_SCHEMA.names],
+            schema=CANDLE_SCHEMA,
+        )
+        self._write_table(table, directory)
+        for part in parts:
+            part.unlink()
+
+
+def get_candle_store() -> Optional[CandleStore]:
+    """Candle store configured through CANDLE_STORE_PATH, if any."""
+    path = os.getenv("CANDLE_STORE_PATH")
+    return CandleStore(path) if path else None
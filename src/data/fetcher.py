@@ -1,30 +1,199 @@
+import asyncio
 import logging
+import random
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
 
-import ccxt
 import pandas as pd
-from binance.client import Client
-from binance.exceptions import BinanceAPIException
+
+from src.data.rate_limiter import TokenBucket, get_rate_limiter
+
+# ccxt and python-binance take over a second to import, so they are only
+# imported once an exchange or the Binance client is actually used.
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def ohlcv_weight(limit: int) -> int:
+    """Binance futures request weight of a klines call."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def spot_depth_weight(limit: int) -> int:
+    """Binance spot request weight of a depth call."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+def order_book_weight(limit: int) -> int:
+    """Binance futures request weight of a depth call."""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+async def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame()
+
+
+async def _empty_dict() -> Dict:
+    return {}
+
+
+def binance_exchange(request_timeout: float = 10.0):
+    """The ccxt Binance futures client the fetcher uses by default."""
+    import ccxt.async_support as ccxt
+
+    # Throttling is done by our shared token bucket; ccxt's own limiter
+    # serializes every call and would defeat the concurrent fan-out.
+    return ccxt.binance({
+        'enableRateLimit': False,
+        'timeout': int(request_timeout * 1000),
+        'options': {'defaultType': 'future'}
+    })
+
+
 class CryptoDataFetcher:
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {'defaultType': 'future'}
-        })
-        if api_key and api_secret:
-            self.binance_client = Client(api_key, api_secret)
-        else:
-            self.binance_client = None
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        max_concurrency: int = 16,
+        request_timeout: float = 10.0,
+        max_retries: int = 3,
+        rate_limiter: Optional[TokenBucket] = None,
+        exchange=None,
+    ):
+        # Any object with the ccxt async market-data interface can be passed
+        # as `exchange`, e.g. the simulators in `src.data.simulator`.
+        self._exchange = exchange
+        # The Binance client is async (aiohttp with a pooled keep-alive
+        # session) and created on first use, so depth fetches never block the
+        # event loop that also serves websocket clients and API requests.
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.binance_client = None
+        # asyncio primitives bind to the loop they first wait on, and callers
+        # such as Celery tasks run a new loop per asyncio.run, so the client
+        # lock and the concurrency semaphore are kept per running loop.
+        self._binance_client_locks: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+
+        exchange_id = exchange.id if exchange is not None else 'binance'
+        self.rate_limiter = rate_limiter or get_rate_limiter(exchange_id)
+        self.spot_rate_limiter = get_rate_limiter("binance_spot")
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def exchange(self):
+        if self._exchange is None:
+            self._exchange = binance_exchange(self.request_timeout)
+        return self._exchange
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _request(
+        self,
+        func: Callable[..., Awaitable],
+        *args,
+        weight: int = 1,
+        limiter: Optional[TokenBucket] = None,
+        **kwargs,
+    ):
+        """Run an exchange call under the concurrency cap and rate limiter.
+
+        Transient network failures and timeouts are retried with jittered
+        exponential backoff; other exchange errors are raised immediately.
+        """
+        import aiohttp
+        import ccxt.async_support as ccxt
+        from binance.exceptions import BinanceAPIException
+
+        semaphore = self._semaphore()
+        limiter = limiter or self.rate_limiter
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    await limiter.acquire(weight)
+                    return await asyncio.wait_for(
+                        func(*args, **kwargs), timeout=self.request_timeout
+                    )
+            except (
+                ccxt.NetworkError,
+                aiohttp.ClientError,
+                BinanceAPIException,
+                asyncio.TimeoutError,
+            ) as e:
+                if isinstance(e, BinanceAPIException) and e.status_code not in (
+                    418,
+                    429,
+                ):
+                    raise
+                if isinstance(e, (ccxt.RateLimitExceeded, BinanceAPIException)):
+                    limiter.penalize(5.0)
+                if attempt == self.max_retries:
+                    raise
+                delay = min(0.5 * 2**attempt, 8.0) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"{getattr(func, '__name__', 'request')} failed "
+                    f"({type(e).__name__}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = '1m',
+        limit: int = 1000,
+        since: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Fetch OHLCV data with error handling and retries.
 
-    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 1000) -> pd.DataFrame:
-        """Fetch OHLCV data with error handling and retries."""
+        When `since` (epoch milliseconds) is given only candles opening at or
+        after it are requested, and `limit` is shrunk to the number of candles
+        that can exist since then so the call stays at the lowest weight.
+        """
+        if since is not None:
+            step_ms = self.exchange.parse_timeframe(timeframe) * 1000
+            elapsed_ms = self.exchange.milliseconds() - since
+            limit = max(1, min(limit, elapsed_ms // step_ms + 2))
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = await self._request(
+                self.exchange.fetch_ohlcv,
+                symbol,
+                timeframe,
+                since=since,
+                limit=limit,
+                weight=ohlcv_weight(limit),
+            )
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
@@ -33,27 +202,106 @@ class CryptoDataFetcher:
             logger.error(f"Error fetching OHLCV data for {symbol}: {str(e)}")
             return pd.DataFrame()
 
+    async def fetch_ohlcv_chunk(
+        self, symbol: str, timeframe: str, since: int, limit: int = 1000
+    ) -> List[List]:
+        """Fetch raw candles starting at `since`.
+
+        Unlike `fetch_ohlcv` errors are raised rather than logged, so callers
+        such as the backfill engine can tell a failure from an empty range.
+        """
+        return await self._request(
+            self.exchange.fetch_ohlcv,
+            symbol,
+            timeframe,
+            since=since,
+            limit=limit,
+            weight=ohlcv_weight(limit),
+        )
+
+    @staticmethod
+    def _format_ticker(symbol: str, ticker: Dict, quote: Optional[Dict] = None) -> Dict:
+        quote = quote or {}
+        timestamp = ticker.get('timestamp') or quote.get('timestamp')
+        return {
+            'symbol': symbol,
+            'last': ticker['last'],
+            'bid': ticker.get('bid') or quote.get('bid'),
+            'ask': ticker.get('ask') or quote.get('ask'),
+            'volume': ticker['baseVolume'],
+            'change': ticker['percentage'],
+            'timestamp': (
+                datetime.fromtimestamp(timestamp / 1000)
+                if timestamp
+                else datetime.now()
+            )
+        }
+
+    def _supports(self, method: str) -> bool:
+        has = getattr(self.exchange, 'has', None)
+        if has is not None:
+            return bool(has.get(method))
+        # Simulators expose plain methods without a ccxt `has` table
+        name = ''.join('_' + c.lower() if c.isupper() else c for c in method)
+        return callable(getattr(self.exchange, name, None))
+
     async def fetch_ticker(self, symbol: str) -> Dict:
         """Fetch current ticker data with error handling."""
         try:
-            ticker = await self.exchange.fetch_ticker(symbol)
-            return {
-                'symbol': symbol,
-                'last': ticker['last'],
-                'bid': ticker['bid'],
-                'ask': ticker['ask'],
-                'volume': ticker['baseVolume'],
-                'change': ticker['percentage'],
-                'timestamp': datetime.fromtimestamp(ticker['timestamp'] / 1000)
-            }
+            ticker = await self._request(self.exchange.fetch_ticker, symbol)
+            return self._format_ticker(symbol, ticker)
         except Exception as e:
             logger.error(f"Error fetching ticker for {symbol}: {str(e)}")
             return {}
 
+    async def fetch_snapshots(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Fetch tickers for the whole symbol universe in bulk.
+
+        One all-symbol 24h ticker call plus, where the exchange supports it,
+        one all-symbol best bid/ask call replace a request per symbol; Binance
+        futures tickers carry no bid/ask, so the book ticker fills them in.
+        Symbols the bulk calls do not return fall back to `fetch_ticker`.
+        """
+        tickers, quotes = {}, {}
+        if self._supports('fetchTickers'):
+            requests = [
+                self._request(self.exchange.fetch_tickers, symbols, weight=40)
+            ]
+            if self._supports('fetchBidsAsks'):
+                requests.append(
+                    self._request(self.exchange.fetch_bids_asks, symbols, weight=5)
+                )
+            results = await asyncio.gather(*requests, return_exceptions=True)
+            for result, name in zip(results, ('tickers', 'bids/asks')):
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching bulk {name}: {str(result)}")
+            if not isinstance(results[0], Exception):
+                tickers = results[0]
+            if len(results) > 1 and not isinstance(results[1], Exception):
+                quotes = results[1]
+
+        snapshots = {}
+        for symbol in symbols:
+            if symbol in tickers:
+                snapshots[symbol] = self._format_ticker(
+                    symbol, tickers[symbol], quotes.get(symbol)
+                )
+
+        missing = [symbol for symbol in symbols if symbol not in snapshots]
+        if missing:
+            fallback = await asyncio.gather(*(self.fetch_ticker(s) for s in missing))
+            snapshots.update(zip(missing, fallback))
+        return snapshots
+
     async def fetch_order_book(self, symbol: str, limit: int = 20) -> Dict:
         """Fetch order book data with error handling."""
         try:
-            order_book = await self.exchange.fetch_order_book(symbol, limit)
+            order_book = await self._request(
+                self.exchange.fetch_order_book,
+                symbol,
+                limit,
+                weight=order_book_weight(limit),
+            )
             return {
                 'symbol': symbol,
                 'bids': order_book['bids'],
@@ -64,31 +312,114 @@ class CryptoDataFetcher:
             logger.error(f"Error fetching order book for {symbol}: {str(e)}")
             return {}
 
-    def fetch_market_depth(self, symbol: str) -> Dict:
+    async def fetch_order_book_snapshot(self, symbol: str, limit: int = 1000) -> Dict:
+        """Fetch a deep order book snapshot carrying Binance's `lastUpdateId`.
+
+        Errors are raised so that a local order book can retry its resync.
+        """
+        order_book = await self._request(
+            self.exchange.fetch_order_book,
+            symbol,
+            limit,
+            weight=order_book_weight(limit),
+        )
+        return {
+            'lastUpdateId': order_book['nonce'],
+            'bids': order_book['bids'],
+            'asks': order_book['asks'],
+        }
+
+    async def _get_binance_client(self):
+        from binance import AsyncClient
+
+        loop = asyncio.get_running_loop()
+        lock = self._binance_client_locks.get(loop)
+        if lock is None:
+            lock = self._binance_client_locks[loop] = asyncio.Lock()
+        async with lock:
+            if self.binance_client is None:
+                self.binance_client = await AsyncClient.create(
+                    self.api_key, self.api_secret
+                )
+        return self.binance_client
+
+    async def fetch_market_depth(self, symbol: str, limit: int = 100) -> Dict:
         """Fetch market depth using Binance client if available."""
-        if not self.binance_client:
+        if not (self.api_key and self.api_secret):
             return {}
 
         try:
-            depth = self.binance_client.get_order_book(symbol=symbol)
+            client = await self._get_binance_client()
+            depth = await self._request(
+                client.get_order_book,
+                symbol=symbol.replace('/', ''),
+                limit=limit,
+                weight=spot_depth_weight(limit),
+                limiter=self.spot_rate_limiter,
+            )
             return {
                 'symbol': symbol,
                 'bids': depth['bids'],
                 'asks': depth['asks'],
                 'timestamp': datetime.now()
             }
-        except BinanceAPIException as e:
+        except Exception as e:
             logger.error(f"Error fetching market depth for {symbol}: {str(e)}")
             return {}
 
-    async def fetch_all_data(self, symbols: List[str]) -> Dict:
-        """Fetch all types of data for multiple symbols."""
-        results = {}
-        for symbol in symbols:
-            results[symbol] = {
-                'ohlcv': await self.fetch_ohlcv(symbol),
-                'ticker': await self.fetch_ticker(symbol),
-                'order_book': await self.fetch_order_book(symbol),
-                'market_depth': self.fetch_market_depth(symbol)
-            }
-        return results
\ No newline at end of file
+    async def _fetch_symbol_data(
+        self, symbol: str, include_ohlcv: bool = True, include_books: bool = True
+    ) -> Dict:
+        ohlcv = self.fetch_ohlcv(symbol) if include_ohlcv else _empty_frame()
+        ohlcv, order_book, market_depth = await asyncio.gather(
+            ohlcv,
+            self.fetch_order_book(symbol) if include_books else _empty_dict(),
+            self.fetch_market_depth(symbol) if include_books else _empty_dict(),
+        )
+        return {
+            'ohlcv': ohlcv,
+            'order_book': order_book,
+            'market_depth': market_depth
+        }
+
+    async def fetch_all_data(
+        self,
+        symbols: List[str],
+        include_ohlcv: bool = True,
+        skip_books: Iterable[str] = (),
+    ) -> Dict:
+        """Fetch all types of data for multiple symbols concurrently.
+
+        Callers that keep candles up to date through `OHLCVSync` pass
+        `include_ohlcv=False` to skip the full OHLCV download, and symbols
+        whose order book is maintained from a diff stream in `skip_books`
+        to skip their REST order book and depth calls.
+        """
+        skip_books = set(skip_books)
+        snapshots, *results = await asyncio.gather(
+            self.fetch_snapshots(symbols),
+            *(
+                self._fetch_symbol_data(symbol, include_ohlcv, symbol not in skip_books)
+                for symbol in symbols
+            )
+        )
+        for symbol, result in zip(symbols, results):
+            result['ticker'] = snapshots.get(symbol, {})
+        return dict(zip(symbols, results))
+
+    async def fetch_multiple_symbols(
+        self, symbols: List[str], timeframe: str = '1m', limit: int = 1000
+    ) -> Dict[str, pd.DataFrame]:
+        """Fetch OHLCV data for multiple symbols concurrently."""
+        results = await asyncio.gather(
+            *(self.fetch_ohlcv(symbol, timeframe, limit) for symbol in symbols)
+        )
+        return dict(zip(symbols, results))
+
+    async def close(self):
+        """Release the exchange and Binance client HTTP sessions."""
+        if self._exchange is not None:
+            await self._exchange.close()
+        if self.binance_client is not None:
+            await self.binance_client.close_connection()
+            self.binance_client = None
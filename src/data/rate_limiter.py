@@ -0,0 +1,75 @@
+import asyncio
+import time
+import weakref
+from typing import Dict
+
+# Request weight budgets per exchange, expressed as (weight, seconds). Binance
+# USD-M futures allow 2400 weight per minute per IP; we keep a 10% margin so
+# that other processes sharing the IP do not push us into HTTP 429/418 bans.
+EXCHANGE_WEIGHT_LIMITS = {
+    "binance": (2400 * 0.9, 60.0),
+    "binance_spot": (6000 * 0.9, 60.0),
+    # The local simulator has no limits; this only keeps the bucket finite.
+    "simulator": (1e9, 1.0),
+}
+
+
+class TokenBucket:
+    """Asyncio token bucket limiting request weight spent per time window."""
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)  # tokens per second
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        # asyncio.Lock binds to the loop it first waits on, so keep one per loop
+        # for buckets shared by pipelines run under successive asyncio.run calls.
+        self._locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def per_window(cls, weight: float, seconds: float) -> "TokenBucket":
+        return cls(capacity=weight, refill_rate=weight / seconds)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def _loop_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def acquire(self, weight: float = 1.0):
+        """Wait until `weight` tokens are available and consume them."""
+        if weight > self.capacity:
+            raise ValueError(
+                f"Request weight {weight} exceeds bucket capacity {self.capacity}"
+            )
+        # Holding the lock while sleeping keeps waiters FIFO: a heavy request
+        # cannot be starved by a stream of light ones.
+        async with self._loop_lock():
+            self._refill()
+            while self.tokens < weight:
+                await asyncio.sleep((weight - self.tokens) / self.refill_rate)
+                self._refill()
+            self.tokens -= weight
+
+    def penalize(self, seconds: float):
+        """Drain the bucket after the exchange reports a rate-limit violation."""
+        self._refill()
+        self.tokens = -seconds * self.refill_rate
+
+
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(exchange_id: str) -> TokenBucket:
+    """Return the process-wide limiter shared by every client of an exchange."""
+    if exchange_id not in _limiters:
+        weight, seconds = EXCHANGE_WEIGHT_LIMITS.get(exchange_id, (1200.0, 60.0))
+        _limiters[exchange_id] = TokenBucket.per_window(weight, seconds)
+    return _limiters[exchange_id]
@@ -0,0 +1,314 @@
+import asyncio
+import bisect
+import json
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+RECORDED_METHODS = ("fetch_ohlcv", "fetch_ticker", "fetch_tickers", "fetch_order_book")
+
+MINUTE_MS = 60_000
+
+
+def parse_timeframe(timeframe: str) -> int:
+    """Timeframe length in seconds, matching ccxt's `parse_timeframe`."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    return int(timeframe[:-1]) * units[timeframe[-1]]
+
+
+class SimulatedClock:
+    """Simulation time in epoch milliseconds advancing `speed` times wall time."""
+
+    def __init__(self, start_ms: int, speed: float = 1.0):
+        self.start_ms = start_ms
+        self.speed = speed
+        self._wall_start = time.monotonic()
+
+    def milliseconds(self) -> int:
+        elapsed = time.monotonic() - self._wall_start
+        return self.start_ms + int(elapsed * self.speed * 1000)
+
+
+class RecordingExchange:
+    """Wraps a ccxt async exchange and appends every market-data call to disk.
+
+    Each call is written as one JSON line holding the method, its arguments,
+    the wall-clock time and the raw result, for `ReplayExchange` to serve.
+    """
+
+    def __init__(self, exchange, path: str):
+        self.exchange = exchange
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if name not in RECORDED_METHODS:
+            return attr
+
+        async def recorded(*args, **kwargs):
+            result = await attr(*args, **kwargs)
+            record = {
+                "method": name,
+                "args": list(args),
+                "kwargs": kwargs,
+                "t": self.exchange.milliseconds(),
+                "result": result,
+            }
+            self._file.write(json.dumps(record, default=str) + "\n")
+            return result
+
+        return recorded
+
+    async def close(self):
+        self._file.close()
+        await self.exchange.close()
+
+
+class ReplayExchange:
+    """Serves a recorded session back through the ccxt market-data interface.
+
+    The recording is replayed on a simulated clock running `speed` times wall
+    time; each call returns the latest recorded response for that method and
+    symbol at the current simulated time. `symbol_count` clones the recorded
+    symbols under synthetic names (e.g. `SIM0042/USDT`) so a session recorded
+    for a handful of pairs can drive a much larger universe.
+    """
+
+    id = "simulator"
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        symbol_count: Optional[int] = None,
+        latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.records: Dict[tuple, List[dict]] = defaultdict(list)
+        with open(path, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                args = record["args"]
+                symbol = args[0] if args and isinstance(args[0], str) else None
+                self.records[(record["method"], symbol)].append(record)
+        for records in self.records.values():
+            records.sort(key=lambda r: r["t"])
+        self._times = {key: [r["t"] for r in rs] for key, rs in self.records.items()}
+
+        start = min(rs[0]["t"] for rs in self.records.values())
+        self.clock = SimulatedClock(start, speed)
+
+        recorded = sorted({symbol for _, symbol in self.records if symbol is not None})
+        self.aliases = {symbol: symbol for symbol in recorded}
+        if symbol_count and symbol_count > len(recorded):
+            for i in range(symbol_count - len(recorded)):
+                alias = f"SIM{i:04d}/USDT"
+                self.aliases[alias] = recorded[i % len(recorded)]
+        self.symbols = list(self.aliases)
+
+    parse_timeframe = staticmethod(parse_timeframe)
+
+    def milliseconds(self) -> int:
+        return self.clock.milliseconds()
+
+    def _lookup(self, method: str, symbol: Optional[str]) -> dict:
+        key = (method, self.aliases.get(symbol, symbol))
+        if key not in self.records:
+            raise KeyError(f"No recorded {method} responses for {symbol}")
+        i = bisect.bisect_right(self._times[key], self.milliseconds()) - 1
+        return self.records[key][max(i, 0)]["result"]
+
+    async def _respond(self, method: str, symbol: Optional[str]):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._lookup(method, symbol)
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        candles = await self._respond("fetch_ohlcv", symbol)
+        if since is not None:
+            candles = [c for c in candles if c[0] >= since]
+        return candles[:limit] if limit else candles
+
+    async def fetch_ticker(self, symbol):
+        if ("fetch_ticker", self.aliases.get(symbol, symbol)) in self.records:
+            ticker = dict(await self._respond("fetch_ticker", symbol))
+        else:
+            tickers = await self._respond("fetch_tickers", None)
+            ticker = dict(tickers[self.aliases.get(symbol, symbol)])
+        ticker["symbol"] = symbol
+        return ticker
+
+    async def fetch_tickers(self, symbols=None):
+        symbols = symbols or self.symbols
+        return {symbol: await self.fetch_ticker(symbol) for symbol in symbols}
+
+    async def fetch_order_book(self, symbol, limit=None):
+        book = dict(await self._respond("fetch_order_book", symbol))
+        book["bids"], book["asks"] = book["bids"][:limit], book["asks"][:limit]
+        return book
+
+    async def close(self):
+        pass
+
+
+class SyntheticExchange:
+    """ccxt-compatible exchange generating geometric Brownian motion markets.
+
+    Every symbol gets a deterministic one-minute GBM path (seeded from the
+    symbol name) that is extended lazily as the simulated clock advances, so
+    any number of symbols can be served at 1x-1000x speed without a network.
+    """
+
+    id = "simulator"
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        symbol_count: int = 8,
+        speed: float = 1.0,
+        history: int = 1500,
+        volatility: float = 0.8,
+        drift: float = 0.0,
+        latency: float = 0.0,
+        seed: int = 42,
+        start_ms: Optional[int] = None,
+    ):
+        self.symbols = symbols or [f"SIM{i:04d}/USDT" for i in range(symbol_count)]
+        self.history = history
+        self.latency = latency
+        self.seed = seed
+        # Annualized GBM parameters scaled to one-minute steps
+        minutes_per_year = 365 * 24 * 60
+        self.sigma = volatility / np.sqrt(minutes_per_year)
+        self.mu = drift / minutes_per_year - 0.5 * self.sigma**2
+
+        if start_ms is None:
+            now = int(time.time() * 1000)
+            start_ms = now - now % MINUTE_MS
+        self.clock = SimulatedClock(start_ms, speed)
+        self.origin = self.clock.start_ms - history * MINUTE_MS
+        self._paths: Dict[str, np.ndarray] = {}
+        self._rngs: Dict[str, np.random.Generator] = {}
+
+    parse_timeframe = staticmethod(parse_timeframe)
+
+    def milliseconds(self) -> int:
+        return self.clock.milliseconds()
+
+    def _candles(self, symbol: str, upto: int) -> np.ndarray:
+        """One-minute candles [ts, o, h, l, c, v] from the origin through `upto`."""
+        count = (upto - self.origin) // MINUTE_MS + 1
+        path = self._paths.get(symbol)
+        if path is not None and len(path) >= count:
+            return path[:count]
+
+        if symbol not in self._rngs:
+            self._rngs[symbol] = np.random.default_rng(
+                [self.seed, zlib.crc32(symbol.encode())]
+            )
+        rng = self._rngs[symbol]
+        have = 0 if path is None else len(path)
+        n = count - have
+
+        last_close = path[-1, 4] if have else 10 ** rng.uniform(-1, 4)
+        returns = self.mu + self.sigma * rng.standard_normal(n)
+        closes = last_close * np.exp(np.cumsum(returns))
+        opens = np.concatenate([[last_close], closes[:-1]])
+        wick = np.abs(rng.standard_normal((2, n))) * self.sigma * 0.5
+        highs = np.maximum(opens, closes) * np.exp(wick[0])
+        lows = np.minimum(opens, closes) * np.exp(-wick[1])
+        volumes = rng.lognormal(mean=3.0, sigma=1.0, size=n)
+        timestamps = self.origin + (have + np.arange(n)) * MINUTE_MS
+
+        block = np.column_stack([timestamps, opens, highs, lows, closes, volumes])
+        path = block if path is None else np.vstack([path, block])
+        self._paths[symbol] = path
+        return path
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _check_symbol(self, symbol: str):
+        if symbol not in self.symbols:
+            raise KeyError(f"Unknown symbol {symbol}")
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await self._delay()
+        self._check_symbol(symbol)
+        candles = self._candles(symbol, self.milliseconds())
+
+        step = parse_timeframe(timeframe) * 1000 // MINUTE_MS
+        if step > 1:
+            # Roll one-minute candles up into the requested timeframe
+            offset = (-(int(candles[0, 0]) // MINUTE_MS)) % step
+            groups = candles[offset:]
+            n = (len(groups) + step - 1) // step
+            starts = np.arange(n) * step
+            candles = np.column_stack(
+                [
+                    groups[starts, 0],
+                    groups[starts, 1],
+                    np.maximum.reduceat(groups[:, 2], starts),
+                    np.minimum.reduceat(groups[:, 3], starts),
+                    groups[np.minimum(starts + step, len(groups)) - 1, 4],
+                    np.add.reduceat(groups[:, 5], starts),
+                ]
+            )
+
+        if since is not None:
+            candles = candles[candles[:, 0] >= since]
+            candles = candles[:limit] if limit else candles
+        elif limit:
+            candles = candles[-limit:]
+        return [[int(row[0])] + row[1:].tolist() for row in candles]
+
+    async def fetch_ticker(self, symbol):
+        await self._delay()
+        self._check_symbol(symbol)
+        return self._ticker(symbol)
+
+    def _ticker(self, symbol: str) -> dict:
+        now = self.milliseconds()
+        candles = self._candles(symbol, now)
+        day = candles[-1440:]
+        last = float(day[-1, 4])
+        spread = last * 1e-4
+        return {
+            "symbol": symbol,
+            "timestamp": now,
+            "last": last,
+            "bid": last - spread / 2,
+            "ask": last + spread / 2,
+            "baseVolume": float(day[:, 5].sum()),
+            "percentage": float((last / day[0, 1] - 1) * 100),
+        }
+
+    async def fetch_tickers(self, symbols=None):
+        await self._delay()
+        return {symbol: self._ticker(symbol) for symbol in symbols or self.symbols}
+
+    async def fetch_order_book(self, symbol, limit=20):
+        await self._delay()
+        self._check_symbol(symbol)
+        ticker = self._ticker(symbol)
+        levels = np.arange(limit or 20)
+        tick = ticker["last"] * 1e-4
+        sizes = np.round(np.exp(levels / 5.0), 4).tolist()
+        return {
+            "symbol": symbol,
+            "timestamp": ticker["timestamp"],
+            # Stands in for Binance's lastUpdateId, which only ever increases
+            "nonce": ticker["timestamp"],
+            "bids": [[ticker["bid"] - i * tick, s] for i, s in zip(levels, sizes)],
+            "asks": [[ticker["ask"] + i * tick, s] for i, s in zip(levels, sizes)],
+        }
+
+    async def close(self):
+        pass
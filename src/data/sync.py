@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from src.data.fetcher import CryptoDataFetcher
+from src.db.models import SyncCursor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class OHLCVSync:
+    """Incrementally synchronizes OHLCV series using a per-symbol cursor.
+
+    The first sync of a symbol pulls `history` candles to warm up the series;
+    later syncs only request candles from the last one held in memory (which
+    is still open on the exchange) onwards and merge them in. The cursor marks
+    the last candle that was durably stored, so candles are handed out as
+    pending until `mark_stored` is called and are never lost on a failed write.
+    After a restart with a loaded cursor older than the warm-up window, the
+    first sync also pages forward from the cursor so downtime leaves no gap.
+    """
+
+    def __init__(
+        self, fetcher: CryptoDataFetcher, timeframe: str = "1m", history: int = 1000
+    ):
+        self.fetcher = fetcher
+        self.timeframe = timeframe
+        self.history = history
+        self.series: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self.cursors: Dict[Tuple[str, str], pd.Timestamp] = {}
+
+    def load_cursors(self, db: Session):
+        """Load persisted cursors so a restart does not re-store old candles."""
+        for cursor in db.query(SyncCursor).all():
+            key = (cursor.symbol, cursor.timeframe)
+            self.cursors[key] = pd.Timestamp(cursor.last_timestamp)
+
+    def mark_stored(
+        self, db: Session, symbol: str, timestamp, timeframe: Optional[str] = None
+    ):
+        """Advance the cursor; the caller commits it with the stored candles."""
+        timeframe = timeframe or self.timeframe
+        timestamp = pd.Timestamp(timestamp)
+        self.cursors[(symbol, timeframe)] = timestamp
+
+        cursor = (
+            db.query(SyncCursor)
+            .filter(SyncCursor.symbol == symbol, SyncCursor.timeframe == timeframe)
+            .one_or_none()
+        )
+        if cursor is None:
+            cursor = SyncCursor(symbol=symbol, timeframe=timeframe)
+            db.add(cursor)
+        cursor.last_timestamp = timestamp.to_pydatetime()
+        cursor.updated_at = datetime.utcnow()
+
+    def pending(self, symbol: str, timeframe: Optional[str] = None) -> pd.DataFrame:
+        """Closed candles newer than the stored cursor."""
+        key = (symbol, timeframe or self.timeframe)
+        series = self.series.get(key)
+        if series is None or series.empty:
+            return pd.DataFrame()
+
+        # The exchange always returns the in-progress candle last.
+        closed = series.iloc[:-1]
+        cursor = self.cursors.get(key)
+        if cursor is not None:
+            closed = closed[closed.index > cursor]
+        return closed
+
+    def merge(
+        self, symbol: str, candles: pd.DataFrame, timeframe: Optional[str] = None
+    ):
+        """Merge candles into a warmed-up series; newer values win."""
+        key = (symbol, timeframe or self.timeframe)
+        series = self.series.get(key)
+        if series is None or series.empty or candles.empty:
+            return
+        merged = pd.concat([series, candles])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        self.series[key] = self._trim(key, merged.sort_index())
+
+    def _trim(self, key: Tuple[str, str], series: pd.DataFrame) -> pd.DataFrame:
+        # Keep `history` candles, and every candle not yet stored past the cursor
+        keep = self.history
+        cursor = self.cursors.get(key)
+        if cursor is not None:
+            keep = max(keep, int((series.index > cursor).sum()))
+        return series.iloc[-keep:]
+
+    async def _fetch_gap(
+        self, symbol: str, timeframe: str, start: pd.Timestamp, end: pd.Timestamp
+    ) -> pd.DataFrame:
+        """Page candles forward from `start` until `end` is reached."""
+        pages = []
+        since = start
+        while since < end:
+            page = await self.fetcher.fetch_ohlcv(
+                symbol,
+                timeframe,
+                self.history,
+                since=int(since.value // 1_000_000),
+            )
+            if page.empty or page.index[-1] <= since:
+                logger.warning(
+                    f"Could not fill {symbol} {timeframe} candles from {since} "
+                    f"to {end}"
+                )
+                break
+            pages.append(page)
+            since = page.index[-1]
+        return pd.concat(pages) if pages else pd.DataFrame()
+
+    async def sync(
+        self, symbol: str, timeframe: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Bring a symbol up to date.
+
+        Returns the merged series (including the open candle) and the closed
+        candles that still have to be stored.
+        """
+        timeframe = timeframe or self.timeframe
+        key = (symbol, timeframe)
+        series = self.series.get(key)
+
+        if series is None or series.empty:
+            fresh = await self.fetcher.fetch_ohlcv(symbol, timeframe, self.history)
+            cursor = self.cursors.get(key)
+            if not fresh.empty and cursor is not None and cursor < fresh.index[0]:
+                gap = await self._fetch_gap(symbol, timeframe, cursor, fresh.index[0])
+                fresh = pd.concat([gap, fresh])
+                fresh = fresh[~fresh.index.duplicated(keep="last")].sort_index()
+            if not fresh.empty:
+                self.series[key] = self._trim(key, fresh)
+        else:
+            since = int(series.index[-1].value // 1_000_000)
+            fresh = await self.fetcher.fetch_ohlcv(
+                symbol, timeframe, self.history, since=since
+            )
+            self.merge(symbol, fresh, timeframe)
+
+        return self.series.get(key, pd.DataFrame()), self.pending(symbol, timeframe)
+
+    async def sync_many(
+        self, symbols: List[str], timeframe: Optional[str] = None
+    ) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Sync several symbols concurrently."""
+        results = await asyncio.gather(
+            *(self.sync(symbol, timeframe) for symbol in symbols)
+        )
+        return dict(zip(symbols, results))
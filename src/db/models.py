@@ -1,5 +1,5 @@
 from sqlalchemy import (Column, DateTime, Float, ForeignKey, Integer, String,
-                        create_engine)
+                        UniqueConstraint, create_engine)
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -29,3 +29,15 @@ class TechnicalIndicators(Base):
     bb_middle = Column(Float)
     bb_lower = Column(Float)
     atr = Column(Float)
+
+
+class SyncCursor(Base):
+    """Timestamp of the last stored candle per symbol and timeframe."""
+
+    __tablename__ = "sync_cursors"
+    __table_args__ = (UniqueConstraint("symbol", "timeframe"),)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    timeframe = Column(String, nullable=False)
+    last_timestamp = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
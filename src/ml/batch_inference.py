@@ -0,0 +1,207 @@
+"""Cross-symbol batched predictions.
+
+`BatchPredictor` predicts many symbols at once: their latest windows are
+scaled in one operation and stacked into one tensor, the LSTM runs a
+single forward pass over it (stacking the weights when symbols have
+separate models), and each distinct forest predicts all of its rows in
+one pass. `PredictionBatcher` coalesces concurrent single-symbol requests
+into such batches.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from src.ml.lstm_runtime import LSTMRuntime
+    from src.ml.predictor import MarketPredictor
+
+logger = logging.getLogger(__name__)
+
+Request = Tuple["MarketPredictor", pd.DataFrame]
+
+
+class BatchPredictor:
+    """Runs `MarketPredictor` predictions for many symbols together.
+
+    Results equal calling each predictor's `predict` on its own frame.
+    Requests that cannot join the batch (too little data, an untrained
+    model, or a window or LSTM shaped unlike the batch's first) fail
+    individually, as does every request of a forest that raises.
+    """
+
+    def __init__(self):
+        # The last stacked runtime, reused while the same models are batched
+        self._stacked: Tuple[tuple, Optional["LSTMRuntime"]] = ((), None)
+        self._lock = threading.Lock()
+
+    def predict(
+        self, requests: Mapping[Hashable, Request]
+    ) -> Tuple[Dict[Hashable, Dict], Dict[Hashable, Exception]]:
+        """Predict every `(predictor, frame)` request.
+
+        Returns the predictions and, separately, the error of each request
+        that could not be predicted (e.g. too little data).
+        """
+        keys: List[Hashable] = []
+        predictors: List["MarketPredictor"] = []
+        windows: List[np.ndarray] = []
+        failures: Dict[Hashable, Exception] = {}
+        shapes = None
+        for key, (predictor, data) in requests.items():
+            # Anything that would break the shared tensors fails its request only
+            try:
+                window = predictor.window(data)
+                if not hasattr(predictor.scaler, "mean_") or not hasattr(
+                    predictor.scaler, "scale_"
+                ):
+                    raise ValueError("Model has not been trained")
+                signature = (window.shape, _layer_shapes(predictor.lstm_runtime))
+                if shapes is not None and signature != shapes:
+                    raise ValueError("Model architecture differs from the batch")
+            except Exception as e:
+                failures[key] = e
+                continue
+            shapes = signature
+            keys.append(key)
+            predictors.append(predictor)
+            windows.append(window)
+        if not keys:
+            return {}, failures
+
+        # Every window scaled by its own model's scaler in one operation
+        means = np.stack([p.scaler.mean_ for p in predictors])[:, np.newaxis]
+        scales = np.stack([p.scaler.scale_ for p in predictors])[:, np.newaxis]
+        X = ((np.stack(windows) - means) / scales).astype(predictors[0].dtype)
+
+        lstm_pred = self._runtime(predictors).predict(X)
+
+        # Forests cannot be stacked; each predicts all of its rows at once
+        rows: Dict[int, List[int]] = {}
+        for i, predictor in enumerate(predictors):
+            rows.setdefault(id(predictor), []).append(i)
+        rf_pred = np.empty(len(keys))
+        rf_conf = np.empty(len(keys))
+        X_rf = X.reshape(len(keys), -1)
+        for indices in rows.values():
+            predictor = predictors[indices[0]]
+            try:
+                rf_pred[indices], rf_conf[indices] = predictor.rf_predict(X_rf[indices])
+            except Exception as e:
+                failures.update((keys[i], e) for i in indices)
+
+        results = {}
+        for i, (key, predictor) in enumerate(zip(keys, predictors)):
+            if key in failures:
+                continue
+            try:
+                results[key] = predictor.combine(lstm_pred[i], rf_pred[i], rf_conf[i])
+            except Exception as e:
+                failures[key] = e
+        return results, failures
+
+    def _runtime(self, predictors: List["MarketPredictor"]) -> "LSTMRuntime":
+        """One LSTM runtime for the batch, row `i` using `predictors[i]`'s model."""
+        from src.ml.lstm_runtime import LSTMRuntime
+
+        runtimes = tuple(predictor.lstm_runtime for predictor in predictors)
+        if all(runtime is runtimes[0] for runtime in runtimes):
+            return runtimes[0]
+        with self._lock:
+            cached, stacked = self._stacked
+            if len(cached) != len(runtimes) or any(
+                a is not b for a, b in zip(cached, runtimes)
+            ):
+                stacked = LSTMRuntime.stack(runtimes)
+                self._stacked = (runtimes, stacked)
+            return stacked
+
+
+def _layer_shapes(runtime: "LSTMRuntime") -> List[Tuple]:
+    """What must match for runtimes to be stacked into one forward pass."""
+    return [
+        (
+            layer["type"],
+            layer["kernel"].shape,
+            layer.get("return_sequences"),
+            layer.get("activation"),
+        )
+        for layer in runtime.layers
+    ]
+
+
+class PredictionBatcher:
+    """Coalesces concurrent predictions into `BatchPredictor` calls.
+
+    The first request of a batch waits up to `max_delay` seconds for others
+    to arrive (or until `max_batch` are queued). The batch then runs in a
+    worker thread, so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        max_delay: float = 0.005,
+        max_batch: int = 64,
+        batch_predictor: Optional[BatchPredictor] = None,
+    ):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.batch_predictor = batch_predictor or BatchPredictor()
+        self._pending: List[Tuple["MarketPredictor", pd.DataFrame, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def predict(self, predictor: "MarketPredictor", data: pd.DataFrame) -> Dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((predictor, data, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending: List):
+        requests = {
+            i: (predictor, data) for i, (predictor, data, _) in enumerate(pending)
+        }
+        try:
+            results, failures = await asyncio.get_running_loop().run_in_executor(
+                None, self.batch_predictor.predict, requests
+            )
+        except Exception as e:
+            logger.error(f"Batched prediction failed: {str(e)}")
+            results, failures = {}, dict.fromkeys(requests, e)
+        for i, (_, _, future) in enumerate(pending):
+            if future.done():
+                continue  # The request was cancelled while waiting
+            if i in results:
+                future.set_result(results[i])
+            else:
+                future.set_exception(failures[i])
+
+
+_batcher: Optional[PredictionBatcher] = None
+
+
+def get_prediction_batcher() -> Optional[PredictionBatcher]:
+    """Batcher for API predictions, if PREDICTION_BATCH_MS is set above zero."""
+    global _batcher
+    delay_ms = float(os.getenv("PREDICTION_BATCH_MS") or 0)
+    if delay_ms <= 0:
+        return None
+    if _batcher is None or _batcher.max_delay != delay_ms / 1000:
+        _batcher = PredictionBatcher(max_delay=delay_ms / 1000)
+    return _batcher
@@ -0,0 +1,137 @@
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+class CorrelationEngine:
+    """Streaming EWMA covariance and correlation across symbols.
+
+    Each closed bar updates the exponentially weighted means and the N x N
+    covariance of simple returns in O(N^2) for every configured half-life
+    (measured in bars), so the matrices never have to be rebuilt from
+    history. Symbols without a bar at a given step keep their rows as they
+    were; pairs report NaN until they have `min_periods` common returns.
+    Symbols can be added at any time.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str] = (),
+        half_lives: Sequence[float] = (30, 120, 480),
+        min_periods: int = 20,
+    ):
+        self.half_lives = tuple(half_lives)
+        self.decays = np.array([0.5 ** (1 / h) for h in self.half_lives])
+        self.min_periods = min_periods
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.mean = np.zeros((len(self.half_lives), 0))
+        self.cov = np.zeros((len(self.half_lives), 0, 0))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.last_price = np.zeros(0)
+        self.bars = 0
+        self.last_timestamp = None
+        self._lock = threading.Lock()
+        self.add_symbols(symbols)
+
+    def add_symbols(self, symbols: Iterable[str]):
+        new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+        if not new:
+            return
+        with self._lock:
+            n, grow = len(self.symbols), len(new)
+            for i, symbol in enumerate(new):
+                self.index[symbol] = n + i
+            self.symbols.extend(new)
+            self.mean = np.pad(self.mean, ((0, 0), (0, grow)))
+            self.cov = np.pad(self.cov, ((0, 0), (0, grow), (0, grow)))
+            self.counts = np.pad(self.counts, ((0, grow), (0, grow)))
+            self.last_price = np.pad(self.last_price, (0, grow), constant_values=np.nan)
+
+    def update(self, closes: Mapping[str, float], timestamp=None):
+        """Advance by one bar given the closes of the symbols that have it."""
+        self.add_symbols(closes)
+        prices = np.full(len(self.symbols), np.nan)
+        for symbol, close in closes.items():
+            prices[self.index[symbol]] = close
+
+        with self._lock:
+            r = prices / self.last_price - 1
+            self.last_price = np.where(np.isnan(prices), self.last_price, prices)
+            self._update_returns(r)
+            self.bars += 1
+            if timestamp is not None:
+                self.last_timestamp = timestamp
+
+    def _update_returns(self, r: np.ndarray):
+        valid = np.isfinite(r)
+        if not valid.any():
+            return
+        first = valid & (self.counts.diagonal() == 0)
+        pairs = np.outer(valid, valid)
+        # Incremental weighted covariance (West, 1979) for every decay at once
+        lam = self.decays[:, None]
+        delta = np.where(valid, r - self.mean, 0.0)
+        delta[:, first] = 0.0  # A symbol's first return seeds its mean
+        self.mean = np.where(valid, self.mean + (1 - lam) * delta, self.mean)
+        self.mean[:, first] = r[first]
+        outer = delta[:, :, None] * delta[:, None, :]
+        updated = lam[:, :, None] * (self.cov + (1 - lam[:, :, None]) * outer)
+        self.cov = np.where(pairs, updated, self.cov)
+        self.counts += pairs
+
+    def covariance(self, half_life: Optional[float] = None) -> np.ndarray:
+        h = self._half_life_index(half_life)
+        with self._lock:
+            cov = self.cov[h].copy()
+            cov[self.counts < self.min_periods] = np.nan
+        return cov
+
+    def correlation(self, half_life: Optional[float] = None) -> np.ndarray:
+        cov = self.covariance(half_life)
+        std = np.sqrt(np.diagonal(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        return np.clip(corr, -1.0, 1.0)
+
+    def _half_life_index(self, half_life: Optional[float]) -> int:
+        if half_life is None:
+            return 0
+        if half_life not in self.half_lives:
+            raise ValueError(
+                f"Unknown half-life {half_life}; expected one of {self.half_lives}"
+            )
+        return self.half_lives.index(half_life)
+
+    def snapshot(
+        self,
+        half_life: Optional[float] = None,
+        symbols: Optional[Sequence[str]] = None,
+    ) -> Dict:
+        """JSON-safe correlation matrix, optionally for a subset of symbols."""
+        corr = self.correlation(half_life)
+        symbols = list(self.symbols if symbols is None else symbols)
+        unknown = [s for s in symbols if s not in self.index]
+        if unknown:
+            raise KeyError(f"Untracked symbols: {', '.join(unknown)}")
+        rows = [self.index[s] for s in symbols]
+        corr = corr[np.ix_(rows, rows)]
+        return {
+            "half_life": self.half_lives[self._half_life_index(half_life)],
+            "bars": self.bars,
+            "timestamp": self.last_timestamp,
+            "symbols": symbols,
+            "matrix": np.where(np.isnan(corr), None, corr.round(4)).tolist(),
+        }
+
+
+_engine: Optional[CorrelationEngine] = None
+
+
+def get_correlation_engine() -> CorrelationEngine:
+    """The engine shared by the realtime pipeline and the API in this process."""
+    global _engine
+    if _engine is None:
+        _engine = CorrelationEngine()
+    return _engine
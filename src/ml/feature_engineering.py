@@ -1,12 +1,16 @@
-from typing import Dict
+from typing import Dict, Iterable
 
 import numpy as np
 import pandas as pd
-import ta
+
+from src.ml.feature_registry import FEATURES, FeatureRegistry
+from src.ml.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+from src.ml.regime import RegimeClassifier
 
 
 class FeatureEngineer:
-    def __init__(self):
+    def __init__(self, registry: FeatureRegistry = FEATURES):
+        self.registry = registry
         self.technical_features = [
             "rsi",
             "macd",
@@ -14,40 +18,61 @@ class FeatureEngineer:
             "atr",
             "volume_profile",
         ]
+        self.engines: Dict[str, IndicatorEngine] = {}
+        self.indicator_frames: Dict[str, pd.DataFrame] = {}
 
     def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicators to the dataframe."""
-        df = self._add_rsi(df)
-        df = self._add_macd(df)
-        df = self._add_bollinger_bands(df)
-        df = self._add_atr(df)
-        return df
+        return self.add_features(df, INDICATOR_COLUMNS)
 
-    def _add_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        df["rsi"] = ta.momentum.RSIIndicator(close=df["close"], window=period).rsi()
+    def add_features(self, df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+        """Add only the requested registry features to the dataframe."""
+        for name, values in self.registry.compute(df, names).items():
+            df[name] = values
         return df
 
-    def _add_macd(self, df: pd.DataFrame) -> pd.DataFrame:
-        macd = ta.trend.MACD(
-            close=df["close"], window_slow=26, window_fast=12, window_sign=9
-        )
-        df["macd"] = macd.macd()
-        df["macd_signal"] = macd.macd_signal()
-        df["macd_diff"] = macd.macd_diff()
-        return df
+    def compute_panel_indicators(
+        self, close: np.ndarray, high: np.ndarray, low: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Technical indicators for an aligned symbols x time panel.
 
-    def _add_bollinger_bands(self, df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
-        bollinger = ta.volatility.BollingerBands(close=df["close"], window=window)
-        df["bb_high"] = bollinger.bollinger_hband()
-        df["bb_mid"] = bollinger.bollinger_mavg()
-        df["bb_low"] = bollinger.bollinger_lband()
-        return df
+        Takes 2-D close/high/low arrays with one row per symbol (rows must
+        share timestamps and contain no gaps) and returns one array of the
+        same shape per indicator column, computed for all symbols at once.
+        """
+        close, high, low = (np.asarray(a, dtype=np.float64) for a in (close, high, low))
+        if close.ndim != 2 or not close.shape == high.shape == low.shape:
+            raise ValueError("close, high and low must be 2-D arrays of equal shape")
+        data = {"close": close, "high": high, "low": low}
+        return self.registry.compute(data, INDICATOR_COLUMNS)
 
-    def _add_atr(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
-        df["atr"] = ta.volatility.AverageTrueRange(
-            high=df["high"], low=df["low"], close=df["close"], window=period
-        ).average_true_range()
-        return df
+    def update_technical_indicators(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Incremental `add_technical_indicators` for a growing candle series.
+
+        All rows but the last are treated as closed and fed once into a
+        streaming engine kept under `key`; the last (open) candle is evaluated
+        without being consumed. The engine is rebuilt when the series no
+        longer contains the last candle it saw.
+        """
+        closed = df.iloc[:-1]
+        engine = self.engines.get(key)
+        if engine is None or engine.last_timestamp not in closed.index:
+            engine = self.engines[key] = IndicatorEngine()
+            frame = engine.run(closed)
+        else:
+            new_rows = closed[closed.index > engine.last_timestamp]
+            frame = pd.concat([self.indicator_frames[key], engine.run(new_rows)])
+        frame = frame.iloc[-len(closed) :] if len(closed) else frame
+        self.indicator_frames[key] = frame
+
+        values = frame.reindex(closed.index).to_numpy()
+        if len(df):
+            last = df.iloc[-1]
+            current = engine.peek(last["high"], last["low"], last["close"])
+            values = np.vstack([values, [current[c] for c in INDICATOR_COLUMNS]])
+        indicators = pd.DataFrame(values, index=df.index, columns=INDICATOR_COLUMNS)
+        df = df.drop(columns=INDICATOR_COLUMNS, errors="ignore")
+        return pd.concat([df, indicators], axis=1)
 
     def add_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add time-based features."""
@@ -58,17 +83,14 @@ class FeatureEngineer:
         return df
 
     def add_market_regime(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add market regime classification."""
-        # Volatility-based regime classification
-        volatility = df["close"].pct_change().rolling(window=30).std()
-        df["volatility_regime"] = pd.qcut(
-            volatility, q=3, labels=["low", "medium", "high"]
-        )
-
-        # Trend based on SMA
-        df["sma_50"] = df["close"].rolling(window=50).mean()
-        df["trend_regime"] = np.where(
-            df["close"] > df["sma_50"], "uptrend", "downtrend"
-        )
+        """Add market regime classification.
 
+        Rows are fed through a streaming `RegimeClassifier`, so each row's
+        volatility regime is judged against earlier volatility only.
+        """
+        rows = RegimeClassifier().run(df["close"].to_numpy())
+        regimes = pd.DataFrame(rows, index=df.index)
+        df["volatility_regime"] = regimes["volatility_regime"]
+        df["sma_50"] = regimes["sma_50"]
+        df["trend_regime"] = regimes["trend_regime"]
         return df
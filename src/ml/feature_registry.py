@@ -0,0 +1,163 @@
+"""Declarative feature registry.
+
+Each feature names the inputs it is computed from (raw columns such as
+`close`, or other features) and the parameters passed to its function.
+Requesting a set of features resolves the minimal dependency DAG, so only
+what is needed is computed and intermediates shared between features
+(the EMAs behind MACD, the rolling moments behind the Bollinger bands, the
+true range behind ATR) are evaluated exactly once.
+"""
+
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from src.ml import kernels
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    func: Callable
+    inputs: tuple
+    params: Dict[str, Any] = field(default_factory=dict)
+    public: bool = True  # False for intermediates not offered as columns
+
+    def evaluate(self, *args):
+        return self.func(*args, **self.params)
+
+
+class FeatureRegistry:
+    def __init__(self):
+        self.features: Dict[str, Feature] = {}
+
+    def register(
+        self,
+        name: str,
+        inputs: Iterable[str],
+        func: Optional[Callable] = None,
+        public: bool = True,
+        **params,
+    ):
+        """Register `func(*inputs, **params)` as `name`; usable as a decorator."""
+
+        def add(func: Callable) -> Callable:
+            if name in self.features:
+                raise ValueError(f"Feature {name} is already registered")
+            self.features[name] = Feature(name, func, tuple(inputs), params, public)
+            return func
+
+        return add if func is None else add(func)
+
+    def names(self) -> List[str]:
+        return [name for name, feature in self.features.items() if feature.public]
+
+    def plan(self, names: Iterable[str], columns: Iterable[str]) -> List[Feature]:
+        """Features needed for `names`, in evaluation order, each once.
+
+        Registered features are always computed; any other name must be one
+        of the available raw `columns`.
+        """
+        columns = set(columns)
+        order: List[Feature] = []
+        done, visiting = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            feature = self.features.get(name)
+            if feature is None:
+                if name not in columns:
+                    raise KeyError(f"Unknown feature or missing column: {name}")
+                done.add(name)
+                return
+            if name in visiting:
+                raise ValueError(f"Feature {name} depends on itself")
+            visiting.add(name)
+            for dependency in feature.inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(feature)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def compute(
+        self, data: Mapping[str, Any], names: Iterable[str]
+    ) -> Dict[str, np.ndarray]:
+        """Evaluate `names` from the raw columns in `data` (arrays or a frame)."""
+        names = list(names)
+        available = data.columns if hasattr(data, "columns") else data.keys()
+        values: Dict[str, Any] = {}
+
+        def value(name: str):
+            if name not in values:
+                values[name] = np.asarray(data[name])  # Raw column
+            return values[name]
+
+        for feature in self.plan(names, available):
+            values[feature.name] = feature.evaluate(*map(value, feature.inputs))
+        return {name: value(name) for name in names}
+
+
+def _band(moments, window_dev: float) -> np.ndarray:
+    mean, std = moments
+    return mean + window_dev * std
+
+
+FEATURES = FeatureRegistry()
+
+# Trend
+FEATURES.register("ema_12", ["close"], kernels.ema, span=12)
+FEATURES.register("ema_26", ["close"], kernels.ema, span=26)
+FEATURES.register("ema_50", ["close"], kernels.ema, span=50)
+FEATURES.register("sma_50", ["close"], kernels.sma, window=50)
+FEATURES.register("macd", ["ema_12", "ema_26"], np.subtract)
+# The signal line starts at the first defined MACD value
+FEATURES.register("macd_signal", ["macd"], kernels.ema, span=9, start=25)
+FEATURES.register("macd_diff", ["macd", "macd_signal"], np.subtract)
+
+# Momentum
+FEATURES.register("price_change", ["close"], kernels.price_change, public=False)
+FEATURES.register(
+    "avg_gain",
+    ["price_change"],
+    lambda change, period: kernels.wilder(np.maximum(change, 0.0), period),
+    public=False,
+    period=14,
+)
+FEATURES.register(
+    "avg_loss",
+    ["price_change"],
+    lambda change, period: kernels.wilder(np.maximum(-change, 0.0), period),
+    public=False,
+    period=14,
+)
+FEATURES.register("rsi", ["avg_gain", "avg_loss"], kernels.rsi_from_averages)
+FEATURES.register(
+    "stochastic",
+    ["high", "low", "close"],
+    kernels.stochastic,
+    public=False,
+    window=14,
+    smooth_window=3,
+)
+FEATURES.register("stoch_k", ["stochastic"], itemgetter(0))
+FEATURES.register("stoch_d", ["stochastic"], itemgetter(1))
+
+# Volatility
+FEATURES.register(
+    "close_moments_20", ["close"], kernels.rolling_mean_std, public=False, window=20
+)
+FEATURES.register("bb_mid", ["close_moments_20"], itemgetter(0))
+FEATURES.register("bb_high", ["close_moments_20"], _band, window_dev=2.0)
+FEATURES.register("bb_low", ["close_moments_20"], _band, window_dev=-2.0)
+FEATURES.register("true_range", ["high", "low", "close"], kernels.true_range)
+FEATURES.register("atr", ["true_range"], kernels.average_true_range, period=14)
+
+# Volume
+FEATURES.register("obv", ["close", "volume"], kernels.obv)
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+CacheKey = Tuple[str, str, pd.Timestamp, int, Tuple[str, ...]]
+
+
+class IndicatorCache:
+    """Process-wide LRU of computed indicator frames.
+
+    Entries are keyed by (symbol, timeframe, last candle timestamp, window
+    length, feature names), so repeated reads of the same candle window are
+    served from memory until a new candle arrives. Storing a window for a
+    newer candle, or calling `invalidate`, drops the stale entries of that
+    symbol. Eviction is least-recently-used, bounded both by entry count and
+    by the frames' total memory. Cached frames are shared: treat them as
+    read-only.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._latest: Dict[Tuple[str, str], pd.Timestamp] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        symbol: str, timeframe: str, candles: pd.DataFrame, names: Iterable[Hashable]
+    ) -> CacheKey:
+        return (symbol, timeframe, candles.index[-1], len(candles), tuple(names))
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        names: Iterable[str],
+        compute: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Return the cached frame for this window, computing it on a miss."""
+        if candles.empty:
+            return compute()
+        key = self.key(symbol, timeframe, candles, names)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        frame = compute()
+        self.put(key, frame)
+        return frame
+
+    def put(self, key: CacheKey, frame: pd.DataFrame):
+        symbol, timeframe, last_candle = key[:3]
+        size = int(frame.memory_usage(index=True).sum())
+        with self._lock:
+            latest = self._latest.get((symbol, timeframe))
+            if latest is not None and last_candle < latest:
+                return  # Computed from a window that is already outdated
+            if latest is None or last_candle > latest:
+                self._drop(symbol, timeframe, before=last_candle)
+                self._latest[(symbol, timeframe)] = last_candle
+
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (frame, size)
+            self.nbytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def invalidate(
+        self,
+        symbol: str,
+        timeframe: Optional[str] = None,
+        before: Optional[pd.Timestamp] = None,
+    ):
+        """Drop a symbol's entries, or only those older than `before`."""
+        with self._lock:
+            self._drop(symbol, timeframe, before)
+            if before is not None and timeframe is not None:
+                latest = self._latest.get((symbol, timeframe))
+                if latest is None or before > latest:
+                    self._latest[(symbol, timeframe)] = before
+
+    def _drop(self, symbol: str, timeframe: Optional[str], before):
+        for key in list(self._entries):
+            if key[0] != symbol or (timeframe is not None and key[1] != timeframe):
+                continue
+            if before is None or key[2] < before:
+                self.nbytes -= self._entries.pop(key)[1]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_cache: Optional[IndicatorCache] = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """The cache shared by every consumer in this process."""
+    global _cache
+    if _cache is None:
+        _cache = IndicatorCache()
+    return _cache
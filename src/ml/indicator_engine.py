@@ -0,0 +1,244 @@
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = [
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_diff",
+    "bb_high",
+    "bb_mid",
+    "bb_low",
+    "atr",
+]
+
+
+class EMA:
+    """Recursive exponential moving average seeded with the first value.
+
+    Matches pandas `ewm(alpha=..., adjust=False, min_periods=...)`.
+    """
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = math.nan
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        self.value = (
+            x if self.count == 0 else self.value + self.alpha * (x - self.value)
+        )
+        self.count += 1
+        return self.value if self.count >= self.min_periods else math.nan
+
+
+class RSI:
+    """Wilder RSI: gains and losses smoothed with alpha = 1 / period."""
+
+    def __init__(self, period: int = 14):
+        self.prev_close = math.nan
+        self.gain = EMA(1 / period, period)
+        self.loss = EMA(1 / period, period)
+
+    def update(self, close: float) -> float:
+        prev_close, self.prev_close = self.prev_close, close
+        # Like `ta`, the first candle counts as a zero change
+        change = 0.0 if math.isnan(prev_close) else close - prev_close
+        gain = self.gain.update(max(change, 0.0))
+        loss = self.loss.update(max(-change, 0.0))
+        if math.isnan(loss):
+            return math.nan
+        if loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+
+class ATR:
+    """Wilder ATR seeded with the mean of the first `period` true ranges.
+
+    Like `ta`, reports 0.0 until the seed is available.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = math.nan
+        self.value = 0.0
+        self.count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if not math.isnan(self.prev_close):
+            true_range = max(
+                true_range, abs(high - self.prev_close), abs(low - self.prev_close)
+            )
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.period:
+            self.value += true_range  # Running sum for the seed
+            return 0.0
+        if self.count == self.period:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+
+class RollingMoments:
+    """Mean and sum of squared deviations over a sliding window.
+
+    Both are updated as values enter and leave the window (Welford's
+    update), which avoids the cancellation error of a plain sum of squares
+    at crypto price levels.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def update(self, x: float):
+        self.values.append(x)
+        n = len(self.values)
+        if n <= self.window:
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values.popleft()
+            mean = self.mean + (x - old) / self.window
+            self.m2 += (x - old) * (x - mean + old - self.mean)
+            self.mean = mean
+
+    def variance(self, ddof: int = 0) -> float:
+        n = len(self.values)
+        if n <= ddof:
+            return math.nan
+        return max(self.m2, 0.0) / (n - ddof)
+
+
+class BollingerBands(RollingMoments):
+    """Rolling mean and population std bands over a fixed window."""
+
+    def __init__(self, window: int = 20, window_dev: float = 2.0):
+        super().__init__(window)
+        self.window_dev = window_dev
+
+    def update(self, close: float):
+        super().update(close)
+        if len(self.values) < self.window:
+            return math.nan, math.nan, math.nan
+        band = self.window_dev * math.sqrt(self.variance())
+        return self.mean + band, self.mean, self.mean - band
+
+
+class IndicatorEngine:
+    """Streaming RSI, MACD, Bollinger Bands and ATR for one series.
+
+    Each `update` costs O(1) regardless of how much history has been seen,
+    and the output matches `ta` and the batch kernels behind
+    `FeatureEngineer.add_technical_indicators` to floating-point tolerance.
+    `snapshot` and `restore` capture the full state as plain data, so an
+    engine can be persisted or used to evaluate a provisional candle with
+    `peek`.
+    """
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+        bb_window: int = 20,
+        bb_dev: float = 2.0,
+        atr_period: int = 14,
+    ):
+        self.rsi = RSI(rsi_period)
+        self.ema_fast = EMA(2 / (macd_fast + 1), macd_fast)
+        self.ema_slow = EMA(2 / (macd_slow + 1), macd_slow)
+        self.ema_signal = EMA(2 / (macd_signal + 1), macd_signal)
+        self.bollinger = BollingerBands(bb_window, bb_dev)
+        self.atr = ATR(atr_period)
+        self.last_timestamp: Optional[pd.Timestamp] = None
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """Advance the engine by one closed candle."""
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        macd = fast - slow
+        # The signal line starts with the first defined MACD value
+        signal = math.nan if math.isnan(macd) else self.ema_signal.update(macd)
+        bb_high, bb_mid, bb_low = self.bollinger.update(close)
+        return {
+            "rsi": self.rsi.update(close),
+            "macd": macd,
+            "macd_signal": signal,
+            "macd_diff": macd - signal,
+            "bb_high": bb_high,
+            "bb_mid": bb_mid,
+            "bb_low": bb_low,
+            "atr": self.atr.update(high, low, close),
+        }
+
+    def peek(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """Indicator values for a still-open candle, without consuming it."""
+        state = self.snapshot()
+        try:
+            return self.update(high, low, close)
+        finally:
+            self.restore(state)
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feed a frame of closed candles and return the indicator columns."""
+        rows = [
+            self.update(high, low, close)
+            for high, low, close in zip(
+                df["high"].to_numpy(np.float64),
+                df["low"].to_numpy(np.float64),
+                df["close"].to_numpy(np.float64),
+            )
+        ]
+        if len(df):
+            self.last_timestamp = df.index[-1]
+        return pd.DataFrame(rows, index=df.index, columns=INDICATOR_COLUMNS)
+
+    def snapshot(self) -> Dict:
+        state = {}
+        for name, indicator in vars(self).items():
+            if name == "last_timestamp":
+                state[name] = indicator
+            elif name == "rsi":
+                state[name] = {
+                    "prev_close": indicator.prev_close,
+                    "gain": dict(vars(indicator.gain)),
+                    "loss": dict(vars(indicator.loss)),
+                }
+            else:
+                fields = dict(vars(indicator))
+                if "values" in fields:
+                    fields["values"] = list(fields["values"])
+                state[name] = fields
+        return state
+
+    def restore(self, state: Dict):
+        for name, fields in state.items():
+            if name == "last_timestamp":
+                self.last_timestamp = fields
+            elif name == "rsi":
+                self.rsi.prev_close = fields["prev_close"]
+                vars(self.rsi.gain).update(fields["gain"])
+                vars(self.rsi.loss).update(fields["loss"])
+            else:
+                indicator = getattr(self, name)
+                vars(indicator).update(fields)
+                if "values" in fields:
+                    indicator.values = deque(fields["values"])
@@ -0,0 +1,271 @@
+"""Vectorized indicator kernels.
+
+Every kernel takes float32 or float64 arrays with time on the last axis, so
+the same call works on a single series (shape `(T,)`) or on an aligned panel
+of symbols (shape `(S, T)`); results keep the input's float dtype.
+Recursive indicators step through time once and update all symbols per
+step, compiled with numba when it is installed; window indicators use
+chunked cumulative sums or strided window views. Warm-up conventions (NaN
+before `min_periods`, ATR reporting 0.0) follow the `ta` library so results
+are interchangeable with its output.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+except ImportError:  # Optional accelerator; the numpy loops are the fallback
+    numba = None
+
+_CHUNK = 4096  # time steps per cumulative-sum chunk in rolling windows
+
+
+def _result_dtype(x: np.ndarray):
+    return x.dtype if x.dtype in (np.float32, np.float64) else np.float64
+
+
+def _time_major(x: np.ndarray) -> np.ndarray:
+    """Contiguous float64 copy of `x` with time on the first axis, as 2-D."""
+    xt = np.moveaxis(x.astype(np.float64, copy=False), -1, 0)
+    return np.ascontiguousarray(xt.reshape(len(xt), -1))
+
+
+def _from_time_major(out: np.ndarray, like: np.ndarray) -> np.ndarray:
+    out = np.moveaxis(out.reshape(like.shape[-1:] + like.shape[:-1]), 0, -1)
+    return out.astype(_result_dtype(like), copy=False)
+
+
+def _smooth_loop_numpy(xt, out, alpha, start):
+    if xt.shape[1] == 1:
+        # Plain floats beat per-step numpy calls on a single series
+        y = out[start, 0]
+        values = []
+        for x in xt[start + 1 :, 0].tolist():
+            y = y + alpha * (x - y)
+            values.append(y)
+        out[start + 1 :, 0] = values
+        return
+    for t in range(start + 1, len(xt)):
+        out[t] = out[t - 1] + alpha * (xt[t] - out[t - 1])
+
+
+def _wilder_average_loop_numpy(tr, out, period):
+    if tr.shape[1] == 1:
+        y = out[period - 1, 0]
+        values = []
+        for x in tr[period:, 0].tolist():
+            y = (y * (period - 1) + x) / period
+            values.append(y)
+        out[period:, 0] = values
+        return
+    for t in range(period, len(tr)):
+        out[t] = (out[t - 1] * (period - 1) + tr[t]) / period
+
+
+def _smooth_loop_compiled(xt, out, alpha, start):
+    for t in range(start + 1, xt.shape[0]):
+        for j in range(xt.shape[1]):
+            out[t, j] = out[t - 1, j] + alpha * (xt[t, j] - out[t - 1, j])
+
+
+def _wilder_average_loop_compiled(tr, out, period):
+    for t in range(period, tr.shape[0]):
+        for j in range(tr.shape[1]):
+            out[t, j] = (out[t - 1, j] * (period - 1) + tr[t, j]) / period
+
+
+if numba is not None:
+    _smooth_loop = numba.njit(cache=True)(_smooth_loop_compiled)
+    _wilder_average_loop = numba.njit(cache=True)(_wilder_average_loop_compiled)
+else:
+    _smooth_loop = _smooth_loop_numpy
+    _wilder_average_loop = _wilder_average_loop_numpy
+
+
+def _recursive_smooth(
+    x: np.ndarray, alpha: float, start: int = 0, min_periods: int = 0
+) -> np.ndarray:
+    """y[t] = y[t-1] + alpha * (x[t] - y[t-1]) along the last axis.
+
+    Seeded with x[start]; values before `start + min_periods - 1` are NaN.
+    """
+    xt = _time_major(x)
+    out = np.full_like(xt, np.nan)
+    if len(xt) > start:
+        out[start] = xt[start]
+        _smooth_loop(xt, out, alpha, start)
+        out[: start + max(min_periods, 1) - 1] = np.nan
+    return _from_time_major(out, x)
+
+
+def ema(x, span: int, start: int = 0) -> np.ndarray:
+    """Exponential moving average, `ewm(span, adjust=False, min_periods=span)`."""
+    return _recursive_smooth(np.asarray(x), 2 / (span + 1), start, span)
+
+
+def ewm(x, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """Exponentially weighted mean, `ewm(alpha=alpha, adjust=False)`."""
+    return _recursive_smooth(np.asarray(x), alpha, 0, min_periods)
+
+
+def wilder(x, period: int) -> np.ndarray:
+    """Wilder's smoothing, `ewm(alpha=1/period, adjust=False, min_periods=period)`."""
+    return _recursive_smooth(np.asarray(x), 1 / period, 0, period)
+
+
+def _rolling_moments(x: np.ndarray, window: int, with_std: bool):
+    """Rolling mean (and population std) from chunked cumulative sums.
+
+    Sums are taken chunk by chunk relative to each chunk's first value, which
+    keeps them small enough that variance does not suffer from cancellation
+    on long, high-priced series.
+    """
+    xt = _time_major(x)
+    n = len(xt)
+    mean = np.full_like(xt, np.nan)
+    std = np.full_like(xt, np.nan) if with_std else None
+    zero = np.zeros((1, xt.shape[1]))
+    for start in range(window - 1, n, _CHUNK):
+        stop = min(start + _CHUNK, n)
+        reference = xt[start - window + 1]
+        block = xt[start - window + 1 : stop] - reference
+        sums = np.cumsum(np.concatenate([zero, block]), axis=0)
+        block_mean = (sums[window:] - sums[:-window]) / window
+        mean[start:stop] = block_mean + reference
+        if with_std:
+            squares = np.cumsum(np.concatenate([zero, block * block]), axis=0)
+            variance = (squares[window:] - squares[:-window]) / window
+            std[start:stop] = np.sqrt(np.maximum(variance - block_mean**2, 0.0))
+    mean = _from_time_major(mean, x)
+    return (mean, _from_time_major(std, x)) if with_std else mean
+
+
+def sma(x, window: int) -> np.ndarray:
+    """Simple moving average with `min_periods=window`."""
+    return _rolling_moments(np.asarray(x), window, with_std=False)
+
+
+def rolling_mean_std(x, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and population standard deviation along the last axis."""
+    return _rolling_moments(np.asarray(x), window, with_std=True)
+
+
+def price_change(close) -> np.ndarray:
+    """One-step change in float64; the first step counts as unchanged."""
+    close = np.asarray(close, dtype=np.float64)
+    return np.diff(close, axis=-1, prepend=close[..., :1])
+
+
+def rsi_from_averages(gain, loss) -> np.ndarray:
+    """RSI from smoothed average gains and losses."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100 - 100 / (1 + gain / loss)
+    return np.where(loss == 0, 100.0, result)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    close = np.asarray(close)
+    change = price_change(close)
+    gain = wilder(np.maximum(change, 0.0), period)
+    loss = wilder(np.maximum(-change, 0.0), period)
+    return rsi_from_averages(gain, loss).astype(_result_dtype(close))
+
+
+def macd(
+    close, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    close = np.asarray(close)
+    line = ema(close, fast) - ema(close, slow)
+    # The signal line is seeded with the first defined MACD value
+    signal_line = ema(line, signal, start=slow - 1)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_bands(
+    close, window: int = 20, window_dev: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper band, moving average and lower band."""
+    mean, std = rolling_mean_std(close, window)
+    return mean + window_dev * std, mean, mean - window_dev * std
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = (np.asarray(a) for a in (high, low, close))
+    prev_close = np.concatenate([close[..., :1] * np.nan, close[..., :-1]], axis=-1)
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Wilder ATR seeded with the mean of the first `period` true ranges.
+
+    Like `ta`, values before the seed are 0.0.
+    """
+    return average_true_range(true_range(high, low, close), period)
+
+
+def average_true_range(tr, period: int = 14) -> np.ndarray:
+    """The ATR recursion applied to precomputed true ranges."""
+    tr = np.asarray(tr)
+    trt = _time_major(tr)
+    out = np.zeros_like(trt)
+    if len(trt) >= period:
+        out[period - 1] = trt[:period].mean(axis=0)
+        _wilder_average_loop(trt, out, period)
+    return _from_time_major(out, tr)
+
+
+def _rolling_extreme(x: np.ndarray, window: int, reducer) -> np.ndarray:
+    out = np.full(x.shape, np.nan, dtype=_result_dtype(x))
+    if x.shape[-1] >= window:
+        windows = sliding_window_view(x, window, axis=-1)
+        out[..., window - 1 :] = reducer(windows, axis=-1)
+    return out
+
+
+def stochastic(
+    high, low, close, window: int = 14, smooth_window: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic oscillator %K and its `smooth_window` SMA signal (%D)."""
+    high, low, close = (np.asarray(a) for a in (high, low, close))
+    lowest = _rolling_extreme(low, window, np.min)
+    highest = _rolling_extreme(high, window, np.max)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (close - lowest) / (highest - lowest)
+    # %K is NaN in flat windows, so average windows locally instead of
+    # through cumulative sums that would carry the NaN forward
+    d = np.full_like(k, np.nan)
+    if k.shape[-1] >= smooth_window:
+        d[..., smooth_window - 1 :] = sliding_window_view(
+            k, smooth_window, axis=-1
+        ).mean(axis=-1)
+    return k, d
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume; unchanged closes count as up moves, as in `ta`."""
+    close, volume = np.asarray(close), np.asarray(volume)
+    falling = np.zeros(close.shape, dtype=bool)
+    falling[..., 1:] = close[..., 1:] < close[..., :-1]
+    signed = np.where(falling, -volume, volume)
+    return np.cumsum(signed, axis=-1).astype(_result_dtype(close))
+
+
+def technical_indicators(close, high, low) -> Dict[str, np.ndarray]:
+    """All `FeatureEngineer` technical indicators, keyed by column name."""
+    macd_line, macd_signal, macd_diff = macd(close)
+    bb_high, bb_mid, bb_low = bollinger_bands(close)
+    return {
+        "rsi": rsi(close),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_diff": macd_diff,
+        "bb_high": bb_high,
+        "bb_mid": bb_mid,
+        "bb_low": bb_low,
+        "atr": atr(high, low, close),
+    }
@@ -0,0 +1,301 @@
+"""NumPy forward pass for the predictor's Keras LSTM stack.
+
+Serving only needs inference, so a trained `Sequential` of LSTM, Dense and
+Dropout layers is exported to a `.npz` of plain weight arrays and evaluated
+here without TensorFlow. Weights keep the Keras layout: LSTM kernels are
+`(inputs, 4 * units)` with gates ordered input, forget, cell, output.
+
+Input projections for all time steps are one matrix product; the
+recurrence is compiled with numba when it is installed, and runs as numpy
+steps over the whole batch otherwise (or for large batches sharing one
+model, where BLAS wins). `LSTMRuntime.stack` combines separately trained
+models of one architecture so a batch can mix them.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Optional accelerator; the numpy loop is the fallback
+    numba = None
+
+_COMPILED_MAX_BATCH = 8  # larger shared-weight batches step faster in BLAS
+
+# Rational tanh approximation used by Eigen (and so by TensorFlow on CPU)
+# for float32; absolute error below 3e-7 after clamping
+_TANH_CLAMP = 7.90531110763549805
+_TANH_P = (
+    -2.76076847742355e-16,
+    2.00018790482477e-13,
+    -8.60467152213735e-11,
+    5.12229709037114e-08,
+    1.48572235717979e-05,
+    6.37261928875436e-04,
+    4.89352455891786e-03,
+)
+_TANH_Q = (
+    1.19825839466702e-06,
+    1.18534705686654e-04,
+    2.26843463243900e-03,
+    4.89352518554385e-03,
+)
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 0.5 * np.tanh(0.5 * x) + 0.5,
+}
+
+
+def _layer_spec(layer) -> Dict:
+    kind = type(layer).__name__
+    config = layer.get_config()
+    if kind == "Dropout":
+        return {}  # Identity at inference
+    if kind == "LSTM":
+        if (
+            config.get("activation") != "tanh"
+            or config.get("recurrent_activation") != "sigmoid"
+        ):
+            raise ValueError("Only tanh/sigmoid LSTM layers can be exported")
+        kernel, recurrent_kernel, *bias = layer.get_weights()
+        units = kernel.shape[1] // 4
+        return {
+            "type": "lstm",
+            "return_sequences": bool(config.get("return_sequences", False)),
+            "kernel": kernel,
+            "recurrent_kernel": recurrent_kernel,
+            "bias": bias[0] if bias else np.zeros(4 * units, kernel.dtype),
+        }
+    if kind == "Dense":
+        activation = config.get("activation") or "linear"
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported Dense activation: {activation}")
+        kernel, *bias = layer.get_weights()
+        return {
+            "type": "dense",
+            "activation": activation,
+            "kernel": kernel,
+            "bias": bias[0] if bias else np.zeros(kernel.shape[1], kernel.dtype),
+        }
+    raise ValueError(f"Cannot export layer type {kind}")
+
+
+def _affine(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray) -> np.ndarray:
+    """x @ kernel + bias, per sample when weights are stacked (see `stack`)."""
+    if kernel.ndim == 2:
+        return x @ kernel + bias
+    if x.ndim == 2:
+        return np.matmul(x[:, np.newaxis], kernel)[:, 0] + bias
+    return np.matmul(x, kernel) + bias[:, np.newaxis]
+
+
+# The recurrences below take input projections `(batch, steps, 4 * units)`
+# and recurrent weights `(models, units, 4 * units)`, shared by the batch
+# when there is one model and per sample otherwise. Input, forget and output
+# columns are halved, so that sigmoid(z) = 0.5 * tanh(z) + 0.5 for those
+# gates. They write every hidden state to `sequence`, unless it is empty,
+# and the last to `last`.
+
+
+def _lstm_loop_numpy(projected, recurrent, sequence, last):
+    batch, steps, _ = projected.shape
+    models, units, _ = recurrent.shape
+    h = np.zeros((batch, units), dtype=projected.dtype)
+    c = np.zeros((batch, units), dtype=projected.dtype)
+    z = np.empty((batch, 4 * units), dtype=projected.dtype)
+    for t in range(steps):
+        if models == 1:
+            np.dot(h, recurrent[0], out=z)
+        else:
+            np.matmul(h[:, np.newaxis], recurrent, out=z[:, np.newaxis])
+        z += projected[:, t]
+        np.tanh(z, out=z)
+        gates = z[:, : 2 * units] * 0.5 + 0.5  # input, forget
+        output = z[:, 3 * units :] * 0.5 + 0.5
+        c *= gates[:, units:]
+        c += gates[:, :units] * z[:, 2 * units : 3 * units]
+        h = output * np.tanh(c)
+        if sequence.size:
+            sequence[:, t] = h
+    last[:] = h
+
+
+def _tanh_compiled(x):
+    x = min(max(x, -_TANH_CLAMP), _TANH_CLAMP)
+    x2 = x * x
+    p = _TANH_P[0]
+    for a in _TANH_P[1:]:
+        p = p * x2 + a
+    q = _TANH_Q[0]
+    for b in _TANH_Q[1:]:
+        q = q * x2 + b
+    return x * p / q
+
+
+def _lstm_loop_compiled(projected, recurrent, sequence, last):
+    batch, steps, width = projected.shape
+    units = width // 4
+    z = np.empty(width, projected.dtype)
+    h = np.empty(units, projected.dtype)
+    c = np.empty(units, projected.dtype)
+    for b in range(batch):
+        weights = recurrent[b if recurrent.shape[0] > 1 else 0]
+        h[:] = 0
+        c[:] = 0
+        for t in range(steps):
+            z[:] = projected[b, t]
+            for k in range(units):
+                hk = h[k]
+                for j in range(width):
+                    z[j] += hk * weights[k, j]
+            for j in range(width):
+                z[j] = _tanh(z[j])
+            for j in range(units):
+                forget = 0.5 * z[units + j] + 0.5
+                update = (0.5 * z[j] + 0.5) * z[2 * units + j]
+                c[j] = forget * c[j] + update
+                h[j] = (0.5 * z[3 * units + j] + 0.5) * _tanh(c[j])
+            if sequence.size:
+                sequence[b, t] = h
+        last[b] = h
+
+
+if numba is not None:
+    _tanh = numba.njit(fastmath=True, inline="always")(_tanh_compiled)
+    _lstm_loop = numba.njit(fastmath=True, cache=True)(_lstm_loop_compiled)
+else:
+    _lstm_loop = _lstm_loop_numpy
+
+
+class LSTMRuntime:
+    """Inference-only LSTM/Dense stack on NumPy arrays.
+
+    `layers` is a list of dicts as written by `export`: LSTM layers hold
+    `kernel`, `recurrent_kernel`, `bias` and `return_sequences`; Dense
+    layers hold `kernel`, `bias` and `activation`. Computation runs in
+    `dtype`; float32 matches Keras to about 1e-5.
+    """
+
+    def __init__(self, layers: List[Dict], dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.layers = []
+        for layer in layers:
+            layer = dict(layer)
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if name in layer:
+                    layer[name] = np.ascontiguousarray(layer[name], dtype=self.dtype)
+            if layer["type"] == "lstm":
+                # sigmoid(z) = 0.5 * tanh(z / 2) + 0.5, so pre-halving the
+                # input, forget and output columns lets one tanh cover every
+                # gate of a step
+                units = layer["recurrent_kernel"].shape[0]
+                scale = np.full(4 * units, 0.5, dtype=self.dtype)
+                scale[2 * units : 3 * units] = 1.0
+                for name in ("kernel", "recurrent_kernel", "bias"):
+                    layer[name] = layer[name] * scale
+            self.layers.append(layer)
+
+    @classmethod
+    def from_keras(cls, model, dtype=np.float32) -> "LSTMRuntime":
+        return cls([spec for spec in map(_layer_spec, model.layers) if spec], dtype)
+
+    @classmethod
+    def load(cls, path, dtype=np.float32) -> "LSTMRuntime":
+        with np.load(path) as archive:
+            config = json.loads(str(archive["config"]))
+            layers = [
+                {
+                    **spec,
+                    **{
+                        name: archive[f"{i}.{name}"]
+                        for name in ("kernel", "recurrent_kernel", "bias")
+                        if f"{i}.{name}" in archive
+                    },
+                }
+                for i, spec in enumerate(config)
+            ]
+        return cls(layers, dtype)
+
+    @classmethod
+    def stack(cls, runtimes: Sequence["LSTMRuntime"]) -> "LSTMRuntime":
+        """One runtime evaluating sample `i` of a batch with `runtimes[i]`.
+
+        The runtimes need identical layer shapes, as models sharing a
+        feature schema have, so separately trained models still run in a
+        single forward pass.
+        """
+        first = runtimes[0]
+        if any(len(runtime.layers) != len(first.layers) for runtime in runtimes):
+            raise ValueError("Only runtimes with the same layers can be stacked")
+        stacked = cls([], first.dtype)
+        for i, layer in enumerate(first.layers):
+            layer = dict(layer)
+            for name in ("kernel", "recurrent_kernel", "bias"):
+                if name in layer:
+                    layer[name] = np.stack([r.layers[i][name] for r in runtimes])
+            stacked.layers.append(layer)
+        return stacked
+
+    def predict(self, x) -> np.ndarray:
+        """Outputs for `x` of shape `(batch, steps, features)`.
+
+        A single `(steps, features)` window gives a 1-D result.
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        single = x.ndim == 2
+        if single:
+            x = x[np.newaxis]
+        for layer in self.layers:
+            if layer["type"] == "lstm":
+                x = self._lstm(x, layer)
+            else:
+                x = ACTIVATIONS[layer["activation"]](
+                    _affine(x, layer["kernel"], layer["bias"])
+                )
+        return x[0] if single else x
+
+    @staticmethod
+    def _lstm(x: np.ndarray, layer: Dict) -> np.ndarray:
+        batch, steps, _ = x.shape
+        recurrent = layer["recurrent_kernel"]
+        if recurrent.ndim == 2:
+            recurrent = recurrent[np.newaxis]
+        units = recurrent.shape[1]
+        projected = _affine(x, layer["kernel"], layer["bias"])
+        shape = (batch, steps, units) if layer["return_sequences"] else (0, 0, 0)
+        sequence = np.empty(shape, dtype=x.dtype)
+        last = np.empty((batch, units), dtype=x.dtype)
+        # Per-sample weights gain nothing from BLAS, so they stay compiled
+        blas = recurrent.shape[0] == 1 and batch > _COMPILED_MAX_BATCH
+        loop = _lstm_loop_numpy if blas else _lstm_loop
+        loop(projected, recurrent, sequence, last)
+        return sequence if layer["return_sequences"] else last
+
+
+def export(model, path) -> Path:
+    """Write the weights of a Keras `model` to a `.npz` for `LSTMRuntime`."""
+    specs = [spec for spec in map(_layer_spec, model.layers) if spec]
+    return save(specs, path)
+
+
+def save(layers: List[Dict], path) -> Path:
+    """Write layer dicts (see `LSTMRuntime`) to `path` as one `.npz` file."""
+    path = Path(path)
+    arrays, config = {}, []
+    for i, layer in enumerate(layers):
+        spec = {}
+        for name, value in layer.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{i}.{name}"] = value
+            else:
+                spec[name] = value
+        config.append(spec)
+    with open(path, "wb") as f:
+        np.savez(f, config=np.array(json.dumps(config)), **arrays)
+    return path
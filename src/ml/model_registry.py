@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LATEST = "LATEST"
+METADATA = "meta.json"
+
+
+class ModelRegistry:
+    """Versioned on-disk store of trained models.
+
+    Models live under `<root>/<symbol>/<schema>/<version>/`, where `schema`
+    hashes the model's feature schema (input columns, lookback, horizon),
+    so code with a different schema never picks up an incompatible model.
+    A version is written to a hidden temporary directory and renamed into
+    place, then the `LATEST` pointer is replaced atomically. Readers
+    therefore only ever see complete versions.
+
+    `model_class` provides `save(directory)`, a `load(directory)`
+    classmethod and a `schema` dict. `get` keeps one loaded model per symbol
+    and re-reads the pointer at most every `refresh_interval` seconds, so
+    long-running workers switch to newly published versions without a
+    restart.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        model_class,
+        refresh_interval: float = 30.0,
+        keep: int = 5,
+    ):
+        self.root = Path(root)
+        self.model_class = model_class
+        self.refresh_interval = refresh_interval
+        self.keep = keep
+        self._schema: Optional[Dict] = None
+        self._loaded: Dict[str, Tuple[object, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def schema(self) -> Dict:
+        """Feature schema of models built by the running code."""
+        if self._schema is None:
+            self._schema = self.model_class().schema
+        return self._schema
+
+    @staticmethod
+    def schema_key(schema: Dict) -> str:
+        encoded = json.dumps(schema, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:12]
+
+    def _schema_dir(self, symbol: str, schema: Optional[Dict] = None) -> Path:
+        key = self.schema_key(self.schema if schema is None else schema)
+        return self.root / symbol.replace("/", "-") / key
+
+    def publish(self, symbol: str, model, metrics: Optional[Dict] = None) -> str:
+        """Store `model` as the newest version for `symbol` and return it."""
+        schema = model.schema
+        base = self._schema_dir(symbol, schema)
+        base.mkdir(parents=True, exist_ok=True)
+        # Time-ordered names keep versions sortable
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+
+        staging = base / f".{version}-{uuid.uuid4().hex[:8]}.tmp"
+        model.save(staging)
+        metadata = {
+            "symbol": symbol,
+            "version": version,
+            "schema": schema,
+            "created": datetime.utcnow().isoformat(),
+            "metrics": metrics or {},
+        }
+        (staging / METADATA).write_text(json.dumps(metadata, indent=2, default=str))
+        os.replace(staging, base / version)
+
+        pointer = base / f".{LATEST}-{uuid.uuid4().hex[:8]}.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, base / LATEST)
+
+        model.version = version
+        self._prune(base)
+        return version
+
+    def _prune(self, base: Path):
+        for version in self._versions(base)[: -self.keep]:
+            shutil.rmtree(base / version, ignore_errors=True)
+
+    @staticmethod
+    def _versions(base: Path) -> List[str]:
+        if not base.exists():
+            return []
+        return sorted(
+            path.name
+            for path in base.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+
+    def versions(self, symbol: str, schema: Optional[Dict] = None) -> List[str]:
+        return self._versions(self._schema_dir(symbol, schema))
+
+    def latest_version(
+        self, symbol: str, schema: Optional[Dict] = None
+    ) -> Optional[str]:
+        try:
+            return (self._schema_dir(symbol, schema) / LATEST).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def metadata(self, symbol: str, version: Optional[str] = None) -> Dict:
+        version = version or self.latest_version(symbol)
+        if version is None:
+            raise KeyError(f"No model published for {symbol}")
+        return json.loads((self._schema_dir(symbol) / version / METADATA).read_text())
+
+    def load(self, symbol: str, version: Optional[str] = None):
+        """Load a version (the latest by default); heavy parts load lazily."""
+        version = version or self.latest_version(symbol)
+        if version is None:
+            raise KeyError(f"No model published for {symbol}")
+        model = self.model_class.load(self._schema_dir(symbol) / version)
+        model.version = version
+        return model
+
+    def get(self, symbol: str):
+        """The latest model for `symbol`, or None if none was published."""
+        now = time.monotonic()
+        with self._lock:
+            model, checked = self._loaded.get(symbol, (None, -float("inf")))
+            if now - checked < self.refresh_interval:
+                return model
+
+            version = self.latest_version(symbol)
+            if version is not None and getattr(model, "version", None) != version:
+                model = self.load(symbol, version)
+            self._loaded[symbol] = (model, now)
+            return model
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> Optional[ModelRegistry]:
+    """Registry rooted at MODEL_PATH, shared within the process, if configured."""
+    global _registry
+    path = os.getenv("MODEL_PATH")
+    if not path:
+        return None
+    if _registry is None or _registry.root != Path(path):
+        from src.ml.predictor import MarketPredictor
+
+        _registry = ModelRegistry(path, MarketPredictor)
+    return _registry
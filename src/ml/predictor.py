@@ -1,28 +1,191 @@
-from typing import Dict, List, Optional, Tuple
+"""Ensemble price predictor (LSTM + random forest).
+
+TensorFlow, scikit-learn and joblib are imported where they are first
+needed rather than at module import, so processes that only route requests
+or schedule tasks never pay for them. Predictions run the LSTM through the
+NumPy runtime in `src.ml.lstm_runtime`; TensorFlow is only needed to train,
+or to serve models saved without an exported `lstm.npz`.
+"""
+
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.optimizers import Adam
+
+from src.ml.windows import WindowedDataset
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+    from tensorflow.keras.models import Sequential
+
+    from src.ml.lstm_runtime import LSTMRuntime
+
+
+@lru_cache(maxsize=None)
+def _window_batches_class():
+    from tensorflow.keras.utils import Sequence as KerasSequence
+
+    class WindowBatches(KerasSequence):
+        """Feeds a `WindowedDataset` to Keras one materialized batch at a time."""
+
+        def __init__(
+            self,
+            dataset: WindowedDataset,
+            batch_size: int = 32,
+            shuffle: bool = False,
+            seed: Optional[int] = None,
+        ):
+            super().__init__()
+            self.dataset = dataset
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            self.order = np.arange(len(dataset))
+            self.rng = np.random.default_rng(seed)
+            self.on_epoch_end()
+
+        def __len__(self) -> int:
+            return math.ceil(len(self.dataset) / self.batch_size)
+
+        def __getitem__(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+            return self.dataset.batch(
+                self.order[i * self.batch_size : (i + 1) * self.batch_size]
+            )
+
+        def on_epoch_end(self):
+            if self.shuffle:
+                self.rng.shuffle(self.order)
+
+    return WindowBatches
+
+
+def window_batches(
+    dataset: WindowedDataset,
+    batch_size: int = 32,
+    shuffle: bool = False,
+    seed: Optional[int] = None,
+):
+    """A Keras `Sequence` over `dataset`'s windows."""
+    return _window_batches_class()(dataset, batch_size, shuffle, seed)
 
 
 class MarketPredictor:
+    # Model inputs, and the engineered features among them
+    feature_columns = ["close", "volume", "rsi", "macd", "atr"]
+    required_features = ["rsi", "macd", "atr"]
+
+    # Artifact file names inside a saved model directory
+    scaler_file = "scaler.joblib"
+    rf_file = "rf.joblib"
+    lstm_file = "lstm.weights.h5"
+    runtime_file = "lstm.npz"
+
     def __init__(self):
+        from sklearn.preprocessing import StandardScaler
+
         self.scaler = StandardScaler()
-        self.rf_model = RandomForestRegressor(
-            n_estimators=100, max_depth=10, random_state=42
-        )
-        self.lstm_model = self._build_lstm()
         self.lookback = 60  # 60 minutes of historical data
         self.prediction_horizon = 24  # Predict 24 hours ahead
+        self.dtype = np.float32  # Storage for training windows
+        self.rf_max_windows = 20_000  # Evenly spaced windows the RF is fit on
+        self.version: Optional[str] = None
+        # Models are built, or loaded from `_artifacts`, on first use
+        self._artifacts: Optional[Path] = None
+        self._rf_model: Optional["RandomForestRegressor"] = None
+        self._lstm_model: Optional["Sequential"] = None
+        self._lstm_runtime: Optional["LSTMRuntime"] = None
+
+    @property
+    def schema(self) -> Dict:
+        """What a trained model depends on; models are only reused within one."""
+        return {
+            "features": list(self.feature_columns),
+            "lookback": self.lookback,
+            "horizon": self.prediction_horizon,
+        }
+
+    @property
+    def rf_model(self) -> "RandomForestRegressor":
+        if self._rf_model is None:
+            if self._artifacts is not None:
+                import joblib
+
+                # Tree arrays are memory-mapped, so processes share the pages
+                self._rf_model = joblib.load(
+                    self._artifacts / self.rf_file, mmap_mode="r"
+                )
+            else:
+                from sklearn.ensemble import RandomForestRegressor
+
+                self._rf_model = RandomForestRegressor(
+                    n_estimators=100, max_depth=10, random_state=42
+                )
+        return self._rf_model
+
+    @property
+    def lstm_model(self) -> "Sequential":
+        if self._lstm_model is None:
+            model = self._build_lstm()
+            if self._artifacts is not None:
+                model.load_weights(str(self._artifacts / self.lstm_file))
+            self._lstm_model = model
+        return self._lstm_model
+
+    @property
+    def lstm_runtime(self) -> "LSTMRuntime":
+        """Forward pass of the LSTM without TensorFlow."""
+        if self._lstm_runtime is None:
+            from src.ml.lstm_runtime import LSTMRuntime
+
+            if (
+                self._artifacts is not None
+                and (self._artifacts / self.runtime_file).exists()
+            ):
+                self._lstm_runtime = LSTMRuntime.load(
+                    self._artifacts / self.runtime_file, self.dtype
+                )
+            else:
+                self._lstm_runtime = LSTMRuntime.from_keras(self.lstm_model, self.dtype)
+        return self._lstm_runtime
+
+    def save(self, directory):
+        """Write the scaler and both models to `directory`."""
+        import joblib
+
+        from src.ml import lstm_runtime
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self.scaler, directory / self.scaler_file)
+        # Uncompressed, so loading can memory-map the arrays
+        joblib.dump(self.rf_model, directory / self.rf_file)
+        self.lstm_model.save_weights(str(directory / self.lstm_file))
+        lstm_runtime.export(self.lstm_model, directory / self.runtime_file)
+
+    @classmethod
+    def load(cls, directory) -> "MarketPredictor":
+        """A predictor for a saved model; the models load on first use."""
+        import joblib
+
+        predictor = cls()
+        predictor.scaler = joblib.load(Path(directory) / cls.scaler_file)
+        predictor._artifacts = Path(directory)
+        return predictor
+
+    def _build_lstm(self) -> "Sequential":
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.optimizers import Adam
 
-    def _build_lstm(self) -> Sequential:
         model = Sequential(
             [
-                LSTM(50, return_sequences=True, input_shape=(self.lookback, 5)),
+                LSTM(
+                    50,
+                    return_sequences=True,
+                    input_shape=(self.lookback, len(self.feature_columns)),
+                ),
                 Dropout(0.2),
                 LSTM(50, return_sequences=False),
                 Dropout(0.2),
@@ -33,32 +196,40 @@ class MarketPredictor:
         model.compile(optimizer=Adam(learning_rate=0.001), loss="mse", metrics=["mae"])
         return model
 
-    def prepare_data(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
-        features = np.column_stack(
-            [data["close"], data["volume"], data["rsi"], data["macd"], data["atr"]]
-        )
-
-        scaled_features = self.scaler.fit_transform(features)
-        X, y = [], []
+    def prepare_data(self, data: pd.DataFrame, fit: bool = True) -> WindowedDataset:
+        """Scale the features and expose them as lazy training windows.
 
-        for i in range(len(data) - self.lookback - self.prediction_horizon + 1):
-            X.append(scaled_features[i : i + self.lookback])
-            y.append(
-                scaled_features[
-                    i + self.lookback : i + self.lookback + self.prediction_horizon, 0
-                ]
-            )
-
-        return np.array(X), np.array(y)
+        Each window holds `lookback` rows of features; its target is the next
+        `prediction_horizon` scaled closes.
+        """
+        features = data[self.feature_columns].to_numpy()
+        if fit:
+            scaled_features = self.scaler.fit_transform(features)
+        else:
+            scaled_features = self.scaler.transform(features)
+        return WindowedDataset(
+            scaled_features, self.lookback, self.prediction_horizon, dtype=self.dtype
+        )
 
-    def train(self, X: np.ndarray, y: np.ndarray) -> Dict:
-        # Train LSTM
+    def train(
+        self,
+        dataset: WindowedDataset,
+        epochs: int = 50,
+        batch_size: int = 32,
+        validation_split: float = 0.1,
+    ) -> Dict:
+        # Train LSTM; the validation windows are the most recent ones
+        train, validation = dataset.split(1 - validation_split)
         lstm_history = self.lstm_model.fit(
-            X, y, epochs=50, batch_size=32, validation_split=0.1, verbose=0
+            window_batches(train, batch_size, shuffle=True, seed=42),
+            validation_data=window_batches(validation, batch_size),
+            epochs=epochs,
+            verbose=0,
         )
+        self._lstm_runtime = None  # Re-exported from the new weights on use
 
         # Train Random Forest
-        X_rf = X.reshape(X.shape[0], -1)
+        X_rf, y = dataset.sample(self.rf_max_windows).flat()
         y_rf = y[:, 0]  # Use only first prediction point for RF
         self.rf_model.fit(X_rf, y_rf)
 
@@ -68,30 +239,50 @@ class MarketPredictor:
             "rf_score": self.rf_model.score(X_rf, y_rf),
         }
 
-    def predict(self, data: pd.DataFrame) -> Dict:
-        X, _ = self.prepare_data(data.iloc[-self.lookback :])
-        if X.size == 0:
+    def window(self, data: pd.DataFrame) -> np.ndarray:
+        """The latest `lookback` rows of model inputs, unscaled."""
+        features = data[self.feature_columns].to_numpy()[-self.lookback :]
+        if len(features) < self.lookback:
             raise ValueError("Insufficient data for prediction")
+        return features
+
+    def predict(self, data: pd.DataFrame) -> Dict:
+        X = self.scaler.transform(self.window(data))[np.newaxis].astype(self.dtype)
 
         # Get predictions from both models
-        lstm_pred = self.lstm_model.predict(X[-1:], verbose=0)
-        rf_pred = self.rf_model.predict(X[-1:].reshape(1, -1))
+        lstm_pred = self.lstm_runtime.predict(X)
+        rf_pred, rf_conf = self.rf_predict(X.reshape(1, -1))
 
-        # Inverse transform predictions
-        lstm_pred_scaled = np.zeros((1, features.shape[1]))
-        lstm_pred_scaled[:, 0] = lstm_pred[0, 0]
-        rf_pred_scaled = np.zeros((1, features.shape[1]))
-        rf_pred_scaled[:, 0] = rf_pred[0]
+        return self.combine(lstm_pred[0], rf_pred[0], rf_conf[0])
 
-        lstm_price = self.scaler.inverse_transform(lstm_pred_scaled)[0, 0]
-        rf_price = self.scaler.inverse_transform(rf_pred_scaled)[0, 0]
+    def rf_predict(self, X_rf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Forest predictions and their confidences for rows of `X_rf`.
+
+        The forest predicts the mean of its trees, so one pass over the
+        trees gives both the prediction and the trees' spread.
+        """
+        X_rf = np.ascontiguousarray(X_rf, dtype=np.float32)
+        trees = np.array(
+            [
+                tree.predict(X_rf, check_input=False)
+                for tree in self.rf_model.estimators_
+            ]
+        )
+        return trees.mean(axis=0), 1.0 / (1.0 + trees.std(axis=0))
+
+    def combine(self, lstm_pred: np.ndarray, rf_pred: float, rf_conf: float) -> Dict:
+        """Ensemble one window's scaled model outputs into a price prediction."""
+        # Inverse transform predictions (the close is the first feature)
+        mean, scale = self.scaler.mean_[0], self.scaler.scale_[0]
+        lstm_price = float(lstm_pred[0] * scale + mean)
+        rf_price = float(rf_pred * scale + mean)
 
         # Ensemble prediction (weighted average)
         final_price = 0.6 * lstm_price + 0.4 * rf_price
 
         # Calculate confidence metrics
         lstm_conf = self._calculate_lstm_confidence(lstm_pred)
-        rf_conf = self._calculate_rf_confidence(rf_pred)
+        rf_conf = float(rf_conf)
 
         return {
             "price": final_price,
@@ -105,19 +296,22 @@ class MarketPredictor:
         # Calculate confidence based on prediction variance
         return float(1.0 / (1.0 + np.std(pred)))
 
-    def _calculate_rf_confidence(self, pred: float) -> float:
-        # Use RF's internal uncertainty estimation
-        return float(1.0 - self.rf_model.predict_proba(X_rf)[:, 1].std())
-
-    def evaluate(self, X: np.ndarray, y: np.ndarray) -> Dict:
-        lstm_pred = self.lstm_model.predict(X)
-        rf_pred = self.rf_model.predict(X.reshape(X.shape[0], -1))
+    def evaluate(self, dataset: WindowedDataset, batch_size: int = 1024) -> Dict:
+        lstm_pred = self.lstm_model.predict(
+            window_batches(dataset, batch_size), verbose=0
+        )[:, 0]
+        rf_pred, targets = [], []
+        for start in range(0, len(dataset), batch_size):
+            X_rf, y = dataset.flat(slice(start, start + batch_size))
+            rf_pred.append(self.rf_model.predict(X_rf))
+            targets.append(y[:, 0])
+        rf_pred, y = np.concatenate(rf_pred), np.concatenate(targets)
 
         metrics = {
-            "lstm_mse": float(np.mean((lstm_pred[:, 0] - y[:, 0]) ** 2)),
-            "lstm_mae": float(np.mean(np.abs(lstm_pred[:, 0] - y[:, 0]))),
-            "rf_mse": float(np.mean((rf_pred - y[:, 0]) ** 2)),
-            "rf_mae": float(np.mean(np.abs(rf_pred - y[:, 0]))),
+            "lstm_mse": float(np.mean((lstm_pred - y) ** 2)),
+            "lstm_mae": float(np.mean(np.abs(lstm_pred - y))),
+            "rf_mse": float(np.mean((rf_pred - y) ** 2)),
+            "rf_mae": float(np.mean(np.abs(rf_pred - y))),
         }
 
         return metrics
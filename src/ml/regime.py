@@ -0,0 +1,204 @@
+import math
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.ml.indicator_engine import RollingMoments
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest).
+
+    Values are buffered and periodically folded into at most ~`compression`
+    centroids, sized by the arcsine scale function so the tails stay
+    precise. Digests built on different workers can be combined with
+    `merge`, and `to_dict`/`from_dict` give a JSON-safe form for shipping
+    them around.
+    """
+
+    def __init__(self, compression: float = 100.0, buffer_size: Optional[int] = None):
+        self.compression = compression
+        self.buffer_size = buffer_size or int(compression)
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.compressions = 0  # bumped whenever the centroids change
+        self._buffer: List[tuple] = []
+
+    def __len__(self) -> int:
+        return int(self.total + sum(w for _, w in self._buffer))
+
+    def update(self, x: float, weight: float = 1.0):
+        if math.isnan(x):
+            return
+        self._buffer.append((x, weight))
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        if len(self._buffer) >= self.buffer_size:
+            self.compress()
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest into this one."""
+        self._buffer.extend(zip(other.means, other.weights))
+        self._buffer.extend(other._buffer)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(q, 1.0) - 1)
+
+    def compress(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(w for _, w in points)
+
+        means, weights = [], []
+        mean, weight = points[0]
+        before = 0.0  # weight of the finished centroids
+        k_left = self._k(0.0)
+        for x, w in points[1:]:
+            if self._k((before + weight + w) / total) - k_left <= 1:
+                weight += w
+                mean += (x - mean) * w / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                k_left = self._k(before / total)
+                mean, weight = x, w
+        means.append(mean)
+        weights.append(weight)
+
+        self.means, self.weights, self.total = means, weights, total
+        self.compressions += 1
+
+    def quantile(self, q: float) -> float:
+        self.compress()
+        if not self.means:
+            return math.nan
+        if len(self.means) == 1:
+            return self.means[0]
+
+        target = q * self.total
+        centers, cumulative = [], 0.0
+        for weight in self.weights:
+            centers.append(cumulative + weight / 2)
+            cumulative += weight
+
+        if target <= centers[0]:
+            low, high, t0, t1 = self.min, self.means[0], 0.0, centers[0]
+        elif target >= centers[-1]:
+            low, high, t0, t1 = self.means[-1], self.max, centers[-1], self.total
+        else:
+            i = bisect_right(centers, target) - 1
+            low, high = self.means[i], self.means[i + 1]
+            t0, t1 = centers[i], centers[i + 1]
+        if t1 == t0:
+            return low
+        return low + (high - low) * (target - t0) / (t1 - t0)
+
+    def to_dict(self) -> Dict:
+        self.compress()
+        return {
+            "compression": self.compression,
+            "means": list(self.means),
+            "weights": list(self.weights),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "TDigest":
+        digest = cls(state["compression"])
+        digest.means = list(state["means"])
+        digest.weights = list(state["weights"])
+        digest.total = float(sum(digest.weights))
+        digest.min, digest.max = state["min"], state["max"]
+        return digest
+
+
+class RegimeClassifier:
+    """Streaming volatility and trend regimes for one symbol.
+
+    Keeps the rolling standard deviation of returns and the rolling mean
+    of closes in O(1) per candle. Each candle's volatility is labelled
+    against quantile thresholds of the volatility seen *before* it (held in
+    a `TDigest`), so no future data leaks into the regime. Thresholds are
+    refreshed whenever the digest compresses, which keeps classification
+    O(1) amortized.
+    """
+
+    def __init__(
+        self,
+        volatility_window: int = 30,
+        trend_window: int = 50,
+        quantiles: Sequence[float] = (1 / 3, 2 / 3),
+        labels: Sequence[str] = ("low", "medium", "high"),
+        min_history: int = 100,
+        compression: float = 100.0,
+    ):
+        if len(labels) != len(quantiles) + 1:
+            raise ValueError("labels must have one more entry than quantiles")
+        self.quantiles = tuple(quantiles)
+        self.labels = tuple(labels)
+        self.min_history = min_history
+        self.returns = RollingMoments(volatility_window)
+        self.closes = RollingMoments(trend_window)
+        self.digest = TDigest(compression)
+        self.prev_close = math.nan
+        self.thresholds: Optional[List[float]] = None
+        self._thresholds_version = -1
+        self.current: Dict = {}
+
+    def _refresh_thresholds(self):
+        if len(self.digest) < self.min_history:
+            return
+        if self.digest.compressions == self._thresholds_version:
+            return
+        self.thresholds = [self.digest.quantile(q) for q in self.quantiles]
+        self._thresholds_version = self.digest.compressions
+
+    def classify(self, volatility: float) -> Optional[str]:
+        if self.thresholds is None or math.isnan(volatility):
+            return None
+        return self.labels[bisect_right(self.thresholds, volatility)]
+
+    def update(self, close: float) -> Dict:
+        """Advance by one closed candle and return its regime."""
+        if not math.isnan(self.prev_close) and self.prev_close:
+            self.returns.update(close / self.prev_close - 1)
+        self.prev_close = close
+        self.closes.update(close)
+
+        volatility = math.nan
+        if len(self.returns) == self.returns.window:
+            volatility = math.sqrt(self.returns.variance(ddof=1))
+        sma = self.closes.mean if len(self.closes) == self.closes.window else math.nan
+
+        self._refresh_thresholds()
+        regime = self.classify(volatility)
+        self.digest.update(volatility)  # Only later candles see this one
+
+        trend = None
+        if not math.isnan(sma):
+            trend = "uptrend" if close > sma else "downtrend"
+        self.current = {
+            "volatility": volatility,
+            "volatility_regime": regime,
+            f"sma_{self.closes.window}": sma,
+            "trend_regime": trend,
+        }
+        return self.current
+
+    def run(self, closes: Iterable[float]) -> List[Dict]:
+        return [self.update(float(close)) for close in closes]
+
+    def merge_sketch(self, state: Dict):
+        """Fold in a serialized digest, e.g. history gathered by another worker."""
+        self.digest.merge(TDigest.from_dict(state))
+        self._thresholds_version = -1
+        self._refresh_thresholds()
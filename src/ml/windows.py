@@ -0,0 +1,88 @@
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class WindowedDataset:
+    """Lazy (lookback window, forecast horizon) pairs over a feature matrix.
+
+    Windows are strided views into a single `(time, features)` array, so
+    no window is copied until a batch is requested: memory stays at one
+    copy of the features however many windows overlap. `indices` selects
+    which window start offsets belong to this dataset, which is how splits
+    and samples share the same storage.
+    """
+
+    def __init__(
+        self,
+        features: np.ndarray,
+        lookback: int,
+        horizon: int,
+        target_column: int = 0,
+        dtype=np.float32,
+        indices: Optional[np.ndarray] = None,
+    ):
+        self.features = np.ascontiguousarray(features, dtype=dtype)
+        self.lookback = lookback
+        self.horizon = horizon
+        self.target_column = target_column
+        count = max(len(self.features) - lookback - horizon + 1, 0)
+        if indices is None:
+            indices = np.arange(count)
+        self.indices = np.asarray(indices, dtype=np.intp)
+
+        if count:
+            # (window, lookback, features) and (window, horizon) views
+            self._X = sliding_window_view(self.features, lookback, axis=0)[:count]
+            self._X = self._X.transpose(0, 2, 1)
+            targets = self.features[lookback:, target_column]
+            self._y = sliding_window_view(targets, horizon)[:count]
+        else:
+            shape = (0, lookback, self.features.shape[1])
+            self._X = np.empty(shape, dtype=self.features.dtype)
+            self._y = np.empty((0, horizon), dtype=self.features.dtype)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (len(self), self.lookback, self.features.shape[1])
+
+    def subset(self, indices: np.ndarray) -> "WindowedDataset":
+        """The windows at positions `indices` of this dataset, sharing storage."""
+        subset = object.__new__(WindowedDataset)
+        subset.__dict__.update(self.__dict__)
+        subset.indices = self.indices[indices]
+        return subset
+
+    def split(self, fraction: float) -> Tuple["WindowedDataset", "WindowedDataset"]:
+        """Chronological split: the first `fraction` of windows, then the rest."""
+        cut = int(len(self) * fraction)
+        return self.subset(slice(None, cut)), self.subset(slice(cut, None))
+
+    def sample(self, size: int) -> "WindowedDataset":
+        """At most `size` windows, evenly spaced in time."""
+        if len(self) <= size:
+            return self
+        return self.subset(np.linspace(0, len(self) - 1, size).astype(np.intp))
+
+    def batch(self, positions=slice(None)) -> Tuple[np.ndarray, np.ndarray]:
+        """Materialize the windows at `positions` as contiguous arrays."""
+        indices = self.indices[positions]
+        return np.ascontiguousarray(self._X[indices]), self._y[indices].copy()
+
+    def batches(
+        self, batch_size: int = 32, shuffle: bool = False, seed: Optional[int] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(self), batch_size):
+            yield self.batch(order[start : start + batch_size])
+
+    def flat(self, positions=slice(None)) -> Tuple[np.ndarray, np.ndarray]:
+        """Windows flattened to `(n, lookback * features)` rows, e.g. for sklearn."""
+        X, y = self.batch(positions)
+        return X.reshape(len(X), -1), y
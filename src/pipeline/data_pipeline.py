@@ -1,25 +1,38 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+import pandas as pd
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from src.data.candle_store import get_candle_store
 from src.data.fetcher import CryptoDataFetcher
+from src.data.sync import OHLCVSync
 from src.db.database import SessionLocal
 from src.db.models import CryptoPrice, TechnicalIndicators
 from src.ml.feature_engineering import FeatureEngineer
+from src.ml.indicator_cache import get_indicator_cache
+from src.ml.indicator_engine import INDICATOR_COLUMNS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DataPipeline:
-    def __init__(self):
-        self.fetcher = CryptoDataFetcher()
+    def __init__(
+        self,
+        fetcher: Optional[CryptoDataFetcher] = None,
+        symbols: Optional[List[str]] = None,
+    ):
+        self.fetcher = fetcher or CryptoDataFetcher()
         self.engineer = FeatureEngineer()
-        self.symbols = [
+        self.sync = OHLCVSync(self.fetcher)
+        self._cursors_loaded = False
+        self.candle_store = get_candle_store()
+        self.indicator_cache = get_indicator_cache()
+        self.symbols = symbols or [
             "BTC/USDT",
             "ETH/USDT",
             "BNB/USDT",
@@ -31,17 +44,26 @@ class DataPipeline:
         ]
 
     async def update_market_data(self):
-        """Fetch and store latest market data for all symbols."""
+        """Fetch and store new market data for all symbols."""
         try:
-            data = await self.fetcher.fetch_multiple_symbols(self.symbols)
+            if not self._cursors_loaded:
+                with SessionLocal() as db:
+                    self.sync.load_cursors(db)
+                self._cursors_loaded = True
+
+            data = await self.sync.sync_many(self.symbols)
             with SessionLocal() as db:
-                for symbol, df in data.items():
-                    if df.empty:
+                for symbol, (series, new_rows) in data.items():
+                    if series.empty:
                         logger.warning(f"No data received for {symbol}")
                         continue
+                    if new_rows.empty:
+                        continue
 
-                    # Add technical indicators
-                    df = self.engineer.add_technical_indicators(df)
+                    # Indicators are updated incrementally from the warmed-up
+                    # engine, but only the new candles are stored.
+                    df = self.engineer.update_technical_indicators(symbol, series)
+                    df = df.loc[new_rows.index]
 
                     # Store price data
                     for index, row in df.iterrows():
@@ -71,8 +93,17 @@ class DataPipeline:
                         )
                         db.add(indicators)
 
+                    # The columnar store de-duplicates on read, so writing it
+                    # before the commit is safe if the commit fails.
+                    if self.candle_store is not None:
+                        self.candle_store.write(symbol, self.sync.timeframe, new_rows)
+
+                    self.sync.mark_stored(db, symbol, df.index[-1])
                     db.commit()
-                    logger.info(f"Updated data for {symbol}")
+                    self.indicator_cache.invalidate(
+                        symbol, self.sync.timeframe, before=df.index[-1]
+                    )
+                    logger.info(f"Stored {len(df)} new candles for {symbol}")
 
         except Exception as e:
             logger.error(f"Error in update_market_data: {str(e)}")
@@ -89,6 +120,47 @@ class DataPipeline:
                 logger.error(f"Error in continuous updates: {str(e)}")
                 await asyncio.sleep(60)  # Wait a minute before retrying
 
+    def latest_candles(
+        self, db: Session, symbol: str, limit: int = 100
+    ) -> pd.DataFrame:
+        """Latest stored candles, oldest first, preferring the candle store."""
+        if self.candle_store is not None:
+            return self.candle_store.tail(symbol, self.sync.timeframe, limit=limit)
+
+        rows = self.get_latest_data(db, symbol, limit)
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(
+            [
+                {
+                    "timestamp": d.timestamp,
+                    "open": d.open,
+                    "high": d.high,
+                    "low": d.low,
+                    "close": d.close,
+                    "volume": d.volume,
+                }
+                for d in rows
+            ]
+        )
+        return df.set_index("timestamp").sort_index()
+
+    def indicators(
+        self,
+        symbol: str,
+        candles: pd.DataFrame,
+        names: Iterable[str] = INDICATOR_COLUMNS,
+    ) -> pd.DataFrame:
+        """Features for a candle window, memoized until the next candle."""
+        names = list(names)
+        return self.indicator_cache.get_or_compute(
+            symbol,
+            self.sync.timeframe,
+            candles,
+            names,
+            lambda: self.engineer.add_features(candles.copy(), names),
+        )
+
     @staticmethod
     def get_latest_data(
         db: Session, symbol: str, limit: int = 1000
@@ -108,3 +180,14 @@ class DataPipeline:
         cutoff = datetime.utcnow() - timedelta(days=days)
         db.query(CryptoPrice).filter(CryptoPrice.timestamp < cutoff).delete()
         db.commit()
+
+
+_pipeline: Optional[DataPipeline] = None
+
+
+def get_data_pipeline() -> DataPipeline:
+    """The pipeline shared by the API routes and tasks of this process."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = DataPipeline()
+    return _pipeline
@@ -1,25 +1,46 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
 
 from src.api.websocket import broadcast_updates
+from src.data.candle_store import CANDLE_COLUMNS, get_candle_store
 from src.data.fetcher import CryptoDataFetcher
+from src.data.sync import OHLCVSync
 from src.db.database import SessionLocal
 from src.db.models import CryptoPrice, TechnicalIndicators
+from src.ml.batch_inference import BatchPredictor
+from src.ml.correlation import get_correlation_engine
 from src.ml.feature_engineering import FeatureEngineer
-from src.ml.predictor import MarketPredictor
+from src.ml.indicator_cache import get_indicator_cache
+from src.ml.model_registry import get_model_registry
+from src.ml.regime import RegimeClassifier
+from src.realtime.bar_aggregator import TIMEFRAME_MS, Bar, BarAggregator
+from src.realtime.order_book import OrderBookManager
+from src.realtime.websocket_client import WebSocketClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class RealtimePipeline:
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
-        self.fetcher = CryptoDataFetcher(api_key, api_secret)
-        self.predictor = MarketPredictor()
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        fetcher: Optional[CryptoDataFetcher] = None,
+        symbols: Optional[List[str]] = None,
+        stream_order_books: bool = True,
+        stream_bars: bool = True,
+    ):
+        self.fetcher = fetcher or CryptoDataFetcher(api_key, api_secret)
+        self.models = get_model_registry()
+        self.batch_predictor = BatchPredictor()
         self.feature_engineer = FeatureEngineer()
-        self.symbols = [
+        self.symbols = symbols or [
             "BTC/USDT",
             "ETH/USDT",
             "BNB/USDT",
@@ -29,12 +50,84 @@ class RealtimePipeline:
             "DOGE/USDT",
             "AVAX/USDT",
         ]
+        self.ohlcv_sync = OHLCVSync(self.fetcher)
+        self._cursors_loaded = False
+        self.candle_store = get_candle_store()
+        self.indicator_cache = get_indicator_cache()
+        self.regimes: Dict[str, RegimeClassifier] = {}
+        self._regime_seen: Dict[str, pd.Timestamp] = {}
+        self.correlations = get_correlation_engine()
+        self.correlations.add_symbols(self.symbols)
+        self._correlation_seen: Optional[pd.Timestamp] = None
+        self.stream_order_books = stream_order_books
+        self.order_books = OrderBookManager(self.fetcher.fetch_order_book_snapshot)
+        self.stream_bars = stream_bars
+        self.bars = BarAggregator(rollups=[self.ohlcv_sync.timeframe])
+        self.bars.add_callback(self._on_bar)
+        # Symbols whose candles currently come from the trade stream, and the
+        # first bar each one is guaranteed to have seen every trade of
+        self.streamed_symbols: Set[str] = set()
+        self._stream_from: Dict[str, int] = {}
+        self.stream_client: Optional[WebSocketClient] = None
         self.last_update = {}
         self.running = False
 
+    async def _start_streams(self):
+        """Maintain local order books and candles from market streams."""
+        self.stream_client = WebSocketClient()
+        self.stream_client.add_gap_callback(self._on_stream_gap)
+        for symbol in self.symbols:
+
+            async def on_event(stream, data, symbol=symbol):
+                channel = stream.partition("@")[2]
+                if channel.startswith("depth"):
+                    await self.order_books.process_event(symbol, data)
+                elif channel == "aggTrade":
+                    self._on_trade(symbol, data)
+
+            self.stream_client.add_callback(symbol, on_event)
+            if self.stream_order_books:
+                await self.stream_client.subscribe(symbol, "depth@100ms")
+            if self.stream_bars:
+                await self.stream_client.subscribe(symbol, "aggTrade")
+        asyncio.create_task(self.stream_client.start())
+
+    def _on_trade(self, symbol: str, data: Dict):
+        timestamp = int(data["T"])
+        if symbol not in self._stream_from:
+            self._stream_from[symbol] = self._next_bar_start(timestamp)
+        self.bars.add_trade(symbol, timestamp, float(data["p"]), float(data["q"]))
+
+    def _on_bar(self, symbol: str, bar: Bar, is_correction: bool):
+        """Feed finalized stream bars into the candle series."""
+        if bar.timeframe != self.ohlcv_sync.timeframe:
+            return
+        if bar.timestamp < self._stream_from.get(symbol, bar.timestamp + 1):
+            return  # The stream joined this bar part-way through
+        if (symbol, bar.timeframe) not in self.ohlcv_sync.series:
+            return  # Not warmed up from REST yet
+        self.ohlcv_sync.merge(symbol, _bars_frame([bar]))
+        self.streamed_symbols.add(symbol)
+
+    async def _on_stream_gap(self, stream: str, expected_id: int, received_id: int):
+        symbol, _, channel = stream.partition("@")
+        if channel != "aggTrade":
+            return
+        # Trades were missed: poll REST until a complete bar has streamed again
+        for name in self.symbols:
+            if name.replace("/", "").lower() == symbol:
+                self.streamed_symbols.discard(name)
+                self._stream_from[name] = self._next_bar_start(time.time() * 1000)
+
+    def _next_bar_start(self, timestamp_ms: float) -> int:
+        step = TIMEFRAME_MS[self.ohlcv_sync.timeframe]
+        return int(timestamp_ms // step + 1) * step
+
     async def start(self):
         """Start the realtime pipeline."""
         self.running = True
+        if self.stream_order_books or self.stream_bars:
+            await self._start_streams()
         while self.running:
             try:
                 await self.process_update()
@@ -46,34 +139,87 @@ class RealtimePipeline:
     def stop(self):
         """Stop the realtime pipeline."""
         self.running = False
+        if self.stream_client is not None:
+            asyncio.ensure_future(self.stream_client.stop())
+            self.stream_client = None
 
     async def process_update(self):
         """Process a single update cycle."""
-        # Fetch all data
-        data = await self.fetcher.fetch_all_data(self.symbols)
+        if not self._cursors_loaded:
+            with SessionLocal() as db:
+                self.ohlcv_sync.load_cursors(db)
+            self._cursors_loaded = True
+
+        # Streamed symbols build candles from trades; the rest are polled
+        now_ms = int(time.time() * 1000)
+        streamed = set(self.streamed_symbols)
+        for symbol in streamed:
+            self.bars.flush(symbol, now_ms)
+        polled = [s for s in self.symbols if s not in streamed]
+        # Books kept in sync by the diff stream need no REST depth requests
+        synced_books = [
+            symbol for symbol, book in self.order_books.books.items() if book.synced
+        ]
+
+        # Fetch snapshots and the incremental candle sync together
+        data, candles = await asyncio.gather(
+            self.fetcher.fetch_all_data(
+                self.symbols, include_ohlcv=False, skip_books=synced_books
+            ),
+            self.ohlcv_sync.sync_many(polled),
+        )
+        for symbol in streamed:
+            current = self.bars.current_bar(symbol, self.ohlcv_sync.timeframe)
+            if current is not None:
+                self.ohlcv_sync.merge(symbol, _bars_frame([current]))
+            key = (symbol, self.ohlcv_sync.timeframe)
+            candles[symbol] = (
+                self.ohlcv_sync.series[key],
+                self.ohlcv_sync.pending(symbol),
+            )
 
         # Process each symbol
-        updates = {}
+        frames = {}
         for symbol, symbol_data in data.items():
-            if symbol_data["ohlcv"].empty:
+            series, new_rows = candles[symbol]
+            if series.empty:
                 continue
 
-            # Add technical indicators
-            df = self.feature_engineer.add_technical_indicators(symbol_data["ohlcv"])
+            # Closed candles are folded in once; only the open one is re-evaluated
+            df = self.feature_engineer.update_technical_indicators(symbol, series)
+
+            regime = self._update_regime(symbol, series)
 
             # Store in database
-            with SessionLocal() as db:
-                self._store_data(db, symbol, df)
+            if not new_rows.empty:
+                with SessionLocal() as db:
+                    self._store_data(db, symbol, df.loc[new_rows.index])
+
+            frames[symbol] = (df, regime)
+
+        # Generate predictions from the latest published models, if any, as
+        # one batch across symbols
+        predictions = self._predict(frames)
+
+        updates = {}
+        for symbol, (df, regime) in frames.items():
+            symbol_data = data[symbol]
+
+            # Prefer the streamed book; fall back to the REST snapshot
+            book = self.order_books.books.get(symbol)
+            if book is not None and book.synced:
+                depth = book.top(5)
+                depth["microprice"] = book.microprice()
+            else:
+                depth = symbol_data["market_depth"]
 
-            # Generate predictions
             try:
-                prediction = self.predictor.predict(df)
                 latest_price = float(symbol_data["ticker"]["last"])
                 updates[symbol] = {
                     "price": latest_price,
                     "volume": float(symbol_data["ticker"]["volume"]),
                     "change": float(symbol_data["ticker"]["change"]),
-                    "prediction": prediction,
+                    "prediction": predictions.get(symbol),
                     "technical": {
                         "rsi": float(df["rsi"].iloc[-1]),
                         "macd": float(df["macd"].iloc[-1]),
@@ -81,14 +227,19 @@ class RealtimePipeline:
                         "bb_lower": float(df["bb_low"].iloc[-1]),
                         "atr": float(df["atr"].iloc[-1]),
                     },
+                    "regime": {
+                        "volatility": regime.get("volatility_regime"),
+                        "trend": regime.get("trend_regime"),
+                    },
                     "market_depth": {
-                        "bids": symbol_data["market_depth"].get("bids", [])[:5],
-                        "asks": symbol_data["market_depth"].get("asks", [])[:5],
+                        "bids": depth.get("bids", [])[:5],
+                        "asks": depth.get("asks", [])[:5],
+                        "microprice": depth.get("microprice"),
                     },
                     "timestamp": datetime.now().isoformat(),
                 }
             except Exception as e:
-                logger.error(f"Error generating prediction for {symbol}: {str(e)}")
+                logger.error(f"Error building update for {symbol}: {str(e)}")
 
         # Broadcast updates
         if updates:
@@ -99,38 +250,121 @@ class RealtimePipeline:
                     "timestamp": datetime.now().isoformat(),
                 }
             )
+        if self._update_correlations(candles):
+            await broadcast_updates(
+                {
+                    "type": "correlation_update",
+                    "data": self.correlations.snapshot(),
+                    "timestamp": datetime.now().isoformat(),
+                },
+                channel="technical",
+            )
+
+    def _predict(self, frames: Dict) -> Dict[str, Dict]:
+        """Predictions for symbols with a published model, in one batch."""
+        if self.models is None:
+            return {}
+        requests = {}
+        for symbol, (df, _) in frames.items():
+            predictor = self.models.get(symbol)
+            if predictor is not None:
+                requests[symbol] = (predictor, df)
+        try:
+            predictions, failures = self.batch_predictor.predict(requests)
+        except Exception as e:
+            logger.error(f"Error generating predictions: {str(e)}")
+            return {}
+        for symbol, error in failures.items():
+            logger.error(f"Error generating prediction for {symbol}: {str(error)}")
+        return predictions
+
+    def _update_regime(self, symbol: str, series: pd.DataFrame) -> Dict:
+        """Feed closed candles not yet seen into the symbol's regime classifier."""
+        closed = series.iloc[:-1]
+        seen = self._regime_seen.get(symbol)
+        if seen is not None:
+            closed = closed[closed.index > seen]
+        classifier = self.regimes.setdefault(symbol, RegimeClassifier())
+        for close in closed["close"].to_numpy():
+            classifier.update(float(close))
+        if not closed.empty:
+            self._regime_seen[symbol] = closed.index[-1]
+        return classifier.current
+
+    def _update_correlations(self, candles: Dict) -> bool:
+        """Feed bars every symbol has closed into the correlation engine.
+
+        Bars are taken up to the latest one closed by all symbols with data,
+        so a symbol that is polled later in the cycle is not skipped.
+        Returns whether any bar was added.
+        """
+        closes = {
+            symbol: series["close"].iloc[:-1]
+            for symbol, (series, _) in candles.items()
+            if len(series) > 1
+        }
+        if not closes:
+            return False
+        until = min(close.index[-1] for close in closes.values())
+        frame = pd.concat(closes, axis=1).loc[:until]
+        if self._correlation_seen is not None:
+            frame = frame[frame.index > self._correlation_seen]
+        if frame.empty:
+            return False
+        for timestamp, row in zip(frame.index, frame.to_dict("records")):
+            self.correlations.update(row, timestamp.isoformat())
+        self._correlation_seen = frame.index[-1]
+        return True
 
     def _store_data(self, db, symbol: str, df):
-        """Store data in the database."""
+        """Store newly closed candles and advance the sync cursor."""
         try:
-            latest = df.iloc[-1]
-            price = CryptoPrice(
-                symbol=symbol,
-                timestamp=latest.name,
-                open=float(latest["open"]),
-                high=float(latest["high"]),
-                low=float(latest["low"]),
-                close=float(latest["close"]),
-                volume=float(latest["volume"]),
-            )
-            db.add(price)
-            db.flush()
-
-            # Store technical indicators
-            indicators = TechnicalIndicators(
-                price_id=price.id,
-                rsi=float(latest["rsi"]),
-                macd=float(latest["macd"]),
-                macd_signal=float(latest["macd_signal"]),
-                macd_hist=float(latest["macd_diff"]),
-                bb_upper=float(latest["bb_high"]),
-                bb_middle=float(latest["bb_mid"]),
-                bb_lower=float(latest["bb_low"]),
-                atr=float(latest["atr"]),
-            )
-            db.add(indicators)
+            for timestamp, row in df.iterrows():
+                price = CryptoPrice(
+                    symbol=symbol,
+                    timestamp=timestamp,
+                    open=float(row["open"]),
+                    high=float(row["high"]),
+                    low=float(row["low"]),
+                    close=float(row["close"]),
+                    volume=float(row["volume"]),
+                )
+                db.add(price)
+                db.flush()
+
+                # Store technical indicators
+                indicators = TechnicalIndicators(
+                    price_id=price.id,
+                    rsi=float(row["rsi"]),
+                    macd=float(row["macd"]),
+                    macd_signal=float(row["macd_signal"]),
+                    macd_hist=float(row["macd_diff"]),
+                    bb_upper=float(row["bb_high"]),
+                    bb_middle=float(row["bb_mid"]),
+                    bb_lower=float(row["bb_low"]),
+                    atr=float(row["atr"]),
+                )
+                db.add(indicators)
+
+            if self.candle_store is not None:
+                self.candle_store.write(
+                    symbol, self.ohlcv_sync.timeframe, df[CANDLE_COLUMNS]
+                )
+
+            self.ohlcv_sync.mark_stored(db, symbol, df.index[-1])
             db.commit()
+            self.indicator_cache.invalidate(
+                symbol, self.ohlcv_sync.timeframe, before=df.index[-1]
+            )
 
         except Exception as e:
             logger.error(f"Error storing data for {symbol}: {str(e)}")
             db.rollback()
+
+
+def _bars_frame(bars: List[Bar]) -> pd.DataFrame:
+    df = pd.DataFrame(
+        [bar.as_candle() for bar in bars], columns=["timestamp"] + CANDLE_COLUMNS
+    )
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    return df.set_index("timestamp")
@@ -1,14 +1,16 @@
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional
 
-import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from sqlalchemy.orm import Session
 
-from src.db.models import CryptoPrice, TechnicalIndicators
+from src.data.candle_store import get_candle_store
+from src.db.models import CryptoPrice
+from src.ml.feature_engineering import FeatureEngineer
+from src.ml.model_registry import get_model_registry
 from src.ml.predictor import MarketPredictor
+from src.ml.windows import WindowedDataset
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,26 +18,43 @@ logger = logging.getLogger(__name__)
 
 class TrainingPipeline:
     def __init__(self):
-        self.predictor = MarketPredictor()
+        self.engineer = FeatureEngineer()
+        self.candle_store = get_candle_store()
+        self.registry = get_model_registry()
+        # Models trained by this process, used when no registry is configured
+        self.predictors: Dict[str, MarketPredictor] = {}
         self.training_window = 60  # days of data for training
         self.prediction_horizon = 24  # hours to predict ahead
 
     def prepare_training_data(
-        self, db: Session, symbol: str
-    ) -> Tuple[np.ndarray, np.ndarray]:
+        self, db: Session, symbol: str, predictor: MarketPredictor
+    ) -> WindowedDataset:
         """Prepare data for model training."""
-        # Get historical data
+        # Get historical data. Indicators are recomputed from the candles so
+        # that backfilled history, which has no stored indicators, is usable.
         cutoff = datetime.utcnow() - timedelta(days=self.training_window)
+        if self.candle_store is not None:
+            df = self.candle_store.read(symbol, "1m", start=cutoff)
+        else:
+            df = self._load_from_db(db, symbol, cutoff)
+        df = df[~df.index.duplicated(keep="last")]
+        df = self.engineer.add_features(df, predictor.required_features)
+        df = df.dropna()
+
+        # Prepare lazy feature windows and targets
+        return predictor.prepare_data(df)
+
+    @staticmethod
+    def _load_from_db(db: Session, symbol: str, cutoff: datetime) -> pd.DataFrame:
         query = (
-            db.query(CryptoPrice, TechnicalIndicators)
-            .join(TechnicalIndicators, CryptoPrice.id == TechnicalIndicators.price_id)
+            db.query(CryptoPrice)
             .filter(CryptoPrice.symbol == symbol, CryptoPrice.timestamp >= cutoff)
             .order_by(CryptoPrice.timestamp)
         )
 
         # Convert to DataFrame
         rows = []
-        for price, indicators in query.all():
+        for price in query.all():
             row = {
                 "timestamp": price.timestamp,
                 "open": price.open,
@@ -43,23 +62,12 @@ class TrainingPipeline:
                 "low": price.low,
                 "close": price.close,
                 "volume": price.volume,
-                "rsi": indicators.rsi,
-                "macd": indicators.macd,
-                "macd_signal": indicators.macd_signal,
-                "macd_hist": indicators.macd_hist,
-                "bb_upper": indicators.bb_upper,
-                "bb_middle": indicators.bb_middle,
-                "bb_lower": indicators.bb_lower,
-                "atr": indicators.atr,
             }
             rows.append(row)
 
         df = pd.DataFrame(rows)
         df.set_index("timestamp", inplace=True)
-
-        # Prepare features and target
-        X, y = self.predictor.prepare_data(df)
-        return X, y
+        return df
 
     def train_model(self, db: Session, symbol: str) -> Dict:
         """Train the model for a specific symbol."""
@@ -67,25 +75,31 @@ class TrainingPipeline:
             logger.info(f"Starting training for {symbol}")
 
             # Prepare data
-            X, y = self.prepare_training_data(db, symbol)
-            if len(X) < 100:  # Minimum data requirement
+            predictor = MarketPredictor()
+            dataset = self.prepare_training_data(db, symbol, predictor)
+            if len(dataset) < 100:  # Minimum data requirement
                 raise ValueError(f"Insufficient data for {symbol}")
 
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, shuffle=False
-            )
+            # Split data chronologically
+            train, test = dataset.split(0.8)
 
             # Train model
-            self.predictor.train(X_train, y_train)
+            predictor.train(train)
 
             # Evaluate
-            train_metrics = self.predictor.evaluate(X_train, y_train)
-            test_metrics = self.predictor.evaluate(X_test, y_test)
+            train_metrics = predictor.evaluate(train)
+            test_metrics = predictor.evaluate(test)
+
+            # Publish for every process serving predictions
+            metrics = {"train": train_metrics, "test": test_metrics}
+            if self.registry is not None:
+                self.registry.publish(symbol, predictor, metrics)
+            self.predictors[symbol] = predictor
 
-            logger.info(f"Training completed for {symbol}")
+            logger.info(f"Training completed for {symbol} ({predictor.version})")
             return {
                 "symbol": symbol,
+                "version": predictor.version,
                 "training_time": datetime.utcnow().isoformat(),
                 "train_metrics": train_metrics,
                 "test_metrics": test_metrics,
@@ -95,6 +109,14 @@ class TrainingPipeline:
             logger.error(f"Error training model for {symbol}: {str(e)}")
             raise
 
+    def predictor_for(self, symbol: str) -> Optional[MarketPredictor]:
+        """The latest trained model for `symbol`, or None; never trains."""
+        if self.registry is not None:
+            predictor = self.registry.get(symbol)
+            if predictor is not None:
+                return predictor
+        return self.predictors.get(symbol)
+
     def train_all_models(self, db: Session, symbols: List[str]) -> Dict[str, Dict]:
         """Train models for all specified symbols."""
         results = {}
@@ -105,3 +127,14 @@ class TrainingPipeline:
                 logger.error(f"Failed to train model for {symbol}: {str(e)}")
                 results[symbol] = {"error": str(e)}
         return results
+
+
+_pipeline: Optional[TrainingPipeline] = None
+
+
+def get_training_pipeline() -> TrainingPipeline:
+    """The training pipeline of this process, created on first use."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = TrainingPipeline()
+    return _pipeline
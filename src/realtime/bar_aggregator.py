@@ -0,0 +1,216 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+TIMEFRAME_MS = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "1d": 86_400_000,
+}
+
+
+@dataclass
+class Bar:
+    timeframe: str
+    timestamp: int  # bar open time, epoch ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    trades: int = 0
+
+    def merge(self, other: "Bar"):
+        """Fold a lower-timeframe bar (or a restated one) into this bar."""
+        self.high = max(self.high, other.high)
+        self.low = min(self.low, other.low)
+        self.close = other.close
+        self.volume += other.volume
+        self.trades += other.trades
+
+    def as_candle(self) -> List:
+        return [
+            self.timestamp,
+            self.open,
+            self.high,
+            self.low,
+            self.close,
+            self.volume,
+        ]
+
+
+class BarAggregator:
+    """Builds OHLCV bars from a trade stream and rolls them up incrementally.
+
+    Trades update the open bar of the base timeframe. When a trade crosses a
+    base bar boundary the bar is finalized and folded into the open bar of
+    every higher timeframe, so higher timeframes never rescan trades.
+    Trades up to `allowed_lateness_ms` behind the open bar are still merged
+    into the finalized bar they belong to, and into the rollups covering
+    it; bars already emitted are re-emitted as corrections. Anything older
+    is counted and dropped.
+
+    Finalized bars are passed to every `on_bar(symbol, bar, is_correction)`
+    callback.
+    """
+
+    def __init__(
+        self,
+        base_timeframe: str = "1s",
+        rollups: Optional[List[str]] = None,
+        allowed_lateness_ms: int = 2_000,
+    ):
+        self.base_timeframe = base_timeframe
+        self.base_ms = TIMEFRAME_MS[base_timeframe]
+        rollups = rollups or ["1m", "5m", "15m", "1h", "1d"]
+        for timeframe in rollups:
+            if TIMEFRAME_MS[timeframe] % self.base_ms:
+                raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+        self.rollups = sorted(rollups, key=TIMEFRAME_MS.get)
+        self.allowed_lateness_ms = allowed_lateness_ms
+        self.open_bars: Dict[str, Dict[str, Bar]] = {}
+        self.last_closed: Dict[str, Bar] = {}
+        # Last emitted bar per symbol and rollup timeframe, for late trades
+        self.last_rollups: Dict[str, Dict[str, Bar]] = {}
+        self.late_trades = 0
+        self.callbacks: List[Callable] = []
+
+    def add_callback(self, callback: Callable):
+        self.callbacks.append(callback)
+
+    def _emit(self, symbol: str, bar: Bar, is_correction: bool = False):
+        for callback in self.callbacks:
+            callback(symbol, bar, is_correction)
+
+    def current_bar(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        """The in-progress bar, including the in-progress base bar's trades."""
+        bars = self.open_bars.get(symbol, {})
+        base = bars.get(self.base_timeframe)
+        if timeframe == self.base_timeframe:
+            return base
+        bar = bars.get(timeframe)
+        if base is None:
+            # Flushed base bar; the rollup may still be open
+            return Bar(**vars(bar)) if bar is not None else None
+        if bar is None:
+            return Bar(
+                timeframe,
+                _floor(base.timestamp, timeframe),
+                base.open,
+                base.high,
+                base.low,
+                base.close,
+                base.volume,
+                base.trades,
+            )
+        current = Bar(**vars(bar))
+        current.merge(base)
+        return current
+
+    def add_trade(self, symbol: str, timestamp_ms: int, price: float, quantity: float):
+        bars = self.open_bars.setdefault(symbol, {})
+        base = bars.get(self.base_timeframe)
+        bar_start = timestamp_ms - timestamp_ms % self.base_ms
+        trade = Bar(
+            self.base_timeframe, bar_start, price, price, price, price, quantity, 1
+        )
+
+        if base is None:
+            # After a flush the next base bar starts where the closed one ended;
+            # anything before that is late, not the start of a new bar.
+            closed = self.last_closed.get(symbol)
+            if closed is not None and bar_start <= closed.timestamp:
+                self._add_late_trade(symbol, trade, closed.timestamp + self.base_ms)
+            else:
+                bars[self.base_timeframe] = trade
+            return
+
+        if bar_start < base.timestamp:
+            self._add_late_trade(symbol, trade, base.timestamp)
+        elif bar_start == base.timestamp:
+            base.merge(trade)
+        else:
+            self._close_base_bar(symbol, base)
+            self._close_rollups(symbol, bar_start)
+            bars[self.base_timeframe] = trade
+
+    def flush(self, symbol: str, now_ms: int):
+        """Finalize bars whose interval has ended even if no trade arrived."""
+        bars = self.open_bars.get(symbol, {})
+        base = bars.get(self.base_timeframe)
+        if base is not None and now_ms >= base.timestamp + self.base_ms:
+            del bars[self.base_timeframe]
+            self._close_base_bar(symbol, base)
+        self._close_rollups(symbol, now_ms)
+
+    def _close_base_bar(self, symbol: str, base: Bar):
+        self.last_closed[symbol] = base
+        self._emit(symbol, base)
+        bars = self.open_bars[symbol]
+        for timeframe in self.rollups:
+            bar = bars.get(timeframe)
+            if bar is None:
+                bars[timeframe] = Bar(
+                    timeframe,
+                    _floor(base.timestamp, timeframe),
+                    base.open,
+                    base.high,
+                    base.low,
+                    base.close,
+                    base.volume,
+                    base.trades,
+                )
+            else:
+                bar.merge(base)
+
+    def _close_rollups(self, symbol: str, now_ms: int):
+        bars = self.open_bars.get(symbol, {})
+        for timeframe in self.rollups:
+            bar = bars.get(timeframe)
+            if bar is not None and now_ms >= bar.timestamp + TIMEFRAME_MS[timeframe]:
+                del bars[timeframe]
+                self.last_rollups.setdefault(symbol, {})[timeframe] = bar
+                self._emit(symbol, bar)
+
+    def _add_late_trade(self, symbol: str, trade: Bar, open_start: int):
+        closed = self.last_closed.get(symbol)
+        too_late = open_start - trade.timestamp > self.allowed_lateness_ms
+        if closed is None or closed.timestamp != trade.timestamp or too_late:
+            self.late_trades += 1
+            return
+
+        # Merge into the finalized base bar and the rollups it fed, keeping
+        # close prices from the later trades already applied.
+        _merge_late(closed, trade)
+        corrected = [closed]
+        open_bars = self.open_bars[symbol]
+        emitted = self.last_rollups.get(symbol, {})
+        for timeframe in self.rollups:
+            bar = open_bars.get(timeframe)
+            if bar is not None and _covers(bar, trade.timestamp):
+                _merge_late(bar, trade)
+                continue
+            # The rollup has closed since, e.g. a trade from just before a
+            # minute boundary arriving just after it
+            bar = emitted.get(timeframe)
+            if bar is not None and _covers(bar, trade.timestamp):
+                _merge_late(bar, trade)
+                corrected.append(bar)
+        for bar in corrected:
+            self._emit(symbol, bar, is_correction=True)
+
+
+def _covers(bar: Bar, timestamp_ms: int) -> bool:
+    return bar.timestamp <= timestamp_ms < bar.timestamp + TIMEFRAME_MS[bar.timeframe]
+
+
+def _merge_late(bar: Bar, trade: Bar):
+    close = bar.close
+    bar.merge(trade)
+    bar.close = close
+
+
+def _floor(timestamp_ms: int, timeframe: str) -> int:
+    return timestamp_ms - timestamp_ms % TIMEFRAME_MS[timeframe]
@@ -1,44 +1,66 @@
-from collections import deque
-from datetime import datetime
-from typing import Dict, List
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.realtime.order_book import LocalOrderBook
+from src.realtime.ring_buffer import TradeRingBuffer
 
 
 class DataProcessor:
     def __init__(self, max_data_points: int = 1000):
-        self.price_data: Dict[str, deque] = {}
-        self.volume_data: Dict[str, deque] = {}
-        self.order_book: Dict[str, Dict] = {}
+        # Each symbol preallocates a TradeRingBuffer of 2 * max_data_points
+        # slots at 25 bytes each, i.e. 50 bytes per retained trade per symbol.
+        self.price_data: Dict[str, TradeRingBuffer] = {}
+        self.order_book: Dict[str, LocalOrderBook] = {}
         self.max_data_points = max_data_points
 
     def process_trade(self, symbol: str, data: Dict):
         if symbol not in self.price_data:
-            self.price_data[symbol] = deque(maxlen=self.max_data_points)
-            self.volume_data[symbol] = deque(maxlen=self.max_data_points)
+            self.price_data[symbol] = TradeRingBuffer(self.max_data_points)
 
+        # Exchange trade time when present; `m` means the buyer was the maker,
+        # i.e. the aggressor sold.
+        timestamp = data["T"] * 1_000_000 if "T" in data else time.time_ns()
+        side = -1 if data.get("m") else 1
         self.price_data[symbol].append(
-            {
-                "timestamp": datetime.now(),
-                "price": float(data["p"]),
-                "volume": float(data["q"]),
-            }
+            timestamp, float(data["p"]), float(data["q"]), side
         )
 
-    def process_order_book(self, symbol: str, data: Dict):
-        self.order_book[symbol] = {
-            "bids": data["bids"],
-            "asks": data["asks"],
-            "timestamp": datetime.now(),
-        }
+    def process_order_book(self, symbol: str, data: Dict) -> bool:
+        """Apply a REST snapshot or a diff-depth event to the local book.
+
+        Returns False when a diff event breaks the update-ID sequence, or when
+        a snapshot carries no `lastUpdateId` to sequence diffs against; the
+        caller then has to supply a fresh snapshot.
+        """
+        if symbol not in self.order_book:
+            self.order_book[symbol] = LocalOrderBook(symbol)
+        book = self.order_book[symbol]
+
+        if "U" in data:
+            return book.apply_diff(data)
+        if "lastUpdateId" not in data:
+            book.synced = False
+            return False
+        book.apply_snapshot(data)
+        return True
 
     def get_latest_price(self, symbol: str) -> float:
-        if symbol in self.price_data and self.price_data[symbol]:
-            return self.price_data[symbol][-1]["price"]
+        if symbol in self.price_data and len(self.price_data[symbol]):
+            return self.price_data[symbol].last_price()
         return 0.0
 
-    def get_price_history(self, symbol: str) -> List[Dict]:
+    def get_price_history(
+        self, symbol: str, n: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Zero-copy views over the last `n` trades (timestamp ns, price,
+        quantity, side)."""
         if symbol in self.price_data:
-            return list(self.price_data[symbol])
-        return []
+            return self.price_data[symbol].window(n)
+        return {}
 
-    def get_order_book(self, symbol: str) -> Dict:
-        return self.order_book.get(symbol, {})
+    def get_order_book(self, symbol: str, depth: int = 20) -> Dict:
+        if symbol not in self.order_book:
+            return {}
+        return self.order_book[symbol].top(depth)
@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class TradeRingBuffer:
+    """Fixed-capacity trade history backed by preallocated numpy arrays.
+
+    Every trade is written twice, at `i` and `i + capacity`, into arrays of
+    twice the capacity. Any window of up to `capacity` most recent trades is
+    then one contiguous slice, so reads are zero-copy views and appends are
+    O(1) with no per-trade Python objects.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)  # epoch ns
+        self.prices = np.zeros(2 * capacity, dtype=np.float64)
+        self.quantities = np.zeros(2 * capacity, dtype=np.float64)
+        self.sides = np.zeros(2 * capacity, dtype=np.int8)  # 1 buy, -1 sell
+        self._next = 0  # slot the next trade is written to
+        self.count = 0  # trades appended in total
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp_ns: int, price: float, quantity: float, side: int = 0):
+        i, j = self._next, self._next + self.capacity
+        self.timestamps[i] = self.timestamps[j] = timestamp_ns
+        self.prices[i] = self.prices[j] = price
+        self.quantities[i] = self.quantities[j] = quantity
+        self.sides[i] = self.sides[j] = side
+        self._next = (self._next + 1) % self.capacity
+        self.count += 1
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Read-only views over the last `n` trades (all retained by default)."""
+        size = len(self) if n is None else min(n, len(self))
+        end = self._next + self.capacity
+        if self.count < self.capacity:
+            end = self._next  # Not wrapped yet; first copy is contiguous
+        start = end - size
+        views = {
+            "timestamp": self.timestamps[start:end],
+            "price": self.prices[start:end],
+            "quantity": self.quantities[start:end],
+            "side": self.sides[start:end],
+        }
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    def last_price(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return float(self.prices[self._next - 1])
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.timestamps.nbytes
+            + self.prices.nbytes
+            + self.quantities.nbytes
+            + self.sides.nbytes
+        )
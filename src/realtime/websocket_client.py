@@ -1,57 +1,246 @@
 import asyncio
 import json
-from typing import Callable, Dict
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
 
 import websockets
 
+logger = logging.getLogger(__name__)
+
+BINANCE_FUTURES_STREAM_URL = "wss://fstream.binance.com/stream"
+
+
+@dataclass
+class StreamStats:
+    """Per-stream delivery statistics."""
+
+    messages: int = 0
+    gaps: int = 0
+    last_id: Optional[int] = None
+    last_event_time: Optional[int] = None
+    lag_ms: float = 0.0  # exponentially smoothed exchange-to-local latency
+
+
+def sequence_ids(channel: str, data: Dict):
+    """Return (first_id, last_id, previous_id) for sequenced stream events.
+
+    Diff-depth events carry an update-ID range (futures also send the range
+    end of the previous event as `pu`); trade and aggregate-trade IDs
+    increase by one per event. Other channels are not sequenced.
+    """
+    if channel.startswith("depth") and "u" in data:
+        return data["U"], data["u"], data.get("pu")
+    if channel == "trade" and "t" in data:
+        return data["t"], data["t"], None
+    if channel == "aggTrade" and "a" in data:
+        return data["a"], data["a"], None
+    return None
+
+
+class StreamConnection:
+    """One combined-stream socket carrying up to `max_streams` subscriptions."""
+
+    def __init__(self, client: "WebSocketClient", index: int):
+        self.client = client
+        self.index = index
+        self.streams: Set[str] = set()
+        self.websocket = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+
+    async def send_subscription(self, method: str, streams: List[str]):
+        if not self.connected.is_set():
+            return  # (Re)subscribed in bulk once the socket is up
+        # Binance rejects very large or very frequent control messages
+        for i in range(0, len(streams), self.client.streams_per_message):
+            await self.websocket.send(
+                json.dumps(
+                    {
+                        "method": method,
+                        "params": streams[i : i + self.client.streams_per_message],
+                        "id": self.client.next_request_id(),
+                    }
+                )
+            )
+            await asyncio.sleep(self.client.control_interval)
+
+    async def run(self):
+        attempt = 0
+        while self.client.running:
+            try:
+                async with websockets.connect(
+                    self.client.url, ping_interval=20, ping_timeout=20
+                ) as websocket:
+                    self.websocket = websocket
+                    self.connected.set()
+                    await self.send_subscription("SUBSCRIBE", sorted(self.streams))
+                    async for message in websocket:
+                        attempt = 0
+                        await self.client.dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream connection {self.index} dropped: {str(e)}")
+            finally:
+                self.connected.clear()
+                self.websocket = None
+
+            if not self.client.running:
+                break
+            # Sequence state is kept across reconnects, so events missed while
+            # the socket was down surface as a gap on the first new event.
+            self.reconnects += 1
+            delay = min(self.client.max_backoff, 2**attempt) * random.uniform(0.5, 1)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+
 
 class WebSocketClient:
-    def __init__(self):
-        self.connections: Dict[str, websockets.WebSocketClientProtocol] = {}
+    """Multiplexed Binance combined-stream client.
+
+    Many `symbol@channel` streams share a few sockets: subscriptions are
+    sharded onto a new connection once one reaches `max_streams_per_connection`,
+    and each connection reconnects with exponential backoff and resubscribes
+    on its own. Sequenced streams (diff depth, trades) are checked for ID
+    gaps, and per-stream exchange-to-local lag is tracked in `stats`.
+    """
+
+    def __init__(
+        self,
+        url: str = BINANCE_FUTURES_STREAM_URL,
+        max_streams_per_connection: int = 200,
+        streams_per_message: int = 50,
+        control_interval: float = 0.2,
+        max_backoff: float = 60.0,
+    ):
+        self.url = url
+        self.max_streams_per_connection = max_streams_per_connection
+        self.streams_per_message = streams_per_message
+        self.control_interval = control_interval
+        self.max_backoff = max_backoff
+        self.connections: List[StreamConnection] = []
         self.callbacks: Dict[str, Callable] = {}
+        self.gap_callbacks: List[Callable] = []
+        self.stats: Dict[str, StreamStats] = {}
         self.running = False
+        self._tasks: List[asyncio.Task] = []
+        self._stopped: Optional[asyncio.Event] = None
+        self._request_id = 0
+
+    def next_request_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    @staticmethod
+    def stream_name(symbol: str, channel: str) -> str:
+        return f"{symbol.replace('/', '').lower()}@{channel}"
 
-    async def connect(self, url: str, symbol: str):
-        try:
-            websocket = await websockets.connect(url)
-            self.connections[symbol] = websocket
-            return True
-        except Exception as e:
-            print(f"Connection error for {symbol}: {str(e)}")
-            return False
+    def _connection_for(self, stream: str) -> Optional[StreamConnection]:
+        for connection in self.connections:
+            if stream in connection.streams:
+                return connection
+        return None
+
+    def _shard(self) -> StreamConnection:
+        for connection in self.connections:
+            if len(connection.streams) < self.max_streams_per_connection:
+                return connection
+        connection = StreamConnection(self, len(self.connections))
+        self.connections.append(connection)
+        if self.running:
+            self._tasks.append(asyncio.create_task(connection.run()))
+        return connection
 
     async def subscribe(self, symbol: str, channel: str):
-        if symbol in self.connections:
-            subscription = {
-                "method": "SUBSCRIBE",
-                "params": [f"{symbol}@{channel}"],
-                "id": 1,
-            }
-            await self.connections[symbol].send(json.dumps(subscription))
+        stream = self.stream_name(symbol, channel)
+        if self._connection_for(stream) is not None:
+            return
+        connection = self._shard()
+        connection.streams.add(stream)
+        await connection.send_subscription("SUBSCRIBE", [stream])
+
+    async def unsubscribe(self, symbol: str, channel: str):
+        stream = self.stream_name(symbol, channel)
+        connection = self._connection_for(stream)
+        if connection is None:
+            return
+        connection.streams.discard(stream)
+        self.stats.pop(stream, None)
+        await connection.send_subscription("UNSUBSCRIBE", [stream])
 
     def add_callback(self, symbol: str, callback: Callable):
-        self.callbacks[symbol] = callback
+        """Register `await callback(stream, data)` for all of a symbol's streams."""
+        self.callbacks[symbol.replace("/", "").lower()] = callback
 
-    async def start(self):
-        self.running = True
-        tasks = [self.listen(symbol) for symbol in self.connections]
-        await asyncio.gather(*tasks)
+    def add_gap_callback(self, callback: Callable):
+        """Register `await callback(stream, expected_id, received_id)`."""
+        self.gap_callbacks.append(callback)
 
-    async def listen(self, symbol: str):
-        while self.running:
-            try:
-                if symbol in self.connections:
-                    message = await self.connections[symbol].recv()
-                    data = json.loads(message)
+    async def dispatch(self, message: str):
+        payload = json.loads(message)
+        stream, data = payload.get("stream"), payload.get("data")
+        if stream is None:
+            if payload.get("error"):
+                logger.error(f"Stream control request failed: {payload['error']}")
+            return  # Subscription acknowledgement
+
+        symbol, _, channel = stream.partition("@")
+        stats = self.stats.setdefault(stream, StreamStats())
+        stats.messages += 1
+
+        event_time = data.get("E") if isinstance(data, dict) else None
+        if event_time:
+            lag = time.time() * 1000 - event_time
+            stats.lag_ms = (
+                lag if stats.messages == 1 else 0.9 * stats.lag_ms + 0.1 * lag
+            )
+            stats.last_event_time = event_time
+
+        ids = sequence_ids(channel, data) if isinstance(data, dict) else None
+        if ids is not None:
+            first_id, last_id, previous_id = ids
+            if stats.last_id is not None:
+                if previous_id is not None:
+                    in_sequence = previous_id == stats.last_id
+                else:
+                    in_sequence = first_id == stats.last_id + 1
+                if not in_sequence:
+                    stats.gaps += 1
+                    for callback in self.gap_callbacks:
+                        await callback(stream, stats.last_id + 1, first_id)
+            stats.last_id = last_id
 
-                    if symbol in self.callbacks:
-                        await self.callbacks[symbol](data)
+        callback = self.callbacks.get(symbol)
+        if callback is not None:
+            try:
+                await callback(stream, data)
             except Exception as e:
-                print(f"Error in listener for {symbol}: {str(e)}")
-                await asyncio.sleep(5)  # Retry delay
+                logger.error(f"Error in callback for {stream}: {str(e)}")
+
+    async def start(self):
+        """Run all connections until `stop` is called."""
+        self.running = True
+        self._stopped = asyncio.Event()
+        # Connections sharded off later start their own tasks in `_shard`
+        self._tasks = [
+            asyncio.create_task(connection.run()) for connection in self.connections
+        ]
+        await self._stopped.wait()
 
     async def stop(self):
         self.running = False
-        for symbol, conn in self.connections.items():
-            await conn.close()
-        self.connections.clear()
+        if self._stopped is not None:
+            self._stopped.set()
+        for connection in self.connections:
+            await connection.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -1,13 +1,9 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-
 
 class SentimentAnalyzer:
     def __init__(self):
-        self.vader = SentimentIntensityAnalyzer()
         self.custom_terms = {
             "bullish": 2.0,
             "bearish": -2.0,
@@ -15,9 +11,21 @@ class SentimentAnalyzer:
             "dump": -1.5,
             "hodl": 0.5,
         }
-        self.vader.lexicon.update(self.custom_terms)
+        self._vader = None
+
+    @property
+    def vader(self):
+        # Imported and built on first use; loading the lexicon is slow
+        if self._vader is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+            self._vader = SentimentIntensityAnalyzer()
+            self._vader.lexicon.update(self.custom_terms)
+        return self._vader
 
     def analyze_text(self, text: str) -> Dict:
+        from textblob import TextBlob
+
         blob = TextBlob(text)
         vader_scores = self.vader.polarity_scores(text)
 
@@ -5,20 +5,23 @@ from sqlalchemy import create_engine
 
 from src.api.websocket import broadcast_updates
 from src.db.database import get_db
-from src.pipeline.data_pipeline import DataPipeline
-from src.pipeline.training_pipeline import TrainingPipeline
+from src.pipeline.data_pipeline import get_data_pipeline
+from src.pipeline.training_pipeline import get_training_pipeline
 
 app = Celery("tasks")
 app.config_from_object("src.celeryconfig")
 
-data_pipeline = DataPipeline()
-training_pipeline = TrainingPipeline()
+# Pipelines are created by the first task that needs them, so the beat
+# scheduler never loads them at all.
 
 
 @app.task
 def update_market_data():
     """Fetch latest market data and broadcast updates."""
     try:
+        data_pipeline = get_data_pipeline()
+        training_pipeline = get_training_pipeline()
+
         # Get fresh market data
         data = data_pipeline.update_market_data()
 
@@ -45,7 +48,9 @@ def retrain_models():
     """Retrain all models with latest data."""
     try:
         with get_db() as db:
-            results = training_pipeline.train_all_models(db, data_pipeline.symbols)
+            results = get_training_pipeline().train_all_models(
+                db, get_data_pipeline().symbols
+            )
         return results
     except Exception as e:
         print(f"Error in retrain_models: {str(e)}")
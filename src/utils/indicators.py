@@ -1,25 +1,33 @@
+import numpy as np
+
+from src.ml import kernels
+
+
 def calculate_rsi(prices, period=14):
-    gains = []
-    losses = []
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i - 1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-
-    avg_gain = sum(gains[:period]) / period
-    avg_loss = sum(losses[:period]) / period
-
-    if avg_loss == 0:
-        return 100
+    """Latest RSI of `prices`.
 
-    rs = avg_gain / avg_loss
+    Uses Wilder smoothing, as `ta` does, once `period` prices are available;
+    shorter series fall back to the plain ratio of total gains to losses.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) >= period:
+        return float(kernels.rsi(prices, period)[-1])
+
+    changes = np.diff(prices)
+    gains = changes[changes > 0].sum()
+    losses = -changes[changes < 0].sum()
+    if losses == 0:
+        return 100
+    rs = gains / losses
     return 100 - (100 / (1 + rs))
 
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
-    # MACD calculation
-    pass
+    """Latest MACD line, signal line and histogram of `prices`.
+
+    Values are NaN until enough prices exist for the slow EMA and the signal.
+    """
+    macd, signal_line, histogram = kernels.macd(
+        np.asarray(prices, dtype=np.float64), fast, slow, signal
+    )
+    return float(macd[-1]), float(signal_line[-1]), float(histogram[-1])
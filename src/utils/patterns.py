@@ -1,13 +1,172 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+def sliding_extreme(values, size: int, reducer=np.minimum) -> np.ndarray:
+    """Min (or max, with `np.maximum`) of every length-`size` window.
+
+    Uses the van Herk/Gil-Werman block scheme: per-block prefix and suffix
+    running extremes are combined so each window costs O(1) regardless of
+    `size`. Works along the last axis; element `i` of the result covers
+    `values[..., i : i + size]`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    if size > n:
+        return np.empty(values.shape[:-1] + (0,))
+
+    fill = np.inf if reducer is np.minimum else -np.inf
+    blocks = -(-n // size)
+    padded = np.full(values.shape[:-1] + (blocks * size,), fill)
+    padded[..., :n] = values
+    shaped = padded.reshape(values.shape[:-1] + (blocks, size))
+    prefix = reducer.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffix = reducer.accumulate(shaped[..., ::-1], axis=-1)[..., ::-1]
+    suffix = suffix.reshape(padded.shape)
+    return reducer(suffix[..., : n - size + 1], prefix[..., size - 1 : n])
+
+
+def pivot_masks(
+    prices, windows: Sequence[int] = (5,), high=None, low=None
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """Boolean support/resistance masks per window, along the last axis.
+
+    A point is a pivot for `window` when it is the extreme of the
+    `2 * window + 1` values centred on it; ties count, as in `is_support`.
+    Supports are taken from `low` and resistances from `high` when given.
+    Accepts a (symbols, time) panel as well as a single series.
+    """
+    low = np.asarray(prices if low is None else low, dtype=np.float64)
+    high = np.asarray(prices if high is None else high, dtype=np.float64)
+    n = low.shape[-1]
+    masks = {}
+    for window in windows:
+        size = 2 * window + 1
+        support = np.zeros(low.shape, dtype=bool)
+        resistance = np.zeros(high.shape, dtype=bool)
+        if n >= size:
+            centre = slice(window, n - window)
+            support[..., centre] = low[..., centre] == sliding_extreme(low, size)
+            resistance[..., centre] = high[..., centre] == sliding_extreme(
+                high, size, np.maximum
+            )
+        masks[window] = {"support": support, "resistance": resistance}
+    return masks
+
+
+def find_pivots(
+    prices, windows: Sequence[int] = (5,), high=None, low=None
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """Indices of local minima (support) and maxima (resistance) per window."""
+    return {
+        window: {kind: np.flatnonzero(mask) for kind, mask in found.items()}
+        for window, found in pivot_masks(prices, windows, high, low).items()
+    }
+
+
 def find_support_resistance(prices, window=5):
-    levels = []
+    pivots = find_pivots(prices, (window,))[window]
+    prices = np.asarray(prices)
+    support, resistance = pivots["support"], pivots["resistance"]
+
+    # Ordered by index, support before resistance at the same index
+    kinds = np.concatenate([np.zeros(len(support)), np.ones(len(resistance))])
+    indices = np.concatenate([support, resistance])
+    order = np.lexsort((kinds, indices))
+    names = ("support", "resistance")
+    return [(names[int(kinds[i])], prices[indices[i]]) for i in order]
+
+
+def support_resistance_zones(
+    prices,
+    windows: Sequence[int] = (5, 20, 60),
+    tolerance: float = 0.002,
+    high=None,
+    low=None,
+) -> List[Dict]:
+    """Cluster pivots from several windows into price zones.
+
+    Pivot prices are sorted and grouped greedily: a zone starts at the lowest
+    unassigned level and takes every level within `tolerance` (relative) of
+    it, so zones never grow wider than that however dense the pivots are.
+    Each zone reports its range, touch counts and a strength in [0, 1] that
+    weights touches by pivot window (a pivot confirmed over a longer window
+    counts for more) and by recency. Zones are returned strongest first and
+    labelled support or resistance relative to the last price.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    low_values = prices if low is None else np.asarray(low, dtype=np.float64)
+    high_values = prices if high is None else np.asarray(high, dtype=np.float64)
+
+    levels, indices, weights, is_support = [], [], [], []
+    for window, found in find_pivots(prices, windows, high, low).items():
+        for kind, source in (("support", low_values), ("resistance", high_values)):
+            idx = found[kind]
+            levels.append(source[idx])
+            indices.append(idx)
+            weights.append(np.full(len(idx), float(window)))
+            is_support.append(np.full(len(idx), kind == "support"))
+    if not levels or not sum(len(level) for level in levels):
+        return []
+
+    levels = np.concatenate(levels)
+    indices = np.concatenate(indices)
+    is_support = np.concatenate(is_support)
+    # Older touches fade linearly to half weight at the start of the series
+    weights = np.concatenate(weights) * (0.5 + 0.5 * indices / max(n - 1, 1))
+
+    order = np.argsort(levels, kind="stable")
+    levels, indices, weights, is_support = (
+        levels[order],
+        indices[order],
+        weights[order],
+        is_support[order],
+    )
+    starts = _zone_starts(levels, tolerance)
+    count = len(starts)
+    labels = np.zeros(len(levels), dtype=np.intp)
+    labels[starts[1:]] = 1
+    labels = np.cumsum(labels)
+
+    touches = np.bincount(labels, minlength=count)
+    support_touches = np.bincount(labels, weights=is_support, minlength=count)
+    strength = np.bincount(labels, weights=weights, minlength=count)
+    level = np.bincount(labels, weights=levels * weights, minlength=count) / strength
+    zone_low = levels[starts]
+    zone_high = np.maximum.reduceat(levels, starts)
+    last_touch = np.maximum.reduceat(indices, starts)
+    strength = strength / strength.max()
+
+    last_price = prices[-1]
+    zones = [
+        {
+            "level": float(level[z]),
+            "low": float(zone_low[z]),
+            "high": float(zone_high[z]),
+            "type": "support" if level[z] <= last_price else "resistance",
+            "touches": int(touches[z]),
+            "support_touches": int(support_touches[z]),
+            "resistance_touches": int(touches[z] - support_touches[z]),
+            "last_touch": int(last_touch[z]),
+            "strength": float(strength[z]),
+        }
+        for z in range(count)
+    ]
+    zones.sort(key=lambda zone: zone["strength"], reverse=True)
+    return zones
 
-    for i in range(window, len(prices) - window):
-        if is_support(prices, i, window):
-            levels.append(("support", prices[i]))
-        if is_resistance(prices, i, window):
-            levels.append(("resistance", prices[i]))
 
-    return levels
+def _zone_starts(levels: np.ndarray, tolerance: float) -> np.ndarray:
+    """First index of each zone in sorted `levels`; one search per zone."""
+    starts = []
+    start, n = 0, len(levels)
+    while start < n:
+        starts.append(start)
+        bound = levels[start] + tolerance * abs(levels[start])
+        start = int(np.searchsorted(levels, bound, side="right"))
+    return np.array(starts, dtype=np.intp)
 
 
 def is_support(prices, i, window):
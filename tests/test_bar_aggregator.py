@@ -0,0 +1,123 @@
+import pytest
+
+from src.realtime.bar_aggregator import BarAggregator
+
+
+def collect(aggregator):
+    emitted = []
+    aggregator.add_callback(
+        lambda symbol, bar, is_correction: emitted.append((bar, is_correction))
+    )
+    return emitted
+
+
+def test_bars_roll_up_and_finalize_at_boundaries():
+    aggregator = BarAggregator(rollups=["1m", "5m"])
+    emitted = collect(aggregator)
+
+    aggregator.add_trade("BTCUSDT", 0, 100.0, 1.0)
+    aggregator.add_trade("BTCUSDT", 500, 105.0, 2.0)
+    aggregator.add_trade("BTCUSDT", 30_000, 95.0, 1.0)
+    aggregator.add_trade("BTCUSDT", 59_999, 101.0, 1.0)
+    assert [bar.timeframe for bar, _ in emitted] == ["1s", "1s"]
+
+    current = aggregator.current_bar("BTCUSDT", "1m")
+    assert (current.open, current.high, current.low, current.close) == (
+        100.0,
+        105.0,
+        95.0,
+        101.0,
+    )
+    assert current.volume == 5.0
+
+    aggregator.add_trade("BTCUSDT", 60_000, 102.0, 1.0)
+    minute = [bar for bar, _ in emitted if bar.timeframe == "1m"]
+    assert len(minute) == 1
+    assert minute[0].timestamp == 0
+    assert minute[0].as_candle() == [0, 100.0, 105.0, 95.0, 101.0, 5.0]
+    assert minute[0].trades == 4
+    assert not any(bar.timeframe == "5m" for bar, _ in emitted)
+
+    aggregator.flush("BTCUSDT", 300_000)
+    five = [bar for bar, _ in emitted if bar.timeframe == "5m"]
+    assert five[0].high == 105.0 and five[0].close == 102.0
+    assert five[0].volume == 6.0
+
+
+def test_late_trades_correct_closed_bar_or_are_dropped():
+    aggregator = BarAggregator(rollups=["1m"], allowed_lateness_ms=2_000)
+    emitted = collect(aggregator)
+
+    aggregator.add_trade("ETHUSDT", 1_000, 10.0, 1.0)
+    aggregator.add_trade("ETHUSDT", 2_000, 11.0, 1.0)
+    aggregator.add_trade("ETHUSDT", 1_500, 12.0, 1.0)
+
+    bar, is_correction = emitted[-1]
+    assert is_correction
+    assert (bar.high, bar.close, bar.volume) == (12.0, 10.0, 2.0)
+    assert aggregator.current_bar("ETHUSDT", "1m").high == 12.0
+
+    aggregator.add_trade("ETHUSDT", 10_000, 11.0, 1.0)
+    aggregator.add_trade("ETHUSDT", 2_500, 9.0, 1.0)
+    assert aggregator.late_trades == 1
+
+
+def test_late_trade_corrects_rollup_closed_at_minute_boundary():
+    aggregator = BarAggregator(rollups=["1m", "5m"], allowed_lateness_ms=2_000)
+    emitted = collect(aggregator)
+
+    aggregator.add_trade("BTCUSDT", 59_000, 100.0, 1.0)
+    aggregator.add_trade("BTCUSDT", 60_200, 101.0, 1.0)
+    minute = emitted[-1][0]
+    assert (minute.timeframe, minute.volume) == ("1m", 1.0)
+
+    # Traded at 59.9s, received after the minute bar was emitted
+    aggregator.add_trade("BTCUSDT", 59_900, 99.0, 2.0)
+    corrections = [bar for bar, is_correction in emitted if is_correction]
+    assert [bar.timeframe for bar in corrections] == ["1s", "1m"]
+    assert corrections[1].timestamp == 0
+    assert corrections[1].as_candle() == [0, 100.0, 100.0, 99.0, 100.0, 3.0]
+
+    # The open 5m bar absorbs it without a correction of its own
+    five = aggregator.current_bar("BTCUSDT", "5m")
+    assert (five.low, five.volume, five.close) == (99.0, 4.0, 101.0)
+
+
+def test_late_trade_after_flush_corrects_instead_of_reopening():
+    aggregator = BarAggregator(rollups=["1m"], allowed_lateness_ms=2_000)
+    emitted = collect(aggregator)
+
+    aggregator.add_trade("BTCUSDT", 10_000, 100.0, 1.0)
+    aggregator.add_trade("BTCUSDT", 59_000, 101.0, 1.0)
+    aggregator.flush("BTCUSDT", 60_500)
+    aggregator.add_trade("BTCUSDT", 59_800, 50.0, 0.1)
+    aggregator.add_trade("BTCUSDT", 61_000, 102.0, 1.0)
+    aggregator.flush("BTCUSDT", 120_000)
+
+    minutes = [(bar.timestamp, c) for bar, c in emitted if bar.timeframe == "1m"]
+    assert minutes == [(0, False), (0, True), (60_000, False)]
+    corrected = [bar for bar, c in emitted if c and bar.timeframe == "1m"][0]
+    assert corrected.as_candle() == [0, 100.0, 101.0, 50.0, 101.0, 2.1]
+    assert aggregator.late_trades == 0
+
+    # Beyond the lateness window the trade is dropped, not reopened
+    aggregator.add_trade("BTCUSDT", 55_000, 50.0, 0.1)
+    assert aggregator.late_trades == 1
+    assert aggregator.current_bar("BTCUSDT", "1s") is None
+
+
+def test_current_bar_after_base_flush():
+    aggregator = BarAggregator(rollups=["1m"])
+    aggregator.add_trade("BTCUSDT", 1_000, 100.0, 1.0)
+    aggregator.add_trade("BTCUSDT", 2_000, 102.0, 1.0)
+    aggregator.flush("BTCUSDT", 5_000)
+
+    assert aggregator.current_bar("BTCUSDT", "1s") is None
+    current = aggregator.current_bar("BTCUSDT", "1m")
+    assert current.as_candle() == [0, 100.0, 102.0, 100.0, 102.0, 2.0]
+    assert current is not aggregator.open_bars["BTCUSDT"]["1m"]
+
+
+def test_rollups_must_align_with_base_timeframe():
+    with pytest.raises(ValueError):
+        BarAggregator(base_timeframe="1m", rollups=["1s"])
@@ -0,0 +1,154 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.batch_inference import BatchPredictor, PredictionBatcher
+from src.ml.lstm_runtime import LSTMRuntime
+from src.ml.predictor import MarketPredictor
+from tests.test_lstm_runtime import random_layers
+
+
+class Standardizer:
+    def __init__(self, mean, scale):
+        self.mean_, self.scale_ = np.asarray(mean), np.asarray(scale)
+
+    def transform(self, X):
+        return (X - self.mean_) / self.scale_
+
+
+class LinearTree:
+    def __init__(self, weights):
+        self.weights = weights
+
+    def predict(self, X, check_input=True):
+        return X @ self.weights
+
+
+class Forest:
+    def __init__(self, estimators):
+        self.estimators_ = estimators
+
+
+class TinyPredictor(MarketPredictor):
+    """A trained-looking predictor without scikit-learn or TensorFlow."""
+
+    def __init__(self, seed):
+        rng = np.random.default_rng(seed)
+        features = len(self.feature_columns)
+        self.lookback = 12
+        self.prediction_horizon = 3
+        self.dtype = np.float32
+        self.scaler = Standardizer(
+            rng.uniform(1, 5, features), rng.uniform(1, 2, features)
+        )
+        self._rf_model = Forest(
+            [
+                LinearTree(rng.normal(0, 0.05, self.lookback * features))
+                for _ in range(4)
+            ]
+        )
+        self._lstm_runtime = LSTMRuntime(random_layers(seed), self.dtype)
+
+
+def frame(seed, rows=30):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(1, 5, (rows, len(MarketPredictor.feature_columns)))
+    return pd.DataFrame(values, columns=MarketPredictor.feature_columns)
+
+
+def assert_same_prediction(result, expected):
+    assert result.keys() == expected.keys()
+    for key in ("price", "confidence"):
+        assert result[key] == pytest.approx(expected[key], rel=1e-5)
+    for key in ("predictions", "confidence_scores"):
+        for model in ("lstm", "rf"):
+            assert result[key][model] == pytest.approx(expected[key][model], rel=1e-5)
+
+
+def test_batch_matches_per_symbol_predictions():
+    shared = TinyPredictor(0)
+    requests = {
+        "BTC/USDT": (TinyPredictor(1), frame(1)),
+        "ETH/USDT": (TinyPredictor(2), frame(2)),
+        "SOL/USDT": (shared, frame(3)),
+        "ADA/USDT": (shared, frame(4)),
+        "XRP/USDT": (shared, frame(5, rows=5)),  # shorter than the lookback
+    }
+    batch = BatchPredictor()
+
+    results, failures = batch.predict(requests)
+    assert set(results) == {"BTC/USDT", "ETH/USDT", "SOL/USDT", "ADA/USDT"}
+    assert isinstance(failures["XRP/USDT"], ValueError)
+    for symbol, prediction in results.items():
+        predictor, data = requests[symbol]
+        assert_same_prediction(prediction, predictor.predict(data))
+
+    # Stacked weights are reused while the same models are batched
+    stacked = batch._stacked[1]
+    batch.predict(requests)
+    assert batch._stacked[1] is stacked
+
+    # Symbols sharing one model need no stacking
+    shared_only = {s: requests[s] for s in ("SOL/USDT", "ADA/USDT")}
+    assert batch._runtime([shared, shared]) is shared.lstm_runtime
+    assert batch.predict(shared_only)[0].keys() == shared_only.keys()
+
+
+def test_batcher_coalesces_concurrent_requests():
+    class CountingBatchPredictor(BatchPredictor):
+        sizes = []
+
+        def predict(self, requests):
+            self.sizes.append(len(requests))
+            return super().predict(requests)
+
+    predictors = [TinyPredictor(seed) for seed in range(5)]
+    frames = [frame(seed) for seed in range(5)]
+
+    async def run():
+        batcher = PredictionBatcher(
+            max_delay=0.01, max_batch=4, batch_predictor=CountingBatchPredictor()
+        )
+        results = await asyncio.gather(
+            *(batcher.predict(p, df) for p, df in zip(predictors, frames)),
+            batcher.predict(predictors[0], frame(0, rows=5)),
+            return_exceptions=True,
+        )
+        return results, batcher.batch_predictor.sizes
+
+    results, sizes = asyncio.run(run())
+    assert sizes == [4, 2]
+    for result, predictor, data in zip(results, predictors, frames):
+        assert_same_prediction(result, predictor.predict(data))
+    assert isinstance(results[-1], ValueError)
+
+
+def test_broken_requests_fail_alone():
+    class BrokenForest:
+        @property
+        def estimators_(self):
+            raise RuntimeError("forest failed to load")
+
+    untrained = TinyPredictor(1)
+    untrained.scaler = object()
+    wider = TinyPredictor(2)
+    wider._lstm_runtime = LSTMRuntime(random_layers(2, units=16))
+    broken = TinyPredictor(3)
+    broken._rf_model = BrokenForest()
+    requests = {
+        "BTC/USDT": (TinyPredictor(0), frame(0)),
+        "ETH/USDT": (untrained, frame(1)),
+        "SOL/USDT": (wider, frame(2)),
+        "ADA/USDT": (broken, frame(3)),
+        "XRP/USDT": (TinyPredictor(4), frame(4)),
+    }
+
+    results, failures = BatchPredictor().predict(requests)
+    assert set(results) == {"BTC/USDT", "XRP/USDT"}
+    assert set(failures) == {"ETH/USDT", "SOL/USDT", "ADA/USDT"}
+    assert isinstance(failures["ADA/USDT"], RuntimeError)
+    for symbol in results:
+        predictor, data = requests[symbol]
+        assert_same_prediction(results[symbol], predictor.predict(data))
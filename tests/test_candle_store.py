@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.data.candle_store import CandleStore
+
+
+def make_candles(start, n, offset=0.0):
+    index = pd.date_range(start, periods=n, freq="1min", name="timestamp")
+    values = np.arange(n, dtype=float) + offset
+    return pd.DataFrame(
+        {
+            "open": values,
+            "high": values,
+            "low": values,
+            "close": values,
+            "volume": values,
+        },
+        index=index,
+    )
+
+
+def test_write_and_read_across_days(tmp_path):
+    store = CandleStore(tmp_path)
+    candles = make_candles("2024-01-01 23:00", 120)
+    store.write("BTC/USDT", "1m", candles)
+
+    assert len(list((tmp_path / "BTC-USDT" / "1m").iterdir())) == 2
+    df = store.read("BTC/USDT", "1m")
+    pd.testing.assert_frame_equal(df, candles, check_freq=False, check_index_type=False)
+
+    window = store.read("BTC/USDT", "1m", "2024-01-01 23:30", "2024-01-02 00:10")
+    assert len(window) == 40
+    assert len(store.tail("BTC/USDT", "1m", 10)) == 10
+
+
+def test_overlapping_appends_keep_latest_and_compact(tmp_path):
+    store = CandleStore(tmp_path)
+    store.write("BTC/USDT", "1m", make_candles("2024-01-01", 10))
+    store.write("BTC/USDT", "1m", make_candles("2024-01-01 00:05", 10, offset=100))
+
+    closes = store.read_arrays("BTC/USDT", "1m")["close"]
+    assert list(closes) == [0, 1, 2, 3, 4] + list(range(100, 110))
+
+    store.compact("BTC/USDT", "1m")
+    assert len(list((tmp_path / "BTC-USDT" / "1m" / "2024-01-01").iterdir())) == 1
+    assert list(store.read_arrays("BTC/USDT", "1m")["close"]) == list(closes)
+
+
+def test_many_small_writes_stay_compact(tmp_path):
+    store = CandleStore(tmp_path, max_parts_per_day=8)
+    candles = make_candles("2024-01-01 23:00", 90)
+    for end in range(1, len(candles) + 1):
+        # Live sync cycles rewrite the previous candle along with the new one
+        start = max(end - 2, 0)
+        store.write("BTC/USDT", "1m", candles.iloc[start:end])
+
+    days = sorted((tmp_path / "BTC-USDT" / "1m").iterdir())
+    assert [len(list(day.iterdir())) for day in days][0] == 1
+    assert all(len(list(day.iterdir())) < 8 for day in days)
+
+    # A closed day is a single part and is read without copying
+    closed = store.read_arrays("BTC/USDT", "1m", "2024-01-01", "2024-01-02")
+    assert not closed["close"].flags.owndata
+    df = store.read("BTC/USDT", "1m")
+    pd.testing.assert_frame_equal(df, candles, check_freq=False, check_index_type=False)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.correlation import CorrelationEngine
+
+
+def make_closes(steps=400, symbols=4, seed=0):
+    rng = np.random.default_rng(seed)
+    r = rng.normal(0, 0.01, (steps, symbols))
+    r[:, 1] += 0.8 * r[:, 0]
+    r[:, 2] -= 0.5 * r[:, 0]
+    prices = 100 * np.cumprod(1 + np.vstack([np.zeros(symbols), r]), axis=0)
+    return [f"S{i}" for i in range(symbols)], prices, r
+
+
+def test_matches_pandas_ewm_for_each_half_life():
+    symbols, prices, r = make_closes()
+    engine = CorrelationEngine(half_lives=(20, 100))
+    for row in prices:
+        engine.update(dict(zip(symbols, row)))
+
+    frame = pd.DataFrame(r)
+    for half_life in (20, 100):
+        ewm = frame.ewm(alpha=1 - 0.5 ** (1 / half_life), adjust=False)
+        np.testing.assert_allclose(
+            engine.covariance(half_life), ewm.cov(bias=True).loc[len(r) - 1], atol=1e-15
+        )
+        np.testing.assert_allclose(
+            engine.correlation(half_life), ewm.corr().loc[len(r) - 1], atol=1e-12
+        )
+
+
+def test_missing_bars_and_new_symbols():
+    symbols, prices, _ = make_closes(steps=100, symbols=3)
+    engine = CorrelationEngine(symbols[:2], half_lives=(10,), min_periods=20)
+    for step, row in enumerate(prices):
+        closes = dict(zip(symbols[:2], row[:2]))
+        if step % 7 == 3:
+            del closes["S1"]  # No bar this step
+        if step >= 90:
+            closes["S2"] = row[2]  # Listed late
+        engine.update(closes, timestamp=step)
+
+    corr = engine.correlation()
+    assert engine.symbols == symbols
+    assert engine.counts[0, 1] < engine.counts[0, 0] == 100
+    assert corr[0, 1] > 0.3
+    assert np.isnan(corr[0, 2]) and np.isnan(corr[2, 2])
+
+    snapshot = engine.snapshot(symbols=["S1", "S0"])
+    assert snapshot["timestamp"] == 100 and snapshot["half_life"] == 10
+    assert snapshot["matrix"][0][0] == 1.0
+    assert snapshot["matrix"][0][1] == pytest.approx(corr[1, 0], abs=1e-4)
+    with pytest.raises(KeyError):
+        engine.snapshot(symbols=["DOGE"])
+    with pytest.raises(ValueError):
+        engine.correlation(half_life=3)
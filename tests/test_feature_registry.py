@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.feature_engineering import FeatureEngineer
+from src.ml.feature_registry import FEATURES, FeatureRegistry
+
+
+def test_plan_is_minimal_and_shares_intermediates():
+    plan = [
+        feature.name for feature in FEATURES.plan(["macd_diff", "ema_12"], ["close"])
+    ]
+    assert plan.count("ema_12") == 1
+    assert plan.index("ema_12") < plan.index("macd") < plan.index("macd_diff")
+    assert "bb_mid" not in plan and "atr" not in plan
+
+    plan = [feature.name for feature in FEATURES.plan(["bb_high", "bb_low"], ["close"])]
+    assert plan == ["close_moments_20", "bb_high", "bb_low"]
+
+
+def test_each_intermediate_is_evaluated_once():
+    registry = FeatureRegistry()
+    calls = []
+
+    @registry.register("double", ["close"], public=False)
+    def double(close):
+        calls.append("double")
+        return close * 2
+
+    registry.register("plus", ["double"], lambda x, amount: x + amount, amount=1)
+    registry.register("minus", ["double"], lambda x, amount: x - amount, amount=1)
+
+    result = registry.compute({"close": np.arange(3.0)}, ["plus", "minus"])
+    assert calls == ["double"]
+    assert list(result["plus"]) == [1.0, 3.0, 5.0]
+    assert registry.names() == ["plus", "minus"]
+
+
+def test_unknown_inputs_and_cycles_are_rejected():
+    registry = FeatureRegistry()
+    registry.register("a", ["b"], lambda b: b)
+    registry.register("b", ["a"], lambda a: a)
+    with pytest.raises(ValueError):
+        registry.plan(["a"], [])
+    with pytest.raises(KeyError):
+        FEATURES.plan(["atr"], ["close"])
+    with pytest.raises(ValueError):
+        registry.register("a", ["close"], lambda close: close)
+
+
+def test_add_features_only_adds_requested_columns():
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, 200))
+    df = pd.DataFrame(
+        {"high": close + 1, "low": close - 1, "close": close, "volume": 1.0}
+    )
+    engineer = FeatureEngineer()
+
+    partial = engineer.add_features(df.copy(), ["rsi", "macd", "atr"])
+    full = engineer.add_technical_indicators(df.copy())
+    assert list(partial.columns) == list(df.columns) + ["rsi", "macd", "atr"]
+    for column in ["rsi", "macd", "atr"]:
+        np.testing.assert_array_equal(partial[column], full[column])
@@ -0,0 +1,233 @@
+import asyncio
+
+import binance
+import ccxt.async_support as ccxt
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from src.data import fetcher as fetcher_module
+from src.data.fetcher import CryptoDataFetcher
+from src.data.rate_limiter import TokenBucket
+from src.data.simulator import SyntheticExchange
+
+
+class CountingExchange(SyntheticExchange):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {"fetch_ticker": 0, "fetch_tickers": 0}
+        self.book_requests = []
+
+    async def fetch_order_book(self, symbol, limit=20):
+        self.book_requests.append(symbol)
+        return await super().fetch_order_book(symbol, limit)
+
+    async def fetch_ticker(self, symbol):
+        self.calls["fetch_ticker"] += 1
+        return await super().fetch_ticker(symbol)
+
+    async def fetch_tickers(self, symbols=None):
+        self.calls["fetch_tickers"] += 1
+        return await super().fetch_tickers(symbols)
+
+
+def test_fetch_all_data_uses_one_bulk_ticker_call():
+    exchange = CountingExchange(symbol_count=20)
+    fetcher = CryptoDataFetcher(exchange=exchange)
+
+    data = asyncio.run(fetcher.fetch_all_data(exchange.symbols, include_ohlcv=False))
+
+    assert exchange.calls == {"fetch_ticker": 0, "fetch_tickers": 1}
+    assert all(data[s]["ticker"]["symbol"] == s for s in exchange.symbols)
+    assert all(data[s]["order_book"]["bids"] for s in exchange.symbols)
+
+
+def test_fetch_all_data_skips_books_kept_by_the_stream():
+    exchange = CountingExchange(symbol_count=4)
+    fetcher = CryptoDataFetcher(exchange=exchange)
+    streamed = exchange.symbols[:3]
+
+    data = asyncio.run(
+        fetcher.fetch_all_data(
+            exchange.symbols, include_ohlcv=False, skip_books=streamed
+        )
+    )
+
+    assert exchange.book_requests == exchange.symbols[3:]
+    assert all(data[s]["order_book"] == {} for s in streamed)
+    assert all(data[s]["ticker"]["symbol"] == s for s in exchange.symbols)
+
+
+def make_fetcher(**kwargs):
+    return CryptoDataFetcher(
+        exchange=SyntheticExchange(symbol_count=1),
+        rate_limiter=TokenBucket(capacity=1000, refill_rate=1000),
+        **kwargs,
+    )
+
+
+def flaky(errors, result="ok"):
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return call, calls
+
+
+def test_request_retries_transient_errors_with_backoff(monkeypatch):
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(fetcher_module.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(fetcher_module.random, "uniform", lambda a, b: 1.0)
+    fetcher = make_fetcher(max_retries=3)
+    call, calls = flaky([ccxt.NetworkError("reset"), asyncio.TimeoutError()])
+
+    assert asyncio.run(fetcher._request(call)) == "ok"
+    assert len(calls) == 3
+    assert delays == [0.5, 1.0]
+
+    call, calls = flaky([ccxt.RequestTimeout("slow")] * 5)
+    with pytest.raises(ccxt.RequestTimeout):
+        asyncio.run(fetcher._request(call))
+    assert len(calls) == 4
+
+
+def test_request_raises_non_transient_errors_immediately():
+    fetcher = make_fetcher(max_retries=3)
+    call, calls = flaky([ccxt.BadSymbol("unknown symbol")])
+
+    with pytest.raises(ccxt.BadSymbol):
+        asyncio.run(fetcher._request(call))
+    assert len(calls) == 1
+
+
+def test_request_caps_concurrency_across_event_loops():
+    fetcher = make_fetcher(max_concurrency=2)
+    in_flight, peak = 0, []
+
+    async def call():
+        nonlocal in_flight
+        in_flight += 1
+        peak.append(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    async def fan_out():
+        await asyncio.gather(*(fetcher._request(call) for _ in range(6)))
+
+    # A second asyncio.run, as in a Celery task, must get its own semaphore
+    asyncio.run(fan_out())
+    asyncio.run(fan_out())
+    assert len(peak) == 12
+    assert max(peak) == 2
+
+
+class StubAsyncClient:
+    created = 0
+
+    def __init__(self, error=None):
+        self.error = error
+        self.requests = []
+        self.closed = False
+
+    @classmethod
+    async def create(cls, api_key=None, api_secret=None):
+        cls.created += 1
+        await asyncio.sleep(0.01)  # Let concurrent callers pile up on the lock
+        return cls()
+
+    async def get_order_book(self, symbol, limit):
+        self.requests.append((symbol, limit))
+        if self.error is not None:
+            raise self.error
+        return {
+            "lastUpdateId": 7,
+            "bids": [["99.0", "1.0"]],
+            "asks": [["101.0", "2.0"]],
+        }
+
+    async def close_connection(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    monkeypatch.setattr(StubAsyncClient, "created", 0)
+    monkeypatch.setattr(binance, "AsyncClient", StubAsyncClient)
+    return StubAsyncClient
+
+
+def test_market_depth_shares_one_async_client(stub_client):
+    fetcher = make_fetcher(api_key="key", api_secret="secret")
+    symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT"]
+
+    async def fetch():
+        depths = await asyncio.gather(
+            *(fetcher.fetch_market_depth(s, limit=50) for s in symbols)
+        )
+        client = fetcher.binance_client
+        await fetcher.close()
+        return depths, client
+
+    depths, client = asyncio.run(fetch())
+    assert stub_client.created == 1
+    assert sorted(client.requests) == [
+        ("BTCUSDT", 50),
+        ("ETHUSDT", 50),
+        ("SOLUSDT", 50),
+    ]
+    assert [d["symbol"] for d in depths] == symbols
+    assert depths[0]["bids"] == [["99.0", "1.0"]]
+    assert depths[0]["asks"] == [["101.0", "2.0"]]
+    assert client.closed and fetcher.binance_client is None
+
+
+def test_market_depth_errors_return_empty(stub_client):
+    assert asyncio.run(make_fetcher().fetch_market_depth("BTC/USDT")) == {}
+    assert stub_client.created == 0
+
+    fetcher = make_fetcher(api_key="key", api_secret="secret")
+    error = BinanceAPIException(None, 400, '{"code": -1121, "msg": "Invalid symbol."}')
+    fetcher.binance_client = StubAsyncClient(error=error)
+
+    assert asyncio.run(fetcher.fetch_market_depth("BAD/USDT")) == {}
+    assert fetcher.binance_client.requests == [("BADUSDT", 100)]
+
+
+class DepthExchange:
+    id = "simulator"
+
+    def __init__(self, error=None):
+        self.error = error
+
+    async def fetch_order_book(self, symbol, limit):
+        if self.error is not None:
+            raise self.error
+        return {
+            "symbol": symbol,
+            "bids": [[99.0, 1.0]],
+            "asks": [[101.0, 2.0]],
+            "timestamp": 1_700_000_000_000,
+            "nonce": 12345,
+        }
+
+
+def test_order_book_snapshot_carries_update_id():
+    fetcher = CryptoDataFetcher(exchange=DepthExchange())
+    snapshot = asyncio.run(fetcher.fetch_order_book_snapshot("BTC/USDT"))
+    assert snapshot == {
+        "lastUpdateId": 12345,
+        "bids": [[99.0, 1.0]],
+        "asks": [[101.0, 2.0]],
+    }
+
+    # Raised, not swallowed, so a local order book can retry its resync
+    fetcher = CryptoDataFetcher(exchange=DepthExchange(ccxt.BadSymbol("no such")))
+    with pytest.raises(ccxt.BadSymbol):
+        asyncio.run(fetcher.fetch_order_book_snapshot("BTC/USDT"))
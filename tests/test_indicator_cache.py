@@ -0,0 +1,66 @@
+import pandas as pd
+
+from src.ml.indicator_cache import IndicatorCache
+
+
+def candles(start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="1min")
+    return pd.DataFrame({"close": range(periods)}, index=index, dtype=float)
+
+
+def test_repeated_reads_hit_until_a_new_candle():
+    cache = IndicatorCache()
+    calls = []
+
+    def compute(df):
+        calls.append(len(df))
+        return df.assign(rsi=50.0)
+
+    window = candles("2024-01-01", 100)
+    first = cache.get_or_compute(
+        "BTC/USDT", "1m", window, ["rsi"], lambda: compute(window)
+    )
+    second = cache.get_or_compute(
+        "BTC/USDT", "1m", window, ["rsi"], lambda: compute(window)
+    )
+    assert first is second
+    assert (
+        cache.get_or_compute("BTC/USDT", "1m", window, ["atr"], lambda: compute(window))
+        is not first
+    )
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    newer = candles("2024-01-01 00:01", 100)
+    cache.get_or_compute("BTC/USDT", "1m", newer, ["rsi"], lambda: compute(newer))
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidations == 2
+
+
+def test_invalidate_rejects_outdated_windows():
+    cache = IndicatorCache()
+    window = candles("2024-01-01", 10)
+    cache.get_or_compute("ETH/USDT", "1m", window, ["rsi"], lambda: window)
+
+    cache.invalidate("ETH/USDT", "1m", before=pd.Timestamp("2024-01-01 00:10"))
+    assert cache.stats()["entries"] == 0
+    cache.get_or_compute("ETH/USDT", "1m", window, ["rsi"], lambda: window)
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_count_and_size():
+    cache = IndicatorCache(max_entries=2)
+    frames = {s: candles("2024-01-01", 10) for s in ["A", "B", "C"]}
+    for symbol in ["A", "B"]:
+        cache.get_or_compute(symbol, "1m", frames[symbol], [], lambda: frames[symbol])
+    cache.get_or_compute(
+        "A", "1m", frames["A"], [], lambda: frames["A"]
+    )  # A is now recent
+    cache.get_or_compute("C", "1m", frames["C"], [], lambda: frames["C"])
+
+    assert cache.evictions == 1
+    assert cache.get_or_compute("A", "1m", frames["A"], [], lambda: None) is frames["A"]
+
+    small = IndicatorCache(max_bytes=frames["A"].memory_usage(index=True).sum())
+    small.get_or_compute("A", "1m", frames["A"], [], lambda: frames["A"])
+    small.get_or_compute("B", "1m", frames["B"], [], lambda: frames["B"])
+    assert small.stats()["entries"] == 1
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.feature_engineering import FeatureEngineer
+from src.ml.indicator_engine import INDICATOR_COLUMNS, IndicatorEngine
+
+
+@pytest.fixture
+def candles():
+    rng = np.random.default_rng(7)
+    n = 300
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    spread = np.abs(rng.normal(0, 0.002, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + spread),
+            "low": close * (1 - spread),
+            "close": close,
+            "volume": rng.uniform(1, 10, n),
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="1min"),
+    )
+
+
+def test_engine_matches_ta(candles):
+    expected = FeatureEngineer().add_technical_indicators(candles.copy())
+    result = IndicatorEngine().run(candles)
+
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(
+            result[column], expected[column], rtol=1e-9, atol=1e-8, err_msg=column
+        )
+
+
+def test_snapshot_restore_and_peek(candles):
+    engine = IndicatorEngine()
+    engine.run(candles.iloc[:200])
+    state = engine.snapshot()
+
+    row = candles.iloc[200]
+    peeked = engine.peek(row["high"], row["low"], row["close"])
+    assert engine.snapshot() == state
+
+    restored = IndicatorEngine()
+    restored.restore(state)
+    assert restored.update(row["high"], row["low"], row["close"]) == peeked
+    assert engine.update(row["high"], row["low"], row["close"]) == peeked
+
+
+def test_incremental_frames_match_batch(candles):
+    engineer = FeatureEngineer()
+    engineer.update_technical_indicators("BTC/USDT", candles.iloc[:250])
+    result = engineer.update_technical_indicators("BTC/USDT", candles.iloc[:260])
+    expected = engineer.add_technical_indicators(candles.iloc[:260].copy())
+
+    assert list(result.columns) == list(expected.columns)
+    np.testing.assert_allclose(
+        result[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS], rtol=1e-9, atol=1e-8
+    )
@@ -1,4 +1,8 @@
-from src.utils.indicators import calculate_rsi
+import math
+
+import pytest
+
+from src.utils.indicators import calculate_macd, calculate_rsi
 
 
 def test_rsi_calculation():
@@ -15,3 +19,18 @@ def test_rsi_edge_cases():
     # Test strictly increasing
     up_prices = list(range(20))
     assert calculate_rsi(up_prices) > 70
+
+
+def test_rsi_uses_latest_wilder_value():
+    prices = [10, 11, 12, 11, 13, 14, 13, 15, 16, 15, 17, 18, 17, 19, 20, 12]
+    assert calculate_rsi(prices) < calculate_rsi(prices[:-1])
+
+
+def test_macd_calculation():
+    prices = [100 + i * 0.5 for i in range(60)]
+    macd, signal, histogram = calculate_macd(prices)
+    assert macd > 0
+    assert histogram == pytest.approx(macd - signal)
+
+    macd, signal, histogram = calculate_macd(prices[:20])
+    assert math.isnan(macd)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from src.ml import kernels
+from src.ml.feature_engineering import FeatureEngineer
+from src.ml.indicator_engine import INDICATOR_COLUMNS
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(11)
+    shape = (5, 400)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, shape), axis=1))
+    spread = np.abs(rng.normal(0, 0.005, shape))
+    volume = rng.uniform(1, 100, shape)
+    return close, close * (1 + spread), close * (1 - spread), volume
+
+
+@pytest.fixture(params=["compiled", "numpy"])
+def loops(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(kernels, "_smooth_loop", kernels._smooth_loop_numpy)
+        monkeypatch.setattr(
+            kernels, "_wilder_average_loop", kernels._wilder_average_loop_numpy
+        )
+    return request.param
+
+
+def reference(close, high, low, volume):
+    close, high, low = pd.Series(close), pd.Series(high), pd.Series(low)
+    macd = ta.trend.MACD(close)
+    bands = ta.volatility.BollingerBands(close)
+    stochastic = ta.momentum.StochasticOscillator(high, low, close)
+    return {
+        "rsi": ta.momentum.RSIIndicator(close).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "macd_diff": macd.macd_diff(),
+        "bb_high": bands.bollinger_hband(),
+        "bb_mid": bands.bollinger_mavg(),
+        "bb_low": bands.bollinger_lband(),
+        "atr": ta.volatility.AverageTrueRange(high, low, close).average_true_range(),
+        "sma": ta.trend.SMAIndicator(close, 50).sma_indicator(),
+        "ema": ta.trend.EMAIndicator(close, 20).ema_indicator(),
+        "stoch_k": stochastic.stoch(),
+        "stoch_d": stochastic.stoch_signal(),
+        "obv": ta.volume.OnBalanceVolumeIndicator(
+            close, pd.Series(volume)
+        ).on_balance_volume(),
+    }
+
+
+def compute(close, high, low, volume):
+    result = kernels.technical_indicators(close, high, low)
+    result["sma"] = kernels.sma(close, 50)
+    result["ema"] = kernels.ema(close, 20)
+    result["stoch_k"], result["stoch_d"] = kernels.stochastic(high, low, close)
+    result["obv"] = kernels.obv(close, volume)
+    return result
+
+
+def test_kernels_match_ta(panel, loops):
+    close, high, low, volume = (a[0] for a in panel)
+    result = compute(close, high, low, volume)
+
+    for name, expected in reference(close, high, low, volume).items():
+        assert result[name].dtype == np.float64
+        np.testing.assert_allclose(
+            result[name], expected, rtol=1e-9, atol=1e-9, err_msg=name
+        )
+
+
+def test_kernels_keep_float32(panel):
+    close, high, low, volume = (a[0] for a in panel)
+    result = compute(*(a.astype(np.float32) for a in (close, high, low, volume)))
+
+    for name, expected in reference(close, high, low, volume).items():
+        assert result[name].dtype == np.float32
+        np.testing.assert_allclose(
+            result[name], expected, rtol=1e-4, atol=1e-3, err_msg=name
+        )
+
+
+def test_panel_indicators_match_per_symbol_ta(panel, loops):
+    close, high, low, volume = panel
+    result = FeatureEngineer().compute_panel_indicators(close, high, low)
+
+    for i in range(close.shape[0]):
+        expected = reference(close[i], high[i], low[i], volume[i])
+        for column in INDICATOR_COLUMNS:
+            assert result[column].shape == close.shape
+            np.testing.assert_allclose(
+                result[column][i], expected[column], rtol=1e-9, atol=1e-9
+            )
+
+
+def test_panel_requires_aligned_arrays(panel):
+    close, high, low, _ = panel
+    with pytest.raises(ValueError):
+        FeatureEngineer().compute_panel_indicators(close, high[:, 1:], low)
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from src.ml import lstm_runtime
+from src.ml.lstm_runtime import LSTMRuntime
+
+
+def random_layers(seed=0, features=5, units=8, horizon=3):
+    rng = np.random.default_rng(seed)
+
+    def lstm(inputs, return_sequences):
+        return {
+            "type": "lstm",
+            "return_sequences": return_sequences,
+            "kernel": rng.normal(0, 0.3, (inputs, 4 * units)),
+            "recurrent_kernel": rng.normal(0, 0.3, (units, 4 * units)),
+            "bias": rng.normal(0, 0.1, 4 * units),
+        }
+
+    def dense(inputs, outputs, activation="linear"):
+        return {
+            "type": "dense",
+            "activation": activation,
+            "kernel": rng.normal(0, 0.3, (inputs, outputs)),
+            "bias": rng.normal(0, 0.1, outputs),
+        }
+
+    return [
+        lstm(features, True),
+        lstm(units, False),
+        dense(units, 4, "relu"),
+        dense(4, horizon),
+    ]
+
+
+def reference_forward(layers, x):
+    """Keras' LSTM equations, step by step in float64."""
+
+    def sigmoid(v):
+        return 1 / (1 + np.exp(-v))
+
+    for layer in layers:
+        if layer["type"] == "dense":
+            x = x @ layer["kernel"] + layer["bias"]
+            x = np.maximum(x, 0) if layer["activation"] == "relu" else x
+            continue
+        units = layer["recurrent_kernel"].shape[0]
+        h = np.zeros((len(x), units))
+        c = np.zeros((len(x), units))
+        states = []
+        for t in range(x.shape[1]):
+            z = (
+                x[:, t] @ layer["kernel"]
+                + h @ layer["recurrent_kernel"]
+                + layer["bias"]
+            )
+            i, f, g, o = np.split(z, 4, axis=1)
+            c = sigmoid(f) * c + sigmoid(i) * np.tanh(g)
+            h = sigmoid(o) * np.tanh(c)
+            states.append(h)
+        x = np.stack(states, axis=1) if layer["return_sequences"] else h
+    return x
+
+
+@pytest.mark.parametrize("batch", [1, 20])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_matches_reference_equations(batch, dtype):
+    layers = random_layers()
+    x = np.random.default_rng(1).normal(size=(batch, 30, 5))
+    expected = reference_forward(layers, x)
+
+    result = LSTMRuntime(layers, dtype=dtype).predict(x)
+    assert result.dtype == dtype
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+    single = LSTMRuntime(layers, dtype=dtype).predict(x[0])
+    np.testing.assert_allclose(single, expected[0], atol=1e-5)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    layers = random_layers(seed=2)
+    path = lstm_runtime.save(layers, tmp_path / "lstm.npz")
+    x = np.random.default_rng(3).normal(size=(4, 12, 5))
+
+    loaded = LSTMRuntime.load(path)
+    np.testing.assert_array_equal(loaded.predict(x), LSTMRuntime(layers).predict(x))
+    assert [layer["type"] for layer in loaded.layers] == ["lstm"] * 2 + ["dense"] * 2
+
+
+def test_export_matches_keras(tmp_path):
+    keras = pytest.importorskip("tensorflow").keras
+    model = keras.Sequential(
+        [
+            keras.layers.LSTM(8, return_sequences=True, input_shape=(20, 5)),
+            keras.layers.Dropout(0.2),
+            keras.layers.LSTM(8),
+            keras.layers.Dense(4),
+            keras.layers.Dense(3),
+        ]
+    )
+    x = np.random.default_rng(4).normal(size=(6, 20, 5)).astype(np.float32)
+
+    runtime = LSTMRuntime.load(lstm_runtime.export(model, tmp_path / "lstm.npz"))
+    np.testing.assert_allclose(
+        runtime.predict(x), model.predict(x, verbose=0), atol=1e-5
+    )
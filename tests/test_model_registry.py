@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.ml.model_registry import ModelRegistry
+
+
+class FileModel:
+    """Minimal model honouring the registry's save/load contract."""
+
+    loads = 0
+
+    def __init__(self, weights=0, lookback=60):
+        self.weights = weights
+        self.lookback = lookback
+        self.version = None
+
+    @property
+    def schema(self):
+        return {"features": ["close"], "lookback": self.lookback}
+
+    def save(self, directory):
+        Path(directory).mkdir(parents=True)
+        (Path(directory) / "weights.json").write_text(json.dumps(self.weights))
+
+    @classmethod
+    def load(cls, directory):
+        cls.loads += 1
+        return cls(json.loads((Path(directory) / "weights.json").read_text()))
+
+
+def test_publish_load_and_prune(tmp_path):
+    registry = ModelRegistry(tmp_path, FileModel, keep=2)
+    assert registry.get("BTC/USDT") is None
+    with pytest.raises(KeyError):
+        registry.load("BTC/USDT")
+
+    versions = [
+        registry.publish("BTC/USDT", FileModel(w), {"mse": w}) for w in range(3)
+    ]
+    assert versions == sorted(versions)
+    assert registry.versions("BTC/USDT") == versions[1:]
+    assert registry.latest_version("BTC/USDT") == versions[-1]
+    assert registry.metadata("BTC/USDT")["metrics"] == {"mse": 2}
+    assert registry.load("BTC/USDT", versions[1]).weights == 1
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    # A model with another feature schema is stored apart and never served
+    registry.publish("BTC/USDT", FileModel(9, lookback=30))
+    assert registry.load("BTC/USDT").weights == 2
+
+
+def test_get_hot_swaps_after_refresh_interval(tmp_path):
+    publisher = ModelRegistry(tmp_path, FileModel)
+    worker = ModelRegistry(tmp_path, FileModel, refresh_interval=0.0)
+    cached = ModelRegistry(tmp_path, FileModel, refresh_interval=3600)
+
+    publisher.publish("ETH/USDT", FileModel(1))
+    first = worker.get("ETH/USDT")
+    assert first.weights == 1 and cached.get("ETH/USDT").weights == 1
+
+    FileModel.loads = 0
+    assert worker.get("ETH/USDT") is first  # Unchanged version is not reloaded
+    assert FileModel.loads == 0
+
+    publisher.publish("ETH/USDT", FileModel(2))
+    assert worker.get("ETH/USDT").weights == 2
+    assert cached.get("ETH/USDT").weights == 1  # Until its next refresh
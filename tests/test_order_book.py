@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.realtime.data_processor import DataProcessor
+from src.realtime.order_book import LocalOrderBook, OrderBookManager
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["99.0", "1.0"], ["98.0", "2.0"], ["97.0", "3.0"]],
+    "asks": [["101.0", "1.0"], ["102.0", "2.0"]],
+}
+
+
+def diff(first, last, prev, bids=(), asks=()):
+    return {"U": first, "u": last, "pu": prev, "b": list(bids), "a": list(asks)}
+
+
+def test_snapshot_and_diffs():
+    book = LocalOrderBook("BTC/USDT")
+    book.apply_snapshot(SNAPSHOT)
+    assert book.best_bid() == (99.0, 1.0)
+    assert book.best_ask() == (101.0, 1.0)
+
+    assert book.apply_diff(diff(90, 95, 89))  # older than the snapshot
+    assert book.apply_diff(diff(95, 105, 94, bids=[["99.0", "0"], ["99.5", "4"]]))
+    assert book.apply_diff(diff(106, 110, 105, asks=[["100.5", "3"]]))
+
+    assert book.top(2)["bids"] == [[99.5, 4.0], [98.0, 2.0]]
+    assert book.best_ask() == (100.5, 3.0)
+    assert book.mid_price() == pytest.approx(100.0)
+    assert book.microprice() == pytest.approx((99.5 * 3 + 100.5 * 4) / 7)
+    prices, depth = book.bids.cumulative_depth(3)
+    assert list(prices) == [99.5, 98.0, 97.0]
+    assert list(depth) == [4.0, 6.0, 9.0]
+
+    assert not book.apply_diff(diff(120, 125, 118))  # gap
+    assert not book.synced
+
+
+def test_processor_refuses_snapshot_without_update_id():
+    processor = DataProcessor()
+    unsequenced = {key: SNAPSHOT[key] for key in ("bids", "asks")}
+
+    assert not processor.process_order_book("BTCUSDT", unsequenced)
+    assert not processor.order_book["BTCUSDT"].synced
+    assert not processor.process_order_book("BTCUSDT", diff(1, 5, 0))
+
+    assert processor.process_order_book("BTCUSDT", SNAPSHOT)
+    assert processor.process_order_book("BTCUSDT", diff(95, 105, 94))
+    assert processor.get_order_book("BTCUSDT", 1)["bids"] == [[99.0, 1.0]]
+
+
+def test_manager_buffers_and_resyncs():
+    async def loader(symbol):
+        await asyncio.sleep(0)
+        return SNAPSHOT
+
+    async def run():
+        manager = OrderBookManager(loader)
+        await manager.process_event("BTC/USDT", diff(95, 105, 94, bids=[["99", "5"]]))
+        await manager.process_event("BTC/USDT", diff(106, 108, 105))
+        await asyncio.sleep(0.01)
+        return manager
+
+    manager = asyncio.run(run())
+    book = manager.book("BTC/USDT")
+    assert book.synced and book.last_update_id == 108
+    assert book.best_bid() == (99.0, 5.0)
+    assert manager.resyncs["BTC/USDT"] == 1
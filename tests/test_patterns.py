@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.utils.patterns import (
+    find_pivots,
+    find_support_resistance,
+    is_resistance,
+    is_support,
+    pivot_masks,
+    sliding_extreme,
+    support_resistance_zones,
+)
+
+
+def reference_levels(prices, window):
+    levels = []
+    for i in range(window, len(prices) - window):
+        if is_support(prices, i, window):
+            levels.append(("support", prices[i]))
+        if is_resistance(prices, i, window):
+            levels.append(("resistance", prices[i]))
+    return levels
+
+
+@pytest.mark.parametrize("window", [1, 3, 5, 12])
+def test_matches_reference_including_ties(window):
+    rng = np.random.default_rng(window)
+    smooth = list(100 + np.cumsum(rng.normal(0, 1, 500)))
+    flat = list(rng.integers(0, 5, 300).astype(float))  # Plenty of ties
+    for prices in (smooth, flat, smooth[: 2 * window]):
+        assert find_support_resistance(prices, window) == reference_levels(
+            prices, window
+        )
+
+
+def test_sliding_extreme_and_panel_masks():
+    rng = np.random.default_rng(0)
+    panel = rng.normal(size=(4, 257))
+    windows = np.lib.stride_tricks.sliding_window_view(panel, 9, axis=-1)
+    np.testing.assert_array_equal(sliding_extreme(panel, 9), windows.min(axis=-1))
+    np.testing.assert_array_equal(
+        sliding_extreme(panel, 9, np.maximum), windows.max(axis=-1)
+    )
+
+    masks = pivot_masks(panel, windows=(2, 7))
+    pivots = find_pivots(panel[2], windows=(2, 7))
+    for window in (2, 7):
+        for kind in ("support", "resistance"):
+            np.testing.assert_array_equal(
+                np.flatnonzero(masks[window][kind][2]), pivots[window][kind]
+            )
+
+
+def test_zones_cluster_nearby_levels():
+    wave = np.sin(np.linspace(0, 12 * np.pi, 600))
+    rng = np.random.default_rng(1)
+    prices = 100 + 5 * wave + rng.uniform(-0.05, 0.05, 600)
+
+    zones = support_resistance_zones(prices, windows=(5, 20), tolerance=0.005)
+    levels = sorted(zone["level"] for zone in zones if zone["touches"] >= 5)
+    assert levels[0] == pytest.approx(95, abs=0.1)
+    assert levels[-1] == pytest.approx(105, abs=0.1)
+
+    strongest = zones[0]
+    assert strongest["strength"] == 1.0
+    assert strongest["low"] <= strongest["level"] <= strongest["high"]
+    assert (strongest["high"] - strongest["low"]) / strongest["low"] < 0.01
+    top = max(zones, key=lambda zone: zone["level"])
+    assert top["type"] == "resistance" and top["resistance_touches"] > 0
+    assert support_resistance_zones(prices[:5]) == []
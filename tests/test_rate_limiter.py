@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from src.data.rate_limiter import TokenBucket, get_rate_limiter
+
+
+def test_token_bucket_throttles_over_capacity():
+    bucket = TokenBucket(capacity=10, refill_rate=100)
+
+    async def spend():
+        for _ in range(3):
+            await bucket.acquire(5)
+
+    start = time.monotonic()
+    asyncio.run(spend())
+    # 15 weight against a 10 capacity bucket must wait for ~5 tokens to refill
+    assert time.monotonic() - start >= 0.04
+
+
+def test_rate_limiter_is_shared_per_exchange():
+    assert get_rate_limiter("binance") is get_rate_limiter("binance")
+    assert get_rate_limiter("binance") is not get_rate_limiter("kraken")
+
+
+def test_token_bucket_survives_successive_event_loops():
+    bucket = TokenBucket(capacity=10, refill_rate=1000)
+
+    async def contend():
+        await asyncio.gather(*(bucket.acquire(5) for _ in range(4)))
+
+    # The lock must not stay bound to the loop of the first asyncio.run
+    asyncio.run(contend())
+    asyncio.run(contend())
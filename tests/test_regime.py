@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml.feature_engineering import FeatureEngineer
+from src.ml.regime import RegimeClassifier, TDigest
+
+
+def test_tdigest_quantiles_and_merge():
+    rng = np.random.default_rng(5)
+    values = rng.lognormal(0, 1, 20_000)
+
+    left, right = TDigest(), TDigest()
+    for value in values[:10_000]:
+        left.update(value)
+    for value in values[10_000:]:
+        right.update(value)
+
+    restored = TDigest.from_dict(json.loads(json.dumps(right.to_dict())))
+    left.merge(restored)
+    assert len(left) == len(values)
+    assert len(left.means) < 200
+    for q in [0.01, 1 / 3, 0.5, 2 / 3, 0.99]:
+        assert left.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.03)
+
+
+def test_regimes_use_only_past_volatility():
+    rng = np.random.default_rng(9)
+    returns = np.concatenate([rng.normal(0, 0.001, 400), rng.normal(0, 0.01, 100)])
+    closes = 100 * np.exp(np.cumsum(returns))
+
+    classifier = RegimeClassifier()
+    rows = classifier.run(closes)
+    assert rows[50]["volatility_regime"] is None  # Not enough history yet
+    assert rows[-1]["volatility_regime"] == "high"
+
+    # Appending future candles never changes earlier labels
+    prefix = RegimeClassifier().run(closes[:420])
+    assert [r["volatility_regime"] for r in prefix] == [
+        r["volatility_regime"] for r in rows[:420]
+    ]
+
+    assert rows[-1]["volatility"] == pytest.approx(
+        pd.Series(closes).pct_change().rolling(30).std().iloc[-1]
+    )
+
+
+def test_add_market_regime_columns():
+    closes = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, 300))
+    df = FeatureEngineer().add_market_regime(pd.DataFrame({"close": closes}))
+    assert set(df["volatility_regime"].dropna()) <= {"low", "medium", "high"}
+    assert df["sma_50"].iloc[-1] == pytest.approx(closes[-50:].mean())
+    assert df["trend_regime"].iloc[-1] in {"uptrend", "downtrend"}
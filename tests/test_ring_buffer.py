@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.realtime.data_processor import DataProcessor
+from src.realtime.ring_buffer import TradeRingBuffer
+
+
+def test_ring_buffer_windows_are_contiguous_views():
+    buffer = TradeRingBuffer(capacity=4)
+    for i in range(6):
+        buffer.append(i, float(i), 1.0, 1)
+
+    window = buffer.window()
+    assert list(window["price"]) == [2.0, 3.0, 4.0, 5.0]
+    assert list(buffer.window(2)["timestamp"]) == [4, 5]
+    assert np.shares_memory(window["price"], buffer.prices)
+    assert buffer.last_price() == 5.0
+    assert len(buffer) == 4
+
+
+def test_data_processor_trades():
+    processor = DataProcessor(max_data_points=3)
+    for price in ["1.5", "2.5"]:
+        processor.process_trade("BTCUSDT", {"p": price, "q": "0.1", "T": 1, "m": True})
+
+    history = processor.get_price_history("BTCUSDT")
+    assert list(history["price"]) == [1.5, 2.5]
+    assert list(history["side"]) == [-1, -1]
+    assert processor.get_latest_price("BTCUSDT") == 2.5
@@ -1,4 +1,21 @@
-from src.utils.risk import assess_market_risk, calculate_volatility
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.analyzer import MarketAnalyzer
+from src.utils.risk import (
+    assess_market_risk,
+    calculate_volatility,
+    ewma_volatility,
+    historical_cvar,
+    historical_var,
+    max_drawdown,
+    monte_carlo_var,
+    parametric_var,
+    returns,
+    risk_metrics,
+    rolling_volatility,
+)
 
 
 def test_volatility_calculation():
@@ -13,3 +30,83 @@ def test_risk_assessment():
     assert "volatility_risk" in risk
     assert "volume_risk" in risk
     assert "sentiment_risk" in risk
+
+
+def make_prices(symbols=5, steps=500, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, steps)
+    betas = np.linspace(0.5, 1.5, symbols)[:, None]
+    r = betas * market + rng.normal(0, 0.005, (symbols, steps))
+    r[0] = market
+    return 100 * np.cumprod(1 + r, axis=1)
+
+
+def test_metrics_match_pandas():
+    prices = make_prices()
+    r = returns(prices)
+    frame = pd.DataFrame(r.T)
+
+    np.testing.assert_allclose(
+        rolling_volatility(r, 30), frame.rolling(30).std().values.T, atol=1e-12
+    )
+    squares = (frame**2).ewm(alpha=0.06, adjust=False).mean()
+    np.testing.assert_allclose(ewma_volatility(r), np.sqrt(squares.values.T))
+    k = int(0.05 * r.shape[1])
+    worst = np.sort(r, axis=1)[:, :k]
+    np.testing.assert_allclose(historical_var(r), -worst[:, -1])
+    np.testing.assert_allclose(historical_cvar(r), -worst.mean(axis=1))
+    drawdown = (frame.add(1).cumprod() / frame.add(1).cumprod().cummax() - 1).min()
+    np.testing.assert_allclose(max_drawdown(np.cumprod(1 + r, axis=1)), -drawdown)
+
+    metrics = risk_metrics(prices, benchmark=0)
+    expected = np.linspace(0.5, 1.5, 5)
+    expected[0] = 1.0  # The benchmark itself
+    np.testing.assert_allclose(metrics["beta"], expected, atol=0.1)
+    assert (metrics["parametric_cvar"] > metrics["parametric_var"]).all()
+
+
+def test_monte_carlo_is_deterministic_across_workers():
+    r = returns(make_prices(symbols=3))
+    weights = [0.5, 0.3, 0.2]
+    inline = monte_carlo_var(r, paths=5_000, weights=weights, seed=7, chunk_size=1_000)
+    pooled = monte_carlo_var(
+        r, paths=5_000, weights=weights, seed=7, chunk_size=1_000, workers=2
+    )
+    for name in inline:
+        np.testing.assert_array_equal(inline[name], pooled[name])
+    np.testing.assert_allclose(inline["var"], parametric_var(r), rtol=0.1)
+
+
+def test_analyzer_scores_universe():
+    prices = make_prices(symbols=4)
+    data = {
+        symbol: {"market": {"prices": list(prices[i, i * 10 :])}}
+        for i, symbol in enumerate(["BTC", "ETH", "SOL", "XRP"])
+    }
+    data["NEW"] = {"market": {"prices": [1.0, 1.1]}}
+
+    risk = MarketAnalyzer().risk_analysis(data)
+    assert set(risk) == {"BTC", "ETH", "SOL", "XRP"}
+    assert risk["BTC"]["beta"] == pytest.approx(1.0)
+    assert sorted(r["risk_score"] for r in risk.values()) == [0, 1 / 3, 2 / 3, 1]
+
+
+def test_analyzer_aligns_symbols_on_timestamps():
+    prices = make_prices(symbols=3)
+    index = pd.date_range("2024-01-01", periods=prices.shape[1], freq="h")
+    btc = pd.Series(prices[0], index=index)
+    eth = pd.Series(prices[1], index=index).iloc[:-20]  # stale
+    sol = pd.Series(prices[2], index=index).drop(index[50:60])  # gap
+    data = {
+        "BTC": {"market": {"prices": btc}},
+        "ETH": {"market": {"prices": list(eth), "timestamps": list(eth.index)}},
+        "SOL": {"market": {"prices": sol}},
+    }
+
+    risk = MarketAnalyzer().risk_analysis(data)
+    common = btc.index.intersection(eth.index).intersection(sol.index)
+    aligned = np.stack([s.loc[common].to_numpy() for s in (btc, eth, sol)])
+    expected = risk_metrics(aligned, 0, confidence=0.95, window=30)
+    for i, symbol in enumerate(["BTC", "ETH", "SOL"]):
+        assert risk[symbol]["beta"] == pytest.approx(expected["beta"][i])
+        assert risk[symbol]["cvar"] == pytest.approx(expected["cvar"][i])
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+from src.data.simulator import RecordingExchange, ReplayExchange, SyntheticExchange
+
+
+def test_synthetic_exchange_is_deterministic_and_consistent():
+    start_ms = 1_700_000_040_000
+    a = SyntheticExchange(symbol_count=3, speed=1.0, start_ms=start_ms)
+    b = SyntheticExchange(symbol_count=3, speed=1.0, start_ms=start_ms)
+    candles = asyncio.run(a.fetch_ohlcv("SIM0001/USDT", limit=100))
+    assert candles == asyncio.run(b.fetch_ohlcv("SIM0001/USDT", limit=100))
+    assert len(candles) == 100
+    assert all(c[3] <= min(c[1], c[4]) and c[2] >= max(c[1], c[4]) for c in candles)
+
+    hourly = asyncio.run(a.fetch_ohlcv("SIM0001/USDT", "1h", limit=5))
+    assert all(c[0] % 3_600_000 == 0 for c in hourly[1:])
+
+    tickers = asyncio.run(a.fetch_tickers())
+    assert set(tickers) == set(a.symbols)
+
+
+def test_synthetic_order_book_snapshots_through_the_fetcher():
+    from src.data.fetcher import CryptoDataFetcher
+
+    exchange = SyntheticExchange(symbol_count=2, start_ms=1_700_000_040_000)
+    fetcher = CryptoDataFetcher(exchange=exchange)
+    snapshot = asyncio.run(fetcher.fetch_order_book_snapshot("SIM0001/USDT", 50))
+    assert snapshot["lastUpdateId"] >= 1_700_000_040_000
+    assert len(snapshot["bids"]) == len(snapshot["asks"]) == 50
+    assert snapshot["bids"][0][0] < snapshot["asks"][0][0]
+
+    with pytest.raises(KeyError):
+        asyncio.run(exchange.fetch_order_book("NOPE/USDT"))
+
+
+def test_replay_exchange_serves_recorded_responses(tmp_path):
+    path = tmp_path / "session.jsonl"
+    records = [
+        {
+            "method": "fetch_ticker",
+            "args": ["BTC/USDT"],
+            "kwargs": {},
+            "t": 0,
+            "result": {"last": 100.0},
+        },
+        {
+            "method": "fetch_ticker",
+            "args": ["BTC/USDT"],
+            "kwargs": {},
+            "t": 10**12,
+            "result": {"last": 200.0},
+        },
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records))
+
+    exchange = ReplayExchange(str(path), symbol_count=3)
+    assert len(exchange.symbols) == 3
+    ticker = asyncio.run(exchange.fetch_ticker("SIM0001/USDT"))
+    assert ticker == {"last": 100.0, "symbol": "SIM0001/USDT"}
+
+
+def test_benchmark_builds_recording_fetcher(tmp_path, monkeypatch):
+    from scripts.benchmark_pipeline import build_fetcher, parse_args
+
+    path = tmp_path / "session.jsonl"
+    monkeypatch.setattr(sys, "argv", ["benchmark_pipeline", "--record", str(path)])
+    fetcher, symbols = build_fetcher(parse_args())
+    assert isinstance(fetcher.exchange, RecordingExchange)
+    assert fetcher.exchange.id == "binance"
+    assert symbols
+    asyncio.run(fetcher.close())
+    assert path.exists()
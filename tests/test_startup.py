@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import json, sys
+from src.pipeline.data_pipeline import get_data_pipeline
+from src.pipeline.training_pipeline import get_training_pipeline
+from src.sentiment.analyzer import SentimentAnalyzer
+
+get_data_pipeline(), get_training_pipeline(), SentimentAnalyzer()
+print(json.dumps(sorted({name.split(".")[0] for name in sys.modules})))
+"""
+
+
+def test_pipelines_defer_heavy_dependencies(tmp_path):
+    # A configured model registry must not load models either
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env={"MODEL_PATH": str(tmp_path)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = set(json.loads(result.stdout.splitlines()[-1]))
+    heavy = {"tensorflow", "sklearn", "joblib", "ccxt", "binance", "textblob"}
+    assert not loaded & heavy and "vaderSentiment" not in loaded
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from src.realtime.websocket_client import WebSocketClient
+
+
+def test_subscriptions_are_sharded_across_connections():
+    client = WebSocketClient(max_streams_per_connection=2)
+
+    async def subscribe():
+        for symbol in ["BTC/USDT", "ETH/USDT", "SOL/USDT"]:
+            await client.subscribe(symbol, "trade")
+        await client.subscribe("BTC/USDT", "trade")
+
+    asyncio.run(subscribe())
+    assert [len(c.streams) for c in client.connections] == [2, 1]
+
+
+def test_dispatch_detects_sequence_gaps():
+    client = WebSocketClient()
+    received, gaps = [], []
+
+    async def on_event(stream, data):
+        received.append(data["u"])
+
+    async def on_gap(stream, expected, got):
+        gaps.append((stream, expected, got))
+
+    client.add_callback("BTC/USDT", on_event)
+    client.add_gap_callback(on_gap)
+
+    async def feed():
+        for first, last, prev in [(1, 5, 0), (6, 9, 5), (15, 20, 12)]:
+            data = {"e": "depthUpdate", "U": first, "u": last, "pu": prev}
+            await client.dispatch(json.dumps({"stream": "btcusdt@depth", "data": data}))
+
+    asyncio.run(feed())
+    assert received == [5, 9, 20]
+    assert gaps == [("btcusdt@depth", 10, 15)]
+    assert client.stats["btcusdt@depth"].gaps == 1
@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.ml.windows import WindowedDataset
+
+
+def reference_windows(features, lookback, horizon):
+    X, y = [], []
+    for i in range(len(features) - lookback - horizon + 1):
+        X.append(features[i : i + lookback])
+        y.append(features[i + lookback : i + lookback + horizon, 0])
+    return np.array(X), np.array(y)
+
+
+def test_windows_match_loop_without_copying():
+    features = np.random.default_rng(0).normal(size=(500, 5))
+    dataset = WindowedDataset(features, lookback=60, horizon=24, dtype=np.float64)
+    X, y = reference_windows(features, 60, 24)
+
+    assert dataset.shape == X.shape
+    np.testing.assert_array_equal(dataset.batch()[0], X)
+    np.testing.assert_array_equal(dataset.batch()[1], y)
+    assert np.shares_memory(dataset._X, dataset.features)
+
+    flat_X, flat_y = dataset.flat([3, 7])
+    np.testing.assert_array_equal(flat_X, X[[3, 7]].reshape(2, -1))
+    np.testing.assert_array_equal(flat_y, y[[3, 7]])
+
+
+def test_splits_samples_and_batches():
+    features = np.arange(400, dtype=np.float64).reshape(200, 2)
+    dataset = WindowedDataset(features, lookback=10, horizon=5)
+    assert dataset.features.dtype == np.float32
+    X, y = reference_windows(features, 10, 5)
+
+    train, test = dataset.split(0.8)
+    assert len(train) + len(test) == len(dataset) == len(X)
+    np.testing.assert_array_equal(test.batch()[0], X[len(train) :])
+    assert test.features is dataset.features
+
+    sample = train.sample(10)
+    assert len(sample) == 10 and sample.indices[-1] == len(train) - 1
+
+    seen = np.concatenate(
+        [b[1][:, 0] for b in dataset.batches(32, shuffle=True, seed=1)]
+    )
+    np.testing.assert_array_equal(np.sort(seen), y[:, 0])
+    assert len(WindowedDataset(features[:14], 10, 5)) == 0